@@ -2,8 +2,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.warmup import WarmupDetector
 from input import __default__
 
 import sys
@@ -94,17 +94,11 @@ def main(n: int) -> None:
     # Output result for the long-lived tree
     print(f"long lived tree of depth {max_depth}\t check: {check_tree(long_lived_tree)}")
 
-@measure_energy_to_csv(n=__default__["binary-trees"]["test_n"], csv_filename="binary_trees_pypy")
-def run_energy_benchmark(n: int) -> None:
+@measure(n=__default__["binary-trees"]["test_n"], csv_filename="binary_trees_pypy", warmup=WarmupDetector())
+def run_benchmark(n: int) -> None:
     main(n)
 
-@measure_time_to_csv(n=__default__["binary-trees"]["test_n"], csv_filename="binary_trees_pypy")
-def run_time_benchmark(n: int) -> None:
-    main(n)
-
-
 if __name__ == "__main__":
     n = __default__["binary-trees"]["depth"]
     
-    run_energy_benchmark(n)
-    run_time_benchmark(n)
+    run_benchmark(n)
@@ -4,8 +4,7 @@ import time
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 
@@ -143,15 +142,9 @@ def driver(k: int, query_sequence: str, target_sequence: str) -> None:
     print(f"Query:   {aligned_query}")
     print(f"Target:  {aligned_target}")
     
-# Benchmarking functions for energy
-@measure_energy_to_csv(n=__default__["fasta"]["test_n"], csv_filename="fasta_cpython")
-def run_energy_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
-    driver(k, query_sequence, target_sequence)
-    time.sleep(0.01) # Simulate some processing time
-
-# Benchmarking function for time
-@measure_time_to_csv(n=__default__["fasta"]["test_n"], csv_filename="fasta_cpython")
-def run_time_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
+# Benchmarking function for energy and time
+@measure(n=__default__["fasta"]["test_n"], csv_filename="fasta_cpython")
+def run_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
     driver(k, query_sequence, target_sequence)
     time.sleep(0.01) # Simulate some processing time
 
@@ -161,8 +154,6 @@ if __name__ == "__main__":
     query_sequence = __default__["fasta"]["query_sequence"]
     target_sequence = __default__["fasta"]["target_sequence"]
 
-    # Run the energy benchmark
-    run_energy_benchmark(k, query_sequence, target_sequence)
+    # Run the benchmark
+    run_benchmark(k, query_sequence, target_sequence)
 
-    # Run the time benchmark
-    run_time_benchmark(k, query_sequence, target_sequence)
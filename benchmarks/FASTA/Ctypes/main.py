@@ -5,8 +5,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 # Load the shared library
@@ -56,24 +55,16 @@ def driver(k, query, target):
     print("Start in Query:", result["start_q"])
     print("Start in Target:", result["start_t"])
 
-# Benchmarking functions for energy
-@measure_energy_to_csv(n=__default__["fasta"]["test_n"], csv_filename="fasta_ctypes")
-def run_energy_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
+# Benchmarking function for energy and time
+@measure(n=__default__["fasta"]["test_n"], csv_filename="fasta_ctypes")
+def run_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
     driver(k, query_sequence, target_sequence)
     time.sleep(0.01) # Simulate some processing time
 
-# Benchmarking function for time
-@measure_time_to_csv(n=__default__["fasta"]["test_n"], csv_filename="fasta_ctypes")
-def run_time_benchmark(k: int, query_sequence: str, target_sequence: str) -> None:
-    driver(k, query_sequence, target_sequence)
-    time.sleep(0.01) # Simulate some processing time
-
-
 if __name__ == "__main__":
     k = __default__["fasta"]["k"]
     query_sequence = __default__["fasta"]["query_sequence"]
     target_sequence = __default__["fasta"]["target_sequence"]
 
     # Run the driver function
-    run_energy_benchmark(k, query_sequence, target_sequence)
-    run_time_benchmark(k, query_sequence, target_sequence)
+    run_benchmark(k, query_sequence, target_sequence)
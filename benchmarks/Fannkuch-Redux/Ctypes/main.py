@@ -2,8 +2,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 import ctypes
@@ -31,16 +30,10 @@ def driver(n: int) -> None:
     print(f"Count of max flips: {count_max_flips.value}")
     
     
-@measure_energy_to_csv(n=__default__["fannkuch_redux"]["test_n"], csv_filename="fannkuch_redux_ctypes")
-def run_energy_benchmark(n: int) -> None:
+@measure(n=__default__["fannkuch_redux"]["test_n"], csv_filename="fannkuch_redux_ctypes")
+def run_benchmark(n: int) -> None:
     driver(n)
 
-@measure_time_to_csv(n=__default__["fannkuch_redux"]["test_n"], csv_filename="fannkuch_redux_ctypes")
-def run_time_benchmark(n: int) -> None:
-    driver(n)
-    
-
 if __name__ == "__main__":
     n = __default__["fannkuch_redux"]["n"]
-    run_energy_benchmark(n)
-    run_time_benchmark(n)
+    run_benchmark(n)
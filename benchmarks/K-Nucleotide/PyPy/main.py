@@ -1,30 +1,30 @@
+import mmap
 import sys
 import os
 import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.warmup import WarmupDetector
 from input import __default__
 
 from collections import defaultdict
 from typing import Dict
 
 
-def read_sequence(file_path: str) -> str:
-    """Reads the DNA sequence from a file, ignoring headers.
+def read_sequence(data: mmap.mmap) -> str:
+    """Reads the DNA sequence from the memory-mapped input file, ignoring headers.
     
     Args:
-        file_path (str): Path to the input file containing the DNA sequence.
+        data (mmap.mmap): Contents of the input file containing the DNA sequence.
     
     Returns:
         str: The processed DNA sequence as a single string.
     """
     sequence: list[str] = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            if not line.startswith('>'):
-                sequence.append(line.strip().upper())  # Convert to uppercase for consistency
+    for line in str(data, 'ascii').splitlines():
+        if not line.startswith('>'):
+            sequence.append(line.strip().upper())  # Convert to uppercase for consistency
     return ''.join(sequence)
 
 def count_kmers(sequence: str, k: int) -> Dict[str, int]:
@@ -58,23 +58,17 @@ def print_kmer_frequencies(kmers: Dict[str, int]) -> None:
 
 def main() -> None:
     """Main function to execute the K-Nucleotide frequency analysis."""    
-    file_path: str = __default__["K_Nucleotide"]["nucleotide_sequence_file"]
+    data: mmap.mmap = __default__.mapped("K_Nucleotide", "nucleotide_sequence_file")
     k: int = __default__["K_Nucleotide"]["k"]
     
-    sequence: str = read_sequence(file_path)
+    sequence: str = read_sequence(data)
     kmers: Dict[str, int] = count_kmers(sequence, k)
     print_kmer_frequencies(kmers)
 
-@measure_energy_to_csv(n=__default__["K_Nucleotide"]["test_n"], csv_filename="K_Nucleotide_pypy")
-def run_energy_benchmark() -> None:
-    main()
-    time.sleep(0.01)
-
-@measure_time_to_csv(n=__default__["K_Nucleotide"]["test_n"], csv_filename="K_Nucleotide_pypy")
-def run_time_benchmark() -> None:
+@measure(n=__default__["K_Nucleotide"]["test_n"], csv_filename="K_Nucleotide_pypy", warmup=WarmupDetector())
+def run_benchmark() -> None:
     main()
     time.sleep(0.01)
 
 if __name__ == "__main__":
-    run_energy_benchmark()
-    run_time_benchmark()
+    run_benchmark()
@@ -2,13 +2,11 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 from typing import List, Tuple, Dict
 import math
-import random
 from collections import Counter
 
 
@@ -77,41 +75,44 @@ class KNN:
         else:  # regression
             return sum(label for _, label in k_nearest_neighbors) / self.k
 
-def driver(num_samples: int, num_features: int, k: int):
-    # Generate a large dataset for CPU and memory profiling
-    num_samples = num_samples
-    num_features = num_features
-
-    X_train = [[random.uniform(0, 100) for _ in range(num_features)] for _ in range(num_samples)]
-    y_train_classification = [random.randint(0, 1) for _ in range(num_samples)]
-    y_train_regression = [random.uniform(0, 100) for _ in range(num_samples)]
-
+def driver(
+    X_train: List[List[float]],
+    y_train_classification: List[int],
+    y_train_regression: List[float],
+    query_classification: List[List[float]],
+    query_regression: List[List[float]],
+    k: int,
+) -> None:
     # Classification Example
-    knn_classifier = KNN(k=5, mode="classification")
+    knn_classifier = KNN(k=k, mode="classification")
     knn_classifier.fit(X_train, y_train_classification)
-    prediction_classification = knn_classifier.predict([[random.uniform(0, 100) for _ in range(num_features)]])
+    prediction_classification = knn_classifier.predict(query_classification)
     print("Classification Prediction:", prediction_classification)
 
     # Regression Example
-    knn_regressor = KNN(k=5, mode="regression")
+    knn_regressor = KNN(k=k, mode="regression")
     knn_regressor.fit(X_train, y_train_regression)
-    prediction_regression = knn_regressor.predict([[random.uniform(0, 100) for _ in range(num_features)]])
+    prediction_regression = knn_regressor.predict(query_regression)
     print("Regression Prediction:", prediction_regression)
-    # Note: The above example generates random data for demonstration purposes.
-    
-@measure_energy_to_csv(n=__default__["knn"]["test_n"], csv_filename="knn_cpython")
-def run_energy_benchmark(num_samples: int, num_features: int, k: int) -> None:
-    driver(num_samples, num_features, k)
-
-@measure_time_to_csv(n=__default__["knn"]["test_n"], csv_filename="knn_cpython")
-def run_time_benchmark(num_samples: int, num_features: int, k: int) -> None:
-    driver(num_samples, num_features, k)
     
+@measure(n=__default__["knn"]["test_n"], csv_filename="knn_cpython")
+def run_benchmark(
+    X_train: List[List[float]],
+    y_train_classification: List[int],
+    y_train_regression: List[float],
+    query_classification: List[List[float]],
+    query_regression: List[List[float]],
+    k: int,
+) -> None:
+    driver(X_train, y_train_classification, y_train_regression, query_classification, query_regression, k)
 
 if __name__ == "__main__":
-    num_samples = __default__["knn"]["num_samples"]
-    num_features = __default__["knn"]["num_features"]
+    # The seeded training set and query points, read from the workload cache
+    X_train = __default__.mapped("knn", "X_train").tolist()
+    y_train_classification = __default__.mapped("knn", "y_classification").tolist()
+    y_train_regression = __default__.mapped("knn", "y_regression").tolist()
+    query_classification = __default__.mapped("knn", "query_classification").tolist()
+    query_regression = __default__.mapped("knn", "query_regression").tolist()
     k = __default__["knn"]["k"]
 
-    run_energy_benchmark(num_samples, num_features, k)
-    run_time_benchmark(num_samples, num_features, k)
+    run_benchmark(X_train, y_train_classification, y_train_regression, query_classification, query_regression, k)
@@ -2,13 +2,11 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 import ctypes
 import numpy as np
-import random
 from typing import List
 
 # Load the compiled shared library
@@ -24,13 +22,13 @@ lib.knn_predict.argtypes = [
     ctypes.POINTER(ctypes.c_double)   # output prediction
 ]
 
-def knn_predict(train_X: List[List[float]], train_y: List[float], input_vector: List[float], k: int) -> float:
-    num_samples = len(train_X)
-    num_features = len(train_X[0])
+def knn_predict(train_X: memoryview, train_y: memoryview, input_vector: memoryview, k: int) -> float:
+    num_samples, num_features = train_X.shape
 
-    flat_X = np.array(train_X, dtype=np.float64).flatten()
-    arr_y = np.array(train_y, dtype=np.float64)
-    input_arr = np.array(input_vector, dtype=np.float64)
+    # Zero-copy float64 views of the memory-mapped workload
+    flat_X = np.frombuffer(train_X, dtype=np.float64)
+    arr_y = np.frombuffer(train_y, dtype=np.float64)
+    input_arr = np.frombuffer(input_vector, dtype=np.float64)
 
     result = ctypes.c_double()
     lib.knn_predict(
@@ -45,26 +43,19 @@ def knn_predict(train_X: List[List[float]], train_y: List[float], input_vector:
 
     return result.value
 
-def driver(num_samples: int, num_features: int, k: int):
-    X_train = [[random.uniform(0, 100) for _ in range(num_features)] for _ in range(num_samples)]
-    y_train = [random.uniform(0, 100) for _ in range(num_samples)]
-    input_vector = [random.uniform(0, 100) for _ in range(num_features)]
-
+def driver(X_train: memoryview, y_train: memoryview, input_vector: memoryview, k: int):
     prediction = knn_predict(X_train, y_train, input_vector, k)
     print("Regression Prediction (ctypes):", prediction)
 
-@measure_energy_to_csv(n=__default__["knn"]["test_n"], csv_filename="knn_ctypes")
-def run_energy_benchmark(num_samples: int, num_features: int, k: int) -> None:
-    driver(num_samples, num_features, k)
-
-@measure_time_to_csv(n=__default__["knn"]["test_n"], csv_filename="knn_ctypes")
-def run_time_benchmark(num_samples: int, num_features: int, k: int) -> None:
-    driver(num_samples, num_features, k)
+@measure(n=__default__["knn"]["test_n"], csv_filename="knn_ctypes")
+def run_benchmark(X_train: memoryview, y_train: memoryview, input_vector: memoryview, k: int) -> None:
+    driver(X_train, y_train, input_vector, k)
 
 if __name__ == "__main__":
-    num_samples = __default__["knn"]["num_samples"]
-    num_features = __default__["knn"]["num_features"]
+    # The seeded training set and query point, read-only float64 views of the workload cache
+    X_train = __default__.mapped("knn", "X_train")
+    y_train = __default__.mapped("knn", "y_regression")
+    input_vector = __default__.mapped("knn", "query_regression")
     k = __default__["knn"]["k"]
 
-    run_energy_benchmark(num_samples, num_features, k)
-    run_time_benchmark(num_samples, num_features, k)
+    run_benchmark(X_train, y_train, input_vector, k)
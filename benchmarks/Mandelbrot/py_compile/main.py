@@ -2,8 +2,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 
@@ -99,18 +98,11 @@ def driver(width: int, height: int, max_iter: int,
     render_mandelbrot(mandelbrot_data, max_iter)
 
 # Measure energy consumption and time taken for the Mandelbrot set generation
-@measure_energy_to_csv(n=__default__["mandelbrot"]["test_n"], csv_filename="mandelbrot_pycompile")
-def run_energy_benchmark(width: int, height: int, max_iter: int, 
+@measure(n=__default__["mandelbrot"]["test_n"], csv_filename="mandelbrot_pycompile")
+def run_benchmark(width: int, height: int, max_iter: int, 
                          x_min: float, x_max: float, y_min: float, y_max: float) -> None:
     driver(width, height, max_iter, x_min, x_max, y_min, y_max)
 
-# Measure time taken for the Mandelbrot set generation
-@measure_time_to_csv(n=__default__["mandelbrot"]["test_n"], csv_filename="mandelbrot_pycompile")
-def run_time_benchmark(width: int, height: int, max_iter: int, 
-                         x_min: float, x_max: float, y_min: float, y_max: float) -> None:
-    driver(width, height, max_iter, x_min, x_max, y_min, y_max)
-
-
 if __name__ == "__main__":
     # Define grid size and Mandelbrot range
     width, height = __default__["mandelbrot"]["width"], __default__["mandelbrot"]["height"]
@@ -122,6 +114,5 @@ if __name__ == "__main__":
         __default__["mandelbrot"]["y_max"]
     )
     
-    # Run energy and time benchmarks
-    run_energy_benchmark(width, height, max_iter, x_min, x_max, y_min, y_max)
-    run_time_benchmark(width, height, max_iter, x_min, x_max, y_min, y_max)
+    # Run the benchmark
+    run_benchmark(width, height, max_iter, x_min, x_max, y_min, y_max)
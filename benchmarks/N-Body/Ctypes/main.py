@@ -1,12 +1,13 @@
 import ctypes
+import functools
 import numpy as np
-from typing import List
+from typing import List, Optional, TextIO
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.sampler import mark
 from input import __default__
 
 
@@ -23,56 +24,107 @@ class Body(ctypes.Structure):
 
 # Define the simulate_nbody function signature
 lib.simulate_nbody.argtypes = [
-    ctypes.POINTER(Body), ctypes.c_int,
-    ctypes.c_double, ctypes.c_int,
+    ctypes.POINTER(Body), ctypes.c_size_t,
+    ctypes.c_double, ctypes.c_size_t,
+    ctypes.c_size_t, ctypes.c_size_t,  # every, capacity
     ctypes.POINTER(ctypes.c_double)
 ]
 lib.simulate_nbody.restype = None
 
-def run_simulation(bodies: List[Body], dt: float, num_steps: int) -> List[List[List[float]]]:
+lib.simulate_nbody_barnes_hut.argtypes = [
+    ctypes.POINTER(Body), ctypes.c_size_t,
+    ctypes.c_double, ctypes.c_size_t, ctypes.c_double,
+    ctypes.c_size_t, ctypes.c_size_t,  # every, capacity
+    ctypes.POINTER(ctypes.c_double)
+]
+lib.simulate_nbody_barnes_hut.restype = None
+
+@functools.lru_cache(maxsize=1)
+def trajectory_buffer(num_snapshots: int, num_bodies: int) -> np.ndarray:
+    """
+    Output buffer of shape (num_snapshots, num_bodies, 3), allocated once per
+    shape and reused by every run, which overwrites it.
+    """
+    return np.empty((num_snapshots, num_bodies, 3))
+
+def run_simulation(bodies: List[Body], dt: float, num_steps: int,
+                   method: str = "direct", theta: float = 0.5,
+                   every: int = 1, window: Optional[int] = None) -> np.ndarray:
+    """
+    Run the simulation in C and return the position of each body at every
+    `every`-th step, of those the last `window` (all if None), shape
+    (num_snapshots, num_bodies, 3).
+
+    The C code only keeps those snapshots, in a ring buffer of
+    ceil(num_steps / every) or `window` snapshots, and writes straight into
+    the NumPy buffer. Unless the ring wrapped around, the result is a view
+    of the memory it filled, not a copy, and only valid until the next call
+    with the same shape.
+    """
     num_bodies = len(bodies)
+    # A copy of the bodies; the C code moves these, so `bodies` keeps the initial state for the next run
     body_array = (Body * num_bodies)(*bodies)
 
-    # Allocate output buffer
-    output = (ctypes.c_double * (num_steps * num_bodies * 3))()
-
-    # Call C function
-    lib.simulate_nbody(body_array, num_bodies, dt, num_steps, output)
+    num_samples = len(range(0, num_steps, every))
+    capacity = num_samples if window is None else min(window, num_samples)
+    positions = trajectory_buffer(capacity, num_bodies)
+    output = positions.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
 
-    # Convert output to nested Python lists
-    results = []
-    for step in range(num_steps):
-        step_positions = []
-        for i in range(num_bodies):
-            index = step * num_bodies * 3 + i * 3
-            step_positions.append([output[index], output[index + 1], output[index + 2]])
-        results.append(step_positions)
+    # Call C function: every pair, or the Barnes-Hut octree with opening angle theta
+    if method == "barnes-hut":
+        lib.simulate_nbody_barnes_hut(body_array, num_bodies, dt, num_steps, theta, every, capacity, output)
+    else:
+        lib.simulate_nbody(body_array, num_bodies, dt, num_steps, every, capacity, output)
 
-    return results
+    # The oldest kept snapshot sits in the slot after the last one written
+    oldest = (num_samples - capacity) % capacity if capacity else 0
+    return np.roll(positions, -oldest, axis=0) if oldest else positions
 
-def driver(bodies: List[Body], dt: float, num_steps: int) -> None:
+def write_trajectories(positions: np.ndarray, stream: Optional[TextIO] = None,
+                       steps: Optional[range] = None) -> None:
     """
-    Run the N-Body simulation and print the trajectory of each body.
+    Write the trajectory of each body to `stream` (default: stdout).
+
+    `positions[:, i]` is a strided view of body i; only that body's rows
+    are converted to Python floats, and its lines are written at once.
+    `steps` holds the step (from 0) of each row of positions, if not every step.
     """
-    results = run_simulation(bodies, dt, num_steps)
-    for i, traj in enumerate(zip(*results)):
-        print(f"Trajectory of Body {i+1}:")
-        for step, pos in enumerate(traj):
-            print(f"Step {step + 1}: Position = {pos}")
-        print()
-
-@measure_time_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_ctypes")
-def run_time_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
+    stream = stream or sys.stdout
+    if steps is None:
+        steps = range(len(positions))
+    for i in range(positions.shape[1]):
+        lines = [f"Step {step + 1}: Position = {pos}\n" for step, pos in zip(steps, positions[:, i].tolist())]
+        stream.write(f"Trajectory of Body {i + 1}:\n" + "".join(lines) + "\n")
+
+def save_trajectories(positions: np.ndarray, path: str) -> None:
     """
-    Measure and log the time it takes to simulate the N-body system using CTypes.
+    Save the trajectories to `path` in NumPy's .npy format, shape
+    (num_snapshots, num_bodies, 3).
     """
-    driver(bodies, dt, num_steps)
-
+    np.save(path, positions)
 
-@measure_energy_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_ctypes")
-def run_energy_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
+def driver(bodies: List[Body], dt: float, num_steps: int) -> None:
+    """
+    Run the N-Body simulation and print (or save) the trajectory of each body.
+    """
+    input_data = __default__["nbody"]
+    # Every sample_every-th step, and of those the last trajectory_window (all if None) when printed
+    every = input_data["sample_every"]
+    window = None if input_data["trajectory_file"] else input_data["trajectory_window"]
+    mark("simulate")
+    positions = run_simulation(bodies, dt, num_steps, input_data["method"], input_data["theta"], every, window)
+
+    mark("output")
+    if input_data["trajectory_file"]:
+        save_trajectories(positions, input_data["trajectory_file"])
+        return
+    steps = range(0, num_steps, every)
+    write_trajectories(positions, steps=steps[len(steps) - len(positions):])
+
+@measure(n=__default__["nbody"]["test_n"], csv_filename="nbody_ctypes")
+def run_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
     """
-    Measure and log the energy consumption of the N-body simulation using CTypes.
+    Measure and log the energy consumption and time of the N-body simulation using CTypes.
     """
     driver(bodies, dt, num_steps)
 
@@ -90,5 +142,4 @@ if __name__ == "__main__":
     dt = input_data["dt"]
     num_steps = input_data["time_steps"]
 
-    run_energy_benchmark(bodies, dt, num_steps)
-    run_time_benchmark(bodies, dt, num_steps)
+    run_benchmark(bodies, dt, num_steps)
@@ -44,25 +44,43 @@ void compute_force(Body* body1, Body* body2, double* force_out) {
     }
 }
 
-void simulate_nbody(Body* bodies, int num_bodies, double dt, int num_steps, double* output_positions) {
+/* Copy the positions of all bodies into one (num_bodies, 3) snapshot */
+static void save_positions(const Body* bodies, size_t num_bodies, double* snapshot) {
+    for (size_t i = 0; i < num_bodies; i++) {
+        for (int j = 0; j < 3; j++) {
+            snapshot[i * 3 + j] = bodies[i].position[j];
+        }
+    }
+}
+
+/*
+ * Keep a snapshot of every `every`-th step (from step 0) in a ring of `capacity` (num_bodies, 3)
+ * snapshots, so output_positions holds the last `capacity` sampled steps; nothing if capacity is 0.
+ */
+static void sample_positions(const Body* bodies, size_t num_bodies, size_t step, size_t every, size_t capacity, double* output_positions) {
+    if (capacity == 0 || step % every != 0) {
+        return;
+    }
+    size_t slot = (step / every) % capacity;
+    save_positions(bodies, num_bodies, &output_positions[slot * num_bodies * 3]);
+}
+
+/* Sizes and indices are size_t: capacity * num_bodies * 3 overflows an int for large runs */
+void simulate_nbody(Body* bodies, size_t num_bodies, double dt, size_t num_steps, size_t every, size_t capacity, double* output_positions) {
     double* forces = (double*)calloc(num_bodies * 3, sizeof(double));
 
-    for (int step = 0; step < num_steps; step++) {
+    for (size_t step = 0; step < num_steps; step++) {
         // Save positions
-        for (int i = 0; i < num_bodies; i++) {
-            for (int j = 0; j < 3; j++) {
-                output_positions[step * num_bodies * 3 + i * 3 + j] = bodies[i].position[j];
-            }
-        }
+        sample_positions(bodies, num_bodies, step, every, capacity, output_positions);
 
         // Reset forces
-        for (int i = 0; i < num_bodies * 3; i++) {
+        for (size_t i = 0; i < num_bodies * 3; i++) {
             forces[i] = 0.0;
         }
 
         // Compute forces
-        for (int i = 0; i < num_bodies; i++) {
-            for (int j = 0; j < num_bodies; j++) {
+        for (size_t i = 0; i < num_bodies; i++) {
+            for (size_t j = 0; j < num_bodies; j++) {
                 if (i != j) {
                     double temp_force[3];
                     compute_force(&bodies[i], &bodies[j], temp_force);
@@ -74,11 +92,198 @@ void simulate_nbody(Body* bodies, int num_bodies, double dt, int num_steps, doub
         }
 
         // Update velocities and positions
-        for (int i = 0; i < num_bodies; i++) {
+        for (size_t i = 0; i < num_bodies; i++) {
+            update_velocity(&bodies[i], &forces[i * 3], dt);
+            update_position(&bodies[i], dt);
+        }
+    }
+
+    free(forces);
+}
+
+/* Barnes-Hut: octree depth at which coincident bodies share a leaf instead of splitting further */
+#define MAX_DEPTH 64
+
+typedef struct {
+    double center[3];
+    double half_size;
+    double mass;
+    double center_of_mass[3];
+    int children[8];  /* node indices, -1 if empty */
+    int body;         /* first body of a leaf, -1 if none; the rest follow in Octree.next */
+    int internal;
+} Node;
+
+typedef struct {
+    Node* nodes;
+    int count;
+    int capacity;
+    int* next;        /* next body in the same leaf, -1 at the end */
+} Octree;
+
+static int octree_node(Octree* tree, const double* center, double half_size) {
+    if (tree->count == tree->capacity) {
+        tree->capacity *= 2;
+        tree->nodes = (Node*)realloc(tree->nodes, (size_t)tree->capacity * sizeof(Node));
+    }
+    Node* node = &tree->nodes[tree->count];
+    for (int k = 0; k < 3; k++) {
+        node->center[k] = center[k];
+        node->center_of_mass[k] = 0.0;
+    }
+    node->half_size = half_size;
+    node->mass = 0.0;
+    for (int k = 0; k < 8; k++) {
+        node->children[k] = -1;
+    }
+    node->body = -1;
+    node->internal = 0;
+    return tree->count++;
+}
+
+/* Index of the octant of node `index` containing `position`, created if needed */
+static int octree_child(Octree* tree, int index, const double* position) {
+    int octant = 0;
+    for (int k = 0; k < 3; k++) {
+        if (position[k] >= tree->nodes[index].center[k]) {
+            octant |= 1 << k;
+        }
+    }
+    if (tree->nodes[index].children[octant] < 0) {
+        double quarter = tree->nodes[index].half_size / 2;
+        double center[3];
+        for (int k = 0; k < 3; k++) {
+            center[k] = tree->nodes[index].center[k] + ((octant >> k & 1) ? quarter : -quarter);
+        }
+        int child = octree_node(tree, center, quarter);  /* may move tree->nodes */
+        tree->nodes[index].children[octant] = child;
+    }
+    return tree->nodes[index].children[octant];
+}
+
+static void octree_insert(Octree* tree, int index, int b, int depth, const Body* bodies) {
+    for (;;) {
+        Node* node = &tree->nodes[index];
+        double total = node->mass + bodies[b].mass;
+        for (int k = 0; k < 3; k++) {
+            node->center_of_mass[k] = (node->center_of_mass[k] * node->mass + bodies[b].position[k] * bodies[b].mass) / total;
+        }
+        node->mass = total;
+
+        if (!node->internal) {
+            if (node->body < 0 || depth == MAX_DEPTH) {
+                tree->next[b] = node->body;
+                node->body = b;
+                return;
+            }
+            /* Split the leaf and push its body down */
+            int existing = node->body;
+            node->body = -1;
+            node->internal = 1;
+            int child = octree_child(tree, index, bodies[existing].position);
+            octree_insert(tree, child, existing, depth + 1, bodies);
+        }
+        index = octree_child(tree, index, bodies[b].position);
+        depth++;
+    }
+}
+
+static void octree_build(Octree* tree, const Body* bodies, int num_bodies) {
+    double low[3], high[3], center[3], half_size = 0.0;
+    for (int k = 0; k < 3; k++) {
+        low[k] = high[k] = bodies[0].position[k];
+    }
+    for (int i = 1; i < num_bodies; i++) {
+        for (int k = 0; k < 3; k++) {
+            if (bodies[i].position[k] < low[k]) low[k] = bodies[i].position[k];
+            if (bodies[i].position[k] > high[k]) high[k] = bodies[i].position[k];
+        }
+    }
+    for (int k = 0; k < 3; k++) {
+        center[k] = (low[k] + high[k]) / 2;
+        if ((high[k] - low[k]) / 2 > half_size) half_size = (high[k] - low[k]) / 2;
+    }
+    if (half_size == 0) half_size = 1.0;
+
+    tree->count = 0;
+    int root = octree_node(tree, center, half_size * (1 + 1e-9));
+    for (int i = 0; i < num_bodies; i++) {
+        octree_insert(tree, root, i, 0, bodies);
+    }
+}
+
+/* Force on body b: cubes smaller than theta times their distance act as one mass */
+static void compute_barnes_hut_force(const Octree* tree, const Body* bodies, int b, double theta, double* force_out) {
+    int stack[8 * (MAX_DEPTH + 2)];
+    int top = 0;
+    const double* position = bodies[b].position;
+
+    force_out[0] = force_out[1] = force_out[2] = 0.0;
+    stack[top++] = 0;
+    while (top > 0) {
+        const Node* node = &tree->nodes[stack[--top]];
+        if (!node->internal) {
+            for (int other = node->body; other >= 0; other = tree->next[other]) {
+                if (other != b) {
+                    double temp_force[3];
+                    compute_force((Body*)&bodies[b], (Body*)&bodies[other], temp_force);
+                    for (int k = 0; k < 3; k++) {
+                        force_out[k] += temp_force[k];
+                    }
+                }
+            }
+            continue;
+        }
+
+        double direction[3], distance = 0.0;
+        int inside = 1;
+        for (int k = 0; k < 3; k++) {
+            direction[k] = node->center_of_mass[k] - position[k];
+            distance += direction[k] * direction[k];
+            if (fabs(position[k] - node->center[k]) > node->half_size) inside = 0;
+        }
+        distance = sqrt(distance);
+
+        if (2 * node->half_size < theta * distance && !inside) {
+            double force_magnitude = G * bodies[b].mass * node->mass / (distance * distance);
+            for (int k = 0; k < 3; k++) {
+                force_out[k] += force_magnitude * direction[k] / distance;
+            }
+        } else {
+            for (int k = 0; k < 8; k++) {
+                if (node->children[k] >= 0) {
+                    stack[top++] = node->children[k];
+                }
+            }
+        }
+    }
+}
+
+void simulate_nbody_barnes_hut(Body* bodies, size_t num_bodies, double dt, size_t num_steps, double theta, size_t every, size_t capacity, double* output_positions) {
+    double* forces = (double*)calloc(num_bodies * 3, sizeof(double));
+    Octree tree;
+    tree.capacity = 2 * (int)num_bodies + 1;
+    tree.nodes = (Node*)malloc((size_t)tree.capacity * sizeof(Node));
+    tree.next = (int*)malloc(num_bodies * sizeof(int));
+
+    for (size_t step = 0; step < num_steps; step++) {
+        // Save positions
+        sample_positions(bodies, num_bodies, step, every, capacity, output_positions);
+
+        // Compute forces
+        octree_build(&tree, bodies, (int)num_bodies);
+        for (size_t i = 0; i < num_bodies; i++) {
+            compute_barnes_hut_force(&tree, bodies, (int)i, theta, &forces[i * 3]);
+        }
+
+        // Update velocities and positions
+        for (size_t i = 0; i < num_bodies; i++) {
             update_velocity(&bodies[i], &forces[i * 3], dt);
             update_position(&bodies[i], dt);
         }
     }
 
+    free(tree.nodes);
+    free(tree.next);
     free(forces);
 }
@@ -1,49 +1,78 @@
 # main.py
+from collections import deque
 import numpy as np
-from raw import Body, simulate_nbody
-from typing import List
+from raw import Body, iterate_nbody, iterate_nbody_barnes_hut
+from typing import Iterator, List, Optional, Tuple
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.sampler import mark
 from input import __default__
 
 
-def print_trajectories(positions: List[List[List[float]]], num_bodies: int) -> None:
+def print_trajectories(positions: List[List[List[float]]], num_bodies: int,
+                       steps: Optional[List[int]] = None) -> None:
     """
     Prints the positions of each body at each time step.
 
     Args:
         positions (List[List[List[float]]]): A list of positions for each body at each time step.
         num_bodies (int): The number of bodies in the simulation.
+        steps (Optional[List[int]]): The step (from 0) of each entry of positions, if not every step.
     """
+    if steps is None:
+        steps = range(len(positions))
     for body_index in range(num_bodies):
         print(f"Trajectory of Body {body_index + 1}:")
-        for step, position in enumerate(positions):
+        for step, position in zip(steps, positions):
             pos = position[body_index]
             print(f"Step {step + 1}: Position = {pos}")
         print()
 
-def driver(bodies: List[Body], dt: float, num_steps: int) -> None:
+def save_trajectories(snapshots: Iterator[Tuple[int, List[List[float]]]], path: str,
+                      num_snapshots: int, num_bodies: int) -> None:
     """
-    Initializes the bodies, runs the N-Body simulation, and prints the results.
+    Streams the snapshots into the .npy file `path`, shape (num_snapshots, num_bodies, 3).
+
+    The file is written through a memory map, one snapshot at a time, so
+    memory does not grow with the number of snapshots.
     """
-    positions = simulate_nbody(bodies, dt, num_steps)
-    print_trajectories(positions, len(bodies))
+    trajectory = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(num_snapshots, num_bodies, 3))
+    for index, (_, positions) in enumerate(snapshots):
+        trajectory[index] = positions
+    trajectory.flush()
 
-@measure_time_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_cython")
-def run_time_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
+def driver(bodies: List[Body], dt: float, num_steps: int) -> None:
     """
-    Runs the N-Body simulation and measures the time taken.
+    Initializes the bodies, runs the N-Body simulation, and prints the results.
     """
-    driver(bodies, dt, num_steps)
+    input_data = __default__["nbody"]
+    every = input_data["sample_every"]
+    # The simulation moves the bodies, so every run starts from a copy of the initial state
+    bodies = [Body(body.mass, np.array(body.position), np.array(body.velocity)) for body in bodies]
+
+    # Run the simulation (lazily: writing to trajectory_file is part of this phase)
+    mark("simulate")
+    if input_data["method"] == "barnes-hut":
+        snapshots = iterate_nbody_barnes_hut(bodies, dt, num_steps, input_data["theta"], every)
+    else:
+        snapshots = iterate_nbody(bodies, dt, num_steps, every)
+
+    if input_data["trajectory_file"]:
+        save_trajectories(snapshots, input_data["trajectory_file"], len(range(0, num_steps, every)), len(bodies))
+        return
+
+    # Output the results, keeping only the last trajectory_window snapshots (all if None)
+    kept = deque(snapshots, maxlen=input_data["trajectory_window"])
+    mark("output")
+    print_trajectories([positions for _, positions in kept], len(bodies), [step for step, _ in kept])
 
-@measure_energy_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_cython")
-def run_energy_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
+@measure(n=__default__["nbody"]["test_n"], csv_filename="nbody_cython")
+def run_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
     """
-    Runs the N-Body simulation and measures the energy consumed.
+    Runs the N-Body simulation and measures the energy consumed and the time taken.
     """
     driver(bodies, dt, num_steps)
 
@@ -61,6 +90,5 @@ if __name__ == "__main__":
     dt = __default__["nbody"]["dt"]
     num_steps = __default__["nbody"]["time_steps"]
 
-    # Run the energy benchmark
-    run_energy_benchmark(bodies, dt, num_steps)
-    run_time_benchmark(bodies, dt, num_steps)
+    # Run the benchmark
+    run_benchmark(bodies, dt, num_steps)
@@ -1,6 +1,7 @@
 # nbody_sim.pyx
 import cython
-from libc.math cimport sqrt
+from libc.math cimport sqrt, fabs
+from libc.stdlib cimport malloc, realloc, free
 
 cdef double G = 6.67430e-11  # Gravitational constant
 
@@ -46,45 +47,266 @@ cdef void compute_gravitational_force(Body body1, Body body2, double[:] result):
     result[2] = force_magnitude * dz / distance
 
 
-cpdef simulate_nbody(list bodies, double dt, int num_steps):
+cdef list snapshot(list bodies):
+    # Positions of the bodies as nested lists
+    cdef Body body
+    cdef list positions = []
+    for body in bodies:
+        positions.append([body.position[0], body.position[1], body.position[2]])
+    return positions
+
+
+cdef void step_direct(list bodies, double dt, double[:, :] forces):
+    # One Euler step, summing the force of every body on every other
     cdef int num_bodies = len(bodies)
-    cdef int step, i, j, k
+    cdef int i, j, k
+    cdef double[3] force
 
-    cdef double[:, :, :] positions = cython.view.array(
-        shape=(num_steps, num_bodies, 3), itemsize=cython.sizeof(double), format="d")
+    for i in range(num_bodies):
+        for k in range(3):
+            forces[i, k] = 0.0
 
-    cdef double[:, :] forces = cython.view.array(
-        shape=(num_bodies, 3), itemsize=cython.sizeof(double), format="d")
+    for i in range(num_bodies):
+        for j in range(num_bodies):
+            if i != j:
+                compute_gravitational_force(bodies[i], bodies[j], force)
+                for k in range(3):
+                    forces[i, k] += force[k]
+
+    for i in range(num_bodies):
+        bodies[i].update_velocity(forces[i], dt)
+        bodies[i].update_position(dt)
 
-    cdef double[3] force
+
+def iterate_nbody(list bodies, double dt, int num_steps, int every=1):
+    # Yields (step, positions) at the start of every `every`-th step; only that snapshot is held
+    cdef int step
+    cdef double[:, :] forces = cython.view.array(
+        shape=(max(len(bodies), 1), 3), itemsize=cython.sizeof(double), format="d")
 
     for step in range(num_steps):
-        for i in range(num_bodies):
-            for k in range(3):
-                positions[step, i, k] = bodies[i].position[k]
+        if step % every == 0:
+            yield step, snapshot(bodies)
+        step_direct(bodies, dt, forces)
 
-        for i in range(num_bodies):
-            for k in range(3):
-                forces[i, k] = 0.0
 
-        for i in range(num_bodies):
-            for j in range(num_bodies):
-                if i != j:
-                    compute_gravitational_force(bodies[i], bodies[j], force)
+def simulate_nbody(list bodies, double dt, int num_steps):
+    # The positions at every step (see iterate_nbody)
+    return [positions for _, positions in iterate_nbody(bodies, dt, num_steps)]
+
+
+# ---------------- Barnes-Hut ----------------
+
+cdef enum:
+    MAX_DEPTH = 64  # octree depth at which coincident bodies share a leaf
+
+cdef struct Node:
+    double center[3]
+    double half_size
+    double mass
+    double center_of_mass[3]
+    int children[8]  # node indices, -1 if empty
+    int body         # first body of a leaf, -1 if none; the rest follow in Octree.next
+    bint internal
+
+cdef struct Octree:
+    Node* nodes
+    int count
+    int capacity
+    int* next        # next body in the same leaf, -1 at the end
+    double* mass     # per body, copied from the Body objects every step
+    double* position # per body, 3 values each
+
+
+cdef int octree_node(Octree* tree, double* center, double half_size):
+    cdef Node* node
+    cdef int k
+    if tree.count == tree.capacity:
+        tree.capacity *= 2
+        tree.nodes = <Node*>realloc(tree.nodes, tree.capacity * sizeof(Node))
+    node = &tree.nodes[tree.count]
+    for k in range(3):
+        node.center[k] = center[k]
+        node.center_of_mass[k] = 0.0
+    node.half_size = half_size
+    node.mass = 0.0
+    for k in range(8):
+        node.children[k] = -1
+    node.body = -1
+    node.internal = False
+    tree.count += 1
+    return tree.count - 1
+
+
+cdef int octree_child(Octree* tree, int index, double* position):
+    # Index of the octant of node `index` containing `position`, created if needed
+    cdef int octant = 0, k, child
+    cdef double quarter
+    cdef double center[3]
+    for k in range(3):
+        if position[k] >= tree.nodes[index].center[k]:
+            octant |= 1 << k
+    if tree.nodes[index].children[octant] < 0:
+        quarter = tree.nodes[index].half_size / 2
+        for k in range(3):
+            center[k] = tree.nodes[index].center[k] + (quarter if (octant >> k) & 1 else -quarter)
+        child = octree_node(tree, center, quarter)  # may move tree.nodes
+        tree.nodes[index].children[octant] = child
+    return tree.nodes[index].children[octant]
+
+
+cdef void octree_insert(Octree* tree, int index, int b, int depth):
+    cdef Node* node
+    cdef double total
+    cdef int k, existing
+    while True:
+        node = &tree.nodes[index]
+        total = node.mass + tree.mass[b]
+        for k in range(3):
+            node.center_of_mass[k] = (node.center_of_mass[k] * node.mass + tree.position[b * 3 + k] * tree.mass[b]) / total
+        node.mass = total
+
+        if not node.internal:
+            if node.body < 0 or depth == MAX_DEPTH:
+                tree.next[b] = node.body
+                node.body = b
+                return
+            # Split the leaf and push its body down
+            existing = node.body
+            node.body = -1
+            node.internal = True
+            octree_insert(tree, octree_child(tree, index, &tree.position[existing * 3]), existing, depth + 1)
+        index = octree_child(tree, index, &tree.position[b * 3])
+        depth += 1
+
+
+cdef void octree_build(Octree* tree, int num_bodies):
+    cdef double low[3]
+    cdef double high[3]
+    cdef double center[3]
+    cdef double half_size = 0.0
+    cdef int i, k
+    for k in range(3):
+        low[k] = high[k] = tree.position[k]
+    for i in range(1, num_bodies):
+        for k in range(3):
+            low[k] = min(low[k], tree.position[i * 3 + k])
+            high[k] = max(high[k], tree.position[i * 3 + k])
+    for k in range(3):
+        center[k] = (low[k] + high[k]) / 2
+        half_size = max(half_size, (high[k] - low[k]) / 2)
+    if half_size == 0:
+        half_size = 1.0
+
+    tree.count = 0
+    octree_node(tree, center, half_size * (1 + 1e-9))
+    for i in range(num_bodies):
+        octree_insert(tree, 0, i, 0)
+
+
+cdef void compute_barnes_hut_force(Octree* tree, int b, double theta, double* result):
+    # Force on body b: cubes smaller than theta times their distance act as one mass
+    cdef int stack[8 * (MAX_DEPTH + 2)]
+    cdef int top = 0, other, k
+    cdef Node* node
+    cdef double* position = &tree.position[b * 3]
+    cdef double direction[3]
+    cdef double distance, force_magnitude
+    cdef bint inside
+
+    for k in range(3):
+        result[k] = 0.0
+    stack[top] = 0
+    top += 1
+    while top > 0:
+        top -= 1
+        node = &tree.nodes[stack[top]]
+        if not node.internal:
+            other = node.body
+            while other >= 0:
+                if other != b:
+                    distance = 0.0
                     for k in range(3):
-                        forces[i, k] += force[k]
+                        direction[k] = tree.position[other * 3 + k] - position[k]
+                        distance += direction[k] * direction[k]
+                    distance = sqrt(distance)
+                    if distance != 0:
+                        force_magnitude = G * tree.mass[b] * tree.mass[other] / (distance * distance)
+                        for k in range(3):
+                            result[k] += force_magnitude * direction[k] / distance
+                other = tree.next[other]
+            continue
 
-        for i in range(num_bodies):
-            bodies[i].update_velocity(forces[i], dt)
-            bodies[i].update_position(dt)
+        distance = 0.0
+        inside = True
+        for k in range(3):
+            direction[k] = node.center_of_mass[k] - position[k]
+            distance += direction[k] * direction[k]
+            if fabs(position[k] - node.center[k]) > node.half_size:
+                inside = False
+        distance = sqrt(distance)
+
+        if 2 * node.half_size < theta * distance and not inside:
+            force_magnitude = G * tree.mass[b] * node.mass / (distance * distance)
+            for k in range(3):
+                result[k] += force_magnitude * direction[k] / distance
+        else:
+            for k in range(8):
+                if node.children[k] >= 0:
+                    stack[top] = node.children[k]
+                    top += 1
+
+
+cdef void step_barnes_hut(list bodies, double dt, double theta, Octree* tree, double[:, :] forces):
+    # One Euler step, with the forces from the octree of the current positions
+    cdef int num_bodies = len(bodies)
+    cdef int i, k
+    cdef Body body
+    cdef double[3] force
+
+    for i in range(num_bodies):
+        body = bodies[i]
+        tree.mass[i] = body.mass
+        for k in range(3):
+            tree.position[i * 3 + k] = body.position[k]
+
+    octree_build(tree, num_bodies)
+    for i in range(num_bodies):
+        compute_barnes_hut_force(tree, i, theta, force)
+        for k in range(3):
+            forces[i, k] = force[k]
+
+    for i in range(num_bodies):
+        bodies[i].update_velocity(forces[i], dt)
+        bodies[i].update_position(dt)
+
+
+def iterate_nbody_barnes_hut(list bodies, double dt, int num_steps, double theta, int every=1):
+    # As iterate_nbody, with Barnes-Hut forces
+    cdef int num_bodies = len(bodies)
+    cdef int step
+    cdef Octree tree
+    cdef double[:, :] forces = cython.view.array(
+        shape=(max(num_bodies, 1), 3), itemsize=cython.sizeof(double), format="d")
+
+    tree.count = 0
+    tree.capacity = 2 * num_bodies + 1
+    tree.nodes = <Node*>malloc(tree.capacity * sizeof(Node))
+    tree.next = <int*>malloc(num_bodies * sizeof(int))
+    tree.mass = <double*>malloc(num_bodies * sizeof(double))
+    tree.position = <double*>malloc(num_bodies * 3 * sizeof(double))
+    try:
+        for step in range(num_steps):
+            if step % every == 0:
+                yield step, snapshot(bodies)
+            step_barnes_hut(bodies, dt, theta, &tree, forces)
+    finally:
+        free(tree.nodes)
+        free(tree.next)
+        free(tree.mass)
+        free(tree.position)
 
-    # Convert memoryview to nested list of lists of lists
-    result = []
-    for step in range(num_steps):
-        step_data = []
-        for i in range(num_bodies):
-            body_pos = [positions[step, i, 0], positions[step, i, 1], positions[step, i, 2]]
-            step_data.append(body_pos)
-        result.append(step_data)
 
-    return result
+def simulate_nbody_barnes_hut(list bodies, double dt, int num_steps, double theta):
+    # The positions at every step (see iterate_nbody_barnes_hut)
+    return [positions for _, positions in iterate_nbody_barnes_hut(bodies, dt, num_steps, theta)]
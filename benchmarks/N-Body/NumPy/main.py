@@ -0,0 +1,243 @@
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+
+import numpy as np
+
+from energy_module.measure import measure
+from energy_module.sampler import mark
+from input import __default__
+
+
+# Constants
+G = __default__["nbody"]["G"]  # Gravitational constant (m^3 kg^-1 s^-2)
+# Pairs evaluated at a time, which bounds the per-pair temporaries (about 100 MB) whatever the body count
+PAIR_CHUNK = 1 << 20
+# Force methods this variant implements (no Barnes-Hut)
+METHODS = ("direct",)
+
+
+def pair_blocks(n: int, chunk: int = PAIR_CHUNK) -> List[Tuple[int, int]]:
+    """
+    Splits bodies 0..n-1 into ranges [start, stop) of consecutive first
+    bodies whose pairs (first < second) number at most `chunk`, or a single
+    first body if it alone has more.
+    """
+    blocks = []
+    start, pairs = 0, 0
+    for row in range(n):
+        if pairs and pairs + n - 1 - row > chunk:
+            blocks.append((start, row))
+            start, pairs = row, 0
+        pairs += n - 1 - row
+    if start < n:
+        blocks.append((start, n))
+    return blocks
+
+
+class Bodies:
+    """
+    All bodies of the N-Body simulation as NumPy arrays.
+
+    Attributes:
+        mass (np.ndarray): Mass of each body (in kg), shape (n,).
+        position (np.ndarray): Position of each body (in meters), shape (n, 3).
+        velocity (np.ndarray): Velocity of each body (in meters per second), shape (n, 3).
+        blocks (List[Tuple[int, int]]): Ranges of first bodies whose pairs are evaluated together.
+    """
+    def __init__(self, masses: List[float], positions: List[List[float]], velocities: List[List[float]]) -> None:
+        """
+        Initializes the arrays from per-body masses, positions and velocities.
+
+        Args:
+            masses (List[float]): Mass of each body in kg.
+            positions (List[List[float]]): Initial position of each body as a 3D vector.
+            velocities (List[List[float]]): Initial velocity of each body as a 3D vector.
+        """
+        self.mass = np.array(masses, dtype=np.float64)
+        self.position = np.array(positions, dtype=np.float64)
+        self.velocity = np.array(velocities, dtype=np.float64)
+        self.blocks = pair_blocks(len(self.mass))
+        # The pairs of a single block are kept; with more blocks they are rebuilt as needed, block by block
+        self._pairs = None
+        if len(self.blocks) == 1:
+            self._pairs = self.pairs(*self.blocks[0])
+
+    def __len__(self) -> int:
+        return len(self.mass)
+
+    def pairs(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the indices (first, second) of every pair whose first body is
+        in [start, stop), in the order of np.triu_indices, and G * m1 * m2 of
+        each pair.
+        """
+        if self._pairs is not None:
+            return self._pairs
+        n = len(self.mass)
+        rows = np.arange(start, stop)
+        counts = n - 1 - rows
+        first = np.repeat(rows, counts)
+        second = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first + 1
+        return first, second, G * self.mass[first] * self.mass[second]
+
+    def copy(self) -> "Bodies":
+        """
+        Returns an independent copy of the bodies, e.g. the initial state for another run.
+        """
+        return Bodies(self.mass, self.position, self.velocity)
+
+
+def compute_forces(bodies: Bodies) -> np.ndarray:
+    """
+    Computes the net gravitational force on every body.
+
+    Each pair is evaluated once, up to PAIR_CHUNK pairs at a time; its
+    force is added to the first body and subtracted from the second
+    (Newton's third law).
+
+    Args:
+        bodies (Bodies): The bodies.
+
+    Returns:
+        np.ndarray: The force (in Newtons) on each body, shape (n, 3).
+    """
+    n = len(bodies)
+    forces = np.zeros((n, 3))
+    for start, stop in bodies.blocks:
+        first, second, pair_mass = bodies.pairs(start, stop)
+        delta = bodies.position[second] - bodies.position[first]
+        distance_squared = np.einsum('ij,ij->i', delta, delta)
+
+        # |F| / distance, zero for overlapping bodies
+        scale = np.zeros_like(distance_squared)
+        np.divide(pair_mass, distance_squared * np.sqrt(distance_squared), out=scale, where=distance_squared != 0)
+        pair_force = delta * scale[:, None]
+
+        for axis in range(3):
+            forces[:, axis] += (np.bincount(first, pair_force[:, axis], minlength=n)
+                                - np.bincount(second, pair_force[:, axis], minlength=n))
+    return forces
+
+
+def iterate_nbody(bodies: Bodies, dt: float, num_steps: int,
+                  every: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Simulates the motion of N bodies under mutual gravitational attraction using Euler's method,
+    yielding a snapshot of the positions every `every` steps.
+
+    Only the snapshot being yielded is held, so memory does not grow with num_steps.
+
+    Args:
+        bodies (Bodies): The bodies of the system, updated in place.
+        dt (float): The time step (in seconds) for the simulation.
+        num_steps (int): The number of steps to simulate.
+        every (int): Steps between two snapshots.
+
+    Yields:
+        Tuple[int, np.ndarray]: The step (from 0) and a copy of the positions at its start, shape (n, 3).
+    """
+    scale = dt / bodies.mass[:, None]
+
+    for step in range(num_steps):
+        # Take a snapshot of the positions of each body at this time step
+        if step % every == 0:
+            yield step, bodies.position.copy()
+
+        # Update velocities and positions of bodies
+        bodies.velocity += compute_forces(bodies) * scale
+        bodies.position += bodies.velocity * dt
+
+
+def simulate_nbody(bodies: Bodies, dt: float, num_steps: int) -> np.ndarray:
+    """
+    Simulates the motion of N bodies and keeps the positions at every time step (see iterate_nbody).
+
+    Returns:
+        np.ndarray: The position of each body at each time step, shape (num_steps, n, 3).
+    """
+    positions = np.empty((num_steps, len(bodies), 3))
+    for step, snapshot in iterate_nbody(bodies, dt, num_steps):
+        positions[step] = snapshot
+    return positions
+
+
+def save_trajectories(snapshots: Iterator[Tuple[int, np.ndarray]], path: str,
+                      num_snapshots: int, num_bodies: int) -> None:
+    """
+    Streams the snapshots into the .npy file `path`, shape (num_snapshots, num_bodies, 3).
+
+    The file is written through a memory map, one snapshot at a time, so
+    memory does not grow with the number of snapshots.
+    """
+    trajectory = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(num_snapshots, num_bodies, 3))
+    for index, (_, positions) in enumerate(snapshots):
+        trajectory[index] = positions
+    trajectory.flush()
+
+
+def print_trajectories(positions: np.ndarray, num_bodies: int, steps: Optional[List[int]] = None) -> None:
+    """
+    Prints the positions of each body at each time step.
+
+    Args:
+        positions (np.ndarray): The position of each body at each time step.
+        num_bodies (int): The number of bodies in the simulation.
+        steps (Optional[List[int]]): The step (from 0) of each entry of positions, if not every step.
+    """
+    if steps is None:
+        steps = range(len(positions))
+    for body_index in range(num_bodies):
+        print(f"Trajectory of Body {body_index + 1}:")
+        for step, pos in zip(steps, positions[:, body_index].tolist()):
+            print(f"Step {step + 1}: Position = {pos}")
+        print()
+
+def driver(bodies: Bodies, dt: float, num_steps: int) -> None:
+    """
+        Runs the N-Body simulation and prints the results.
+    """
+    input_data = __default__["nbody"]
+    if input_data["method"] not in METHODS:
+        raise ValueError(f"Unknown method '{input_data['method']}' for the NumPy variant. Available: {', '.join(METHODS)}")
+    every = input_data["sample_every"]
+    # The simulation moves the bodies, so every run starts from a copy of the initial state
+    bodies = bodies.copy()
+
+    # Run the simulation (lazily: writing to trajectory_file is part of this phase)
+    mark("simulate")
+    snapshots = iterate_nbody(bodies, dt, num_steps, every)
+
+    if input_data["trajectory_file"]:
+        save_trajectories(snapshots, input_data["trajectory_file"], len(range(0, num_steps, every)), len(bodies))
+        return
+
+    # Output the results, keeping only the last trajectory_window snapshots (all if None)
+    kept = deque(snapshots, maxlen=input_data["trajectory_window"])
+    mark("output")
+    positions = np.array([positions for _, positions in kept]).reshape(len(kept), len(bodies), 3)
+    print_trajectories(positions, len(bodies), [step for step, _ in kept])
+
+@measure(n=__default__["nbody"]["test_n"], csv_filename="nbody_numpy")
+def run_benchmark(bodies: Bodies, dt: float, num_steps: int) -> None:
+    """
+    Runs the N-Body simulation and measures the energy consumed and the time taken.
+    """
+    driver(bodies, dt, num_steps)
+
+
+if __name__ == "__main__":
+    bodies = Bodies(
+        [body["mass"] for body in __default__["nbody"]["bodies"]],
+        [body["position"] for body in __default__["nbody"]["bodies"]],
+        [body["velocity"] for body in __default__["nbody"]["bodies"]],
+    )
+
+    # Run the simulation
+    dt = __default__["nbody"]["dt"]
+    num_steps = __default__["nbody"]["time_steps"]
+
+    # Run the benchmark
+    run_benchmark(bodies, dt, num_steps)
@@ -0,0 +1,242 @@
+import math
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+
+from energy_module.measure import measure
+from energy_module.sampler import mark
+from input import __default__
+
+
+# Constants
+G = __default__["nbody"]["G"]  # Gravitational constant (m^3 kg^-1 s^-2)
+# Force methods this variant implements (no Barnes-Hut)
+METHODS = ("direct",)
+
+class Bodies:
+    """
+    All bodies of the N-Body simulation in a structure-of-arrays layout.
+
+    Instead of one object per body holding its own lists, every quantity is
+    one contiguous array of doubles indexed by body, so the simulation loops
+    read plain floats and never allocate per-body vectors.
+
+    Attributes:
+        mass (array): Mass of each body (in kg).
+        x, y, z (array): Position components of each body (in meters).
+        vx, vy, vz (array): Velocity components of each body (in meters per second).
+    """
+    def __init__(self, masses: List[float], positions: List[List[float]], velocities: List[List[float]]) -> None:
+        """
+        Initializes the arrays from per-body masses, positions and velocities.
+
+        Args:
+            masses (List[float]): Mass of each body in kg.
+            positions (List[List[float]]): Initial position of each body as a 3D vector.
+            velocities (List[List[float]]): Initial velocity of each body as a 3D vector.
+        """
+        self.mass = array('d', masses)
+        self.x, self.y, self.z = (array('d', axis) for axis in zip(*positions))
+        self.vx, self.vy, self.vz = (array('d', axis) for axis in zip(*velocities))
+
+    def __len__(self) -> int:
+        return len(self.mass)
+
+    def copy(self) -> "Bodies":
+        """
+        Returns an independent copy of the bodies, e.g. the initial state for another run.
+        """
+        return Bodies(self.mass, list(zip(self.x, self.y, self.z)), list(zip(self.vx, self.vy, self.vz)))
+
+
+def compute_forces(bodies: Bodies, fx: array, fy: array, fz: array) -> None:
+    """
+    Computes the net gravitational force on every body into fx, fy, fz.
+
+    Each pair is visited once: the force on body i due to body j is added
+    to i and subtracted from j (Newton's third law), halving the work of
+    evaluating every ordered pair.
+
+    Args:
+        bodies (Bodies): The bodies.
+        fx, fy, fz (array): Force components (in Newtons), overwritten.
+    """
+    x, y, z, mass = bodies.x, bodies.y, bodies.z, bodies.mass
+    n = len(mass)
+    for i in range(n):
+        fx[i] = fy[i] = fz[i] = 0.0
+
+    for i in range(n):
+        xi, yi, zi = x[i], y[i], z[i]
+        gmi = G * mass[i]
+        fxi = fyi = fzi = 0.0
+        for j in range(i + 1, n):
+            dx = x[j] - xi
+            dy = y[j] - yi
+            dz = z[j] - zi
+            distance_squared = dx * dx + dy * dy + dz * dz
+            if distance_squared == 0:
+                continue  # Avoid division by zero if the bodies overlap
+
+            # |F| / distance, so that F = scale * (dx, dy, dz)
+            scale = gmi * mass[j] / (distance_squared * math.sqrt(distance_squared))
+            fxi += dx * scale
+            fyi += dy * scale
+            fzi += dz * scale
+            fx[j] -= dx * scale
+            fy[j] -= dy * scale
+            fz[j] -= dz * scale
+        fx[i] += fxi
+        fy[i] += fyi
+        fz[i] += fzi
+
+
+def iterate_nbody(bodies: Bodies, dt: float, num_steps: int,
+                  every: int = 1) -> Iterator[Tuple[int, List[List[float]]]]:
+    """
+    Simulates the motion of N bodies under mutual gravitational attraction using Euler's method,
+    yielding a snapshot of the positions every `every` steps.
+
+    Only the snapshot being yielded is held, so memory does not grow with num_steps.
+
+    Args:
+        bodies (Bodies): The bodies of the system, updated in place.
+        dt (float): The time step (in seconds) for the simulation.
+        num_steps (int): The number of steps to simulate.
+        every (int): Steps between two snapshots.
+
+    Yields:
+        Tuple[int, List[List[float]]]: The step (from 0) and the position of each body at its start.
+    """
+    n = len(bodies)
+    x, y, z = bodies.x, bodies.y, bodies.z
+    vx, vy, vz, mass = bodies.vx, bodies.vy, bodies.vz, bodies.mass
+    fx, fy, fz = array('d', bytes(8 * n)), array('d', bytes(8 * n)), array('d', bytes(8 * n))
+
+    for step in range(num_steps):
+        # Take a snapshot of the positions of each body at this time step
+        if step % every == 0:
+            yield step, [[x[i], y[i], z[i]] for i in range(n)]
+
+        compute_forces(bodies, fx, fy, fz)
+
+        # Update velocities and positions of bodies
+        for i in range(n):
+            scale = dt / mass[i]
+            vx[i] += fx[i] * scale
+            vy[i] += fy[i] * scale
+            vz[i] += fz[i] * scale
+            x[i] += vx[i] * dt
+            y[i] += vy[i] * dt
+            z[i] += vz[i] * dt
+
+
+def simulate_nbody(bodies: Bodies, dt: float, num_steps: int) -> List[List[List[float]]]:
+    """
+    Simulates the motion of N bodies and keeps the positions at every time step (see iterate_nbody).
+
+    Returns:
+        List[List[List[float]]]: A list of positions for each body at each time step.
+    """
+    return [positions for _, positions in iterate_nbody(bodies, dt, num_steps)]
+
+
+class TrajectoryWriter:
+    """
+    Streams snapshots to a NumPy .npy file of shape (num_snapshots, num_bodies, 3).
+
+    The header is written up front, then each snapshot is appended as raw
+    doubles when it arrives, so only one snapshot is in memory at a time.
+    The file can be read with numpy.load (or memory-mapped with mmap_mode="r").
+    """
+    def __init__(self, path: str, num_snapshots: int, num_bodies: int) -> None:
+        descr = "<f8" if sys.byteorder == "little" else ">f8"
+        header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({num_snapshots}, {num_bodies}, 3), }}"
+        # Magic, version 1.0, header length; the header is padded so the data starts at a multiple of 64
+        header += " " * (63 - (10 + len(header)) % 64) + "\n"
+        self.file = open(path, "wb")
+        self.file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+
+    def write(self, positions: List[List[float]]) -> None:
+        array('d', [coordinate for position in positions for coordinate in position]).tofile(self.file)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def print_trajectories(positions: List[List[List[float]]], num_bodies: int,
+                       steps: Optional[List[int]] = None) -> None:
+    """
+    Prints the positions of each body at each time step.
+
+    Args:
+        positions (List[List[List[float]]]): A list of positions for each body at each time step.
+        num_bodies (int): The number of bodies in the simulation.
+        steps (Optional[List[int]]): The step (from 0) of each entry of positions, if not every step.
+    """
+    if steps is None:
+        steps = range(len(positions))
+    for body_index in range(num_bodies):
+        print(f"Trajectory of Body {body_index + 1}:")
+        for step, position in zip(steps, positions):
+            pos = position[body_index]
+            print(f"Step {step + 1}: Position = {pos}")
+        print()
+
+def driver(bodies: Bodies, dt: float, num_steps: int) -> None:
+    """
+        Runs the N-Body simulation and prints the results.
+    """
+    input_data = __default__["nbody"]
+    if input_data["method"] not in METHODS:
+        raise ValueError(f"Unknown method '{input_data['method']}' for the SoA variant. Available: {', '.join(METHODS)}")
+    every = input_data["sample_every"]
+    # The simulation moves the bodies, so every run starts from a copy of the initial state
+    bodies = bodies.copy()
+
+    # Run the simulation (lazily: writing to trajectory_file is part of this phase)
+    mark("simulate")
+    snapshots = iterate_nbody(bodies, dt, num_steps, every)
+
+    if input_data["trajectory_file"]:
+        # Stream the snapshots to disk
+        with TrajectoryWriter(input_data["trajectory_file"], len(range(0, num_steps, every)), len(bodies)) as writer:
+            for _, positions in snapshots:
+                writer.write(positions)
+        return
+
+    # Output the results, keeping only the last trajectory_window snapshots (all if None)
+    kept = deque(snapshots, maxlen=input_data["trajectory_window"])
+    mark("output")
+    print_trajectories([positions for _, positions in kept], len(bodies), [step for step, _ in kept])
+
+@measure(n=__default__["nbody"]["test_n"], csv_filename="nbody_soa")
+def run_benchmark(bodies: Bodies, dt: float, num_steps: int) -> None:
+    """
+    Runs the N-Body simulation and measures the energy consumed and the time taken.
+    """
+    driver(bodies, dt, num_steps)
+
+
+if __name__ == "__main__":
+    bodies = Bodies(
+        [body["mass"] for body in __default__["nbody"]["bodies"]],
+        [body["position"] for body in __default__["nbody"]["bodies"]],
+        [body["velocity"] for body in __default__["nbody"]["bodies"]],
+    )
+
+    # Run the simulation
+    dt = __default__["nbody"]["dt"]
+    num_steps = __default__["nbody"]["time_steps"]
+
+    # Run the benchmark
+    run_benchmark(bodies, dt, num_steps)
@@ -1,11 +1,13 @@
 import math
-from typing import List
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.sampler import mark
 from input import __default__
 
 
@@ -88,78 +90,256 @@ def compute_gravitational_force(body1: Body, body2: Body) -> List[float]:
     return force
 
 
-def simulate_nbody(bodies: List[Body], dt: float, num_steps: int) -> List[List[List[float]]]:
+# Octree depth at which coincident bodies share a leaf instead of splitting further
+MAX_DEPTH = 64
+
+class OctreeNode:
+    """
+    A cube of space in the Barnes-Hut octree.
+
+    Attributes:
+        center (List[float]): Center of the cube (in meters).
+        half_size (float): Half the edge length of the cube (in meters).
+        mass (float): Total mass of the bodies inside (in kg).
+        center_of_mass (List[float]): Center of mass of the bodies inside.
+        bodies (List[Body]): The bodies of a leaf (usually one).
+        children (Optional[List[Optional[OctreeNode]]]): The eight octants of an internal node.
     """
-    Simulates the motion of N bodies under mutual gravitational attraction using Euler's method.
+    __slots__ = ("center", "half_size", "mass", "center_of_mass", "bodies", "children")
+
+    def __init__(self, center: List[float], half_size: float) -> None:
+        self.center = center
+        self.half_size = half_size
+        self.mass = 0.0
+        self.center_of_mass = [0.0, 0.0, 0.0]
+        self.bodies = []
+        self.children = None
+
+    def contains(self, position: List[float]) -> bool:
+        return all(abs(p - c) <= self.half_size for p, c in zip(position, self.center))
+
+    def child(self, position: List[float]) -> "OctreeNode":
+        """
+        Returns the octant containing the position, creating it if needed.
+        """
+        octant = 0
+        for axis in range(3):
+            if position[axis] >= self.center[axis]:
+                octant |= 1 << axis
+        if self.children[octant] is None:
+            quarter = self.half_size / 2
+            center = [c + (quarter if octant >> axis & 1 else -quarter) for axis, c in enumerate(self.center)]
+            self.children[octant] = OctreeNode(center, quarter)
+        return self.children[octant]
+
+    def insert(self, body: Body, depth: int = 0) -> None:
+        """
+        Adds a body to this cube, splitting a leaf into octants when needed.
+        """
+        total = self.mass + body.mass
+        self.center_of_mass = [(c * self.mass + p * body.mass) / total
+                               for c, p in zip(self.center_of_mass, body.position)]
+        self.mass = total
+
+        if self.children is None:
+            if not self.bodies or depth == MAX_DEPTH:
+                self.bodies.append(body)
+                return
+            self.children = [None] * 8
+            for existing in self.bodies:
+                self.child(existing.position).insert(existing, depth + 1)
+            self.bodies = []
+        self.child(body.position).insert(body, depth + 1)
+
+
+def build_octree(bodies: List[Body]) -> OctreeNode:
+    """
+    Builds the Barnes-Hut octree of the bodies' current positions.
 
     Args:
-        bodies (List[Body]): A list of Body objects representing the celestial bodies in the system.
-        dt (float): The time step (in seconds) for the simulation.
-        num_steps (int): The number of steps to simulate.
+        bodies (List[Body]): The bodies.
 
     Returns:
-        List[List[List[float]]]: A list of positions for each body at each time step.
+        OctreeNode: The root, a cube enclosing every body.
     """
-    positions = []
+    low = [min(body.position[axis] for body in bodies) for axis in range(3)]
+    high = [max(body.position[axis] for body in bodies) for axis in range(3)]
+    half_size = max(h - l for l, h in zip(low, high)) / 2 or 1.0
+    root = OctreeNode([(l + h) / 2 for l, h in zip(low, high)], half_size * (1 + 1e-9))
+    for body in bodies:
+        root.insert(body)
+    return root
 
-    for step in range(num_steps):
-        # Store the positions of each body at this time step
-        positions.append([body.position[:] for body in bodies])
 
-        # Calculate the forces and update velocities and positions
-        forces = [[0.0, 0.0, 0.0] for _ in bodies]  # Initialize forces as zero vectors
+def compute_barnes_hut_force(root: OctreeNode, body: Body, theta: float) -> List[float]:
+    """
+    Computes the net gravitational force on a body using the Barnes-Hut approximation.
+
+    A cube whose edge length over its distance from the body is below
+    theta (and which does not contain the body) acts as a single mass at
+    its center of mass; other cubes are opened. theta = 0 gives the direct sum.
+
+    Args:
+        root (OctreeNode): The octree of all bodies.
+        body (Body): The body the force acts on.
+        theta (float): The opening angle.
+
+    Returns:
+        List[float]: The gravitational force vector (in Newtons) acting on the body.
+    """
+    force = [0.0, 0.0, 0.0]
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.children is None:
+            for other in node.bodies:
+                if other is not body:
+                    force = [f + new_f for f, new_f in zip(force, compute_gravitational_force(body, other))]
+            continue
+
+        distance = math.sqrt(sum((c - p) ** 2 for c, p in zip(node.center_of_mass, body.position)))
+        if 2 * node.half_size < theta * distance and not node.contains(body.position):
+            force_magnitude = G * body.mass * node.mass / distance ** 2
+            force = [f + force_magnitude * (c - p) / distance
+                     for f, c, p in zip(force, node.center_of_mass, body.position)]
+        else:
+            stack.extend(child for child in node.children if child is not None)
+    return force
 
-        # Calculate forces between each pair of bodies
-        for i, body1 in enumerate(bodies):
-            for j, body2 in enumerate(bodies):
-                if i != j:
-                    force = compute_gravitational_force(body1, body2)
-                    forces[i] = [f + new_f for f, new_f in zip(forces[i], force)]
+
+def iterate_nbody(bodies: List[Body], dt: float, num_steps: int, method: str = "direct",
+                  theta: float = 0.5, every: int = 1) -> Iterator[Tuple[int, List[List[float]]]]:
+    """
+    Simulates the motion of N bodies under mutual gravitational attraction using Euler's method,
+    yielding a snapshot of the positions every `every` steps.
+
+    Only the snapshot being yielded is held, so memory does not grow with num_steps.
+
+    Args:
+        bodies (List[Body]): A list of Body objects representing the celestial bodies in the system.
+        dt (float): The time step (in seconds) for the simulation.
+        num_steps (int): The number of steps to simulate.
+        method (str): "direct" sums the force of every body on every other (O(N^2) per step),
+            "barnes-hut" approximates distant groups through an octree (O(N log N) per step).
+        theta (float): The Barnes-Hut opening angle.
+        every (int): Steps between two snapshots.
+
+    Yields:
+        Tuple[int, List[List[float]]]: The step (from 0) and the position of each body at its start.
+    """
+    for step in range(num_steps):
+        # Take a snapshot of the positions of each body at this time step
+        if step % every == 0:
+            yield step, [body.position[:] for body in bodies]
+
+        if method == "barnes-hut":
+            root = build_octree(bodies)
+            forces = [compute_barnes_hut_force(root, body, theta) for body in bodies]
+        else:
+            # Calculate the forces and update velocities and positions
+            forces = [[0.0, 0.0, 0.0] for _ in bodies]  # Initialize forces as zero vectors
+
+            # Calculate forces between each pair of bodies
+            for i, body1 in enumerate(bodies):
+                for j, body2 in enumerate(bodies):
+                    if i != j:
+                        force = compute_gravitational_force(body1, body2)
+                        forces[i] = [f + new_f for f, new_f in zip(forces[i], force)]
 
         # Update velocities and positions of bodies
         for i, body in enumerate(bodies):
             body.update_velocity(forces[i], dt)
             body.update_position(dt)
 
-    return positions
 
+def simulate_nbody(bodies: List[Body], dt: float, num_steps: int,
+                   method: str = "direct", theta: float = 0.5) -> List[List[List[float]]]:
+    """
+    Simulates the motion of N bodies and keeps the positions at every time step (see iterate_nbody).
+
+    Returns:
+        List[List[List[float]]]: A list of positions for each body at each time step.
+    """
+    return [positions for _, positions in iterate_nbody(bodies, dt, num_steps, method, theta)]
+
+
+class TrajectoryWriter:
+    """
+    Streams snapshots to a NumPy .npy file of shape (num_snapshots, num_bodies, 3).
+
+    The header is written up front, then each snapshot is appended as raw
+    doubles when it arrives, so only one snapshot is in memory at a time.
+    The file can be read with numpy.load (or memory-mapped with mmap_mode="r").
+    """
+    def __init__(self, path: str, num_snapshots: int, num_bodies: int) -> None:
+        descr = "<f8" if sys.byteorder == "little" else ">f8"
+        header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({num_snapshots}, {num_bodies}, 3), }}"
+        # Magic, version 1.0, header length; the header is padded so the data starts at a multiple of 64
+        header += " " * (63 - (10 + len(header)) % 64) + "\n"
+        self.file = open(path, "wb")
+        self.file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+
+    def write(self, positions: List[List[float]]) -> None:
+        array('d', [coordinate for position in positions for coordinate in position]).tofile(self.file)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
-def print_trajectories(positions: List[List[List[float]]], num_bodies: int) -> None:
+
+def print_trajectories(positions: List[List[List[float]]], num_bodies: int,
+                       steps: Optional[List[int]] = None) -> None:
     """
     Prints the positions of each body at each time step.
 
     Args:
         positions (List[List[List[float]]]): A list of positions for each body at each time step.
         num_bodies (int): The number of bodies in the simulation.
+        steps (Optional[List[int]]): The step (from 0) of each entry of positions, if not every step.
     """
+    if steps is None:
+        steps = range(len(positions))
     for body_index in range(num_bodies):
         print(f"Trajectory of Body {body_index + 1}:")
-        for step, position in enumerate(positions):
+        for step, position in zip(steps, positions):
             pos = position[body_index]
             print(f"Step {step + 1}: Position = {pos}")
         print()
 
-def driver(boides: List[Body], dt: float, num_steps: int) -> None:
+def driver(bodies: List[Body], dt: float, num_steps: int) -> None:
     """
         Initializes the bodies, runs the N-Body simulation, and prints the results.
     """
-    # Run the simulation
-    positions = simulate_nbody(bodies, dt, num_steps)
+    input_data = __default__["nbody"]
+    # The simulation moves the bodies, so every run starts from a copy of the initial state
+    bodies = [Body(body.mass, body.position[:], body.velocity[:]) for body in bodies]
+    every = input_data["sample_every"]
+
+    # Run the simulation (lazily: writing to trajectory_file is part of this phase)
+    mark("simulate")
+    snapshots = iterate_nbody(bodies, dt, num_steps, input_data["method"], input_data["theta"], every)
+
+    if input_data["trajectory_file"]:
+        # Stream the snapshots to disk
+        with TrajectoryWriter(input_data["trajectory_file"], len(range(0, num_steps, every)), len(bodies)) as writer:
+            for _, positions in snapshots:
+                writer.write(positions)
+        return
+
+    # Output the results, keeping only the last trajectory_window snapshots (all if None)
+    kept = deque(snapshots, maxlen=input_data["trajectory_window"])
+    mark("output")
+    print_trajectories([positions for _, positions in kept], len(bodies), [step for step, _ in kept])
     
-    # Output the results
-    print_trajectories(positions, len(bodies))
-    
-@measure_time_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_py_compile")
-def run_time_benchmark(boides: List[Body], dt: float, num_steps: int) -> None:
-    """
-    Runs the N-Body simulation and measures the time taken.
-    """
-    driver(bodies, dt, num_steps)
-
-@measure_energy_to_csv(n=__default__["nbody"]["test_n"], csv_filename="nbody_py_compile")
-def run_energy_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
+@measure(n=__default__["nbody"]["test_n"], csv_filename="nbody_py_compile")
+def run_benchmark(bodies: List[Body], dt: float, num_steps: int) -> None:
     """
-    Runs the N-Body simulation and measures the energy consumed.
+    Runs the N-Body simulation and measures the energy consumed and the time taken.
     """
     driver(bodies, dt, num_steps)
 
@@ -174,7 +354,5 @@ if __name__ == "__main__":
     dt = __default__["nbody"]["dt"]
     num_steps = __default__["nbody"]["time_steps"]
 
-    # Run the energy benchmark
-    run_energy_benchmark(bodies, dt, num_steps)
-    # Run the time benchmark
-    run_time_benchmark(bodies, dt, num_steps)
+    # Run the benchmark
+    run_benchmark(bodies, dt, num_steps)
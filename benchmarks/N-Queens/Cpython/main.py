@@ -1,131 +1,166 @@
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 """
 Solving Approach in the Code ->
 --------------------------------
 
-# is_safe(board, row, col, n):
-    - Ensures that placing a queen at board[row][col] does not violate constraints.
-    - Checks for conflicts in the column, left diagonal, and right diagonal.
+The board is never stored: the columns and the two diagonal directions
+attacked by the queens placed so far are kept as bitmasks (bit c stands
+for column c of the current row), so finding the free squares of a row is
+one expression instead of a rescan of the board.
 
-# solve_n_queens(board, row, n, solutions):
-    - Recursively places queens in each row.
-    - Calls is_safe before placing a queen.
-    - Uses backtracking to undo incorrect placements.
+# count_from(full, cols, left, right):
+    - Counts the completions of a partial placement.
+    - Moving to the next row shifts the diagonal masks by one column.
 
-# n_queens(n):
-    - Initializes an empty board and starts the recursive backtracking process.
-    - Stores and returns all possible solutions.
+# solve_from(full, cols, left, right, queens, solutions):
+    - Same search, storing each solution as the column of the queen in every row.
 
-# print_solution(board):
-    - Converts the numerical board representation into a visual format where Q 
+# solve_first_column(n, col, count_only):
+    - Solves all boards whose first-row queen is in column col.
+
+# n_queens(n, count_only, processes):
+    - Mirror symmetry: a solution reflected left-to-right is a solution, so only
+    first-row queens in the left half (and the middle column for odd n) are
+    searched; the right half is the mirror image.
+    - The first-row columns are independent tasks, optionally run in a process pool.
+    - Returns the solutions in lexicographic order, or only their number.
+
+# print_solution(queens):
+    - Converts the column of each row's queen into a visual format where Q
     represents a queen and . represents an empty space.
 """
 
-def print_solution(board):
+def print_solution(queens):
     """
     Prints the N-Queens board configuration.
     """
-    for row in board:
-        print(" ".join("Q" if cell else "." for cell in row))
+    n = len(queens)
+    for col in queens:
+        print(" ".join("Q" if cell == col else "." for cell in range(n)))
     print("\n")
 
-def is_safe(board, row, col, n):
+def count_from(full, cols, left, right):
     """
-    Checks if placing a queen at board[row][col] is safe.
-    
+    Counts the ways to complete a partial placement.
+
     Args:
-        board (list): The current N-Queens board.
-        row (int): The row index to check.
-        col (int): The column index to check.
-        n (int): The size of the board.
-    
+        full (int): Mask of all n columns, (1 << n) - 1.
+        cols (int): Columns holding a queen.
+        left (int): Squares of the current row attacked along one diagonal direction.
+        right (int): Squares of the current row attacked along the other.
+
     Returns:
-        bool: True if it's safe, False otherwise.
+        int: The number of solutions.
     """
-    # Check this column on upper side
-    for i in range(row):
-        if board[i][col]:
-            return False
-    
-    # Check upper diagonal (left)
-    for i, j in zip(range(row, -1, -1), range(col, -1, -1)):
-        if board[i][j]:
-            return False
-    
-    # Check upper diagonal (right)
-    for i, j in zip(range(row, -1, -1), range(col, n)):
-        if board[i][j]:
-            return False
-    
-    return True
+    if cols == full:
+        return 1
+    total = 0
+    free = full & ~(cols | left | right)
+    while free:
+        bit = free & -free  # Lowest free column
+        free ^= bit
+        total += count_from(full, cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1)
+    return total
 
-def solve_n_queens(board, row, n, solutions):
+def solve_from(full, cols, left, right, queens, solutions):
     """
-    Solves the N-Queens problem using backtracking.
-    
+    Finds the ways to complete a partial placement, in lexicographic order.
+
     Args:
-        board (list): The current N-Queens board.
-        row (int): The current row being considered.
-        n (int): The size of the board.
+        full, cols, left, right (int): As for count_from.
+        queens (list): Column of the queen in each row placed so far.
         solutions (list): List to store valid solutions.
     """
-    if row == n:
-        solutions.append([row[:] for row in board])
+    if cols == full:
+        solutions.append(tuple(queens))
         return
-    
-    for col in range(n):
-        if is_safe(board, row, col, n):
-            board[row][col] = 1  # Place queen
-            solve_n_queens(board, row + 1, n, solutions)
-            board[row][col] = 0  # Backtrack
+    free = full & ~(cols | left | right)
+    while free:
+        bit = free & -free  # Lowest free column
+        free ^= bit
+        queens.append(bit.bit_length() - 1)
+        solve_from(full, cols | bit, ((left | bit) << 1) & full, (right | bit) >> 1, queens, solutions)
+        queens.pop()  # Backtrack
 
-def n_queens(n):
+def solve_first_column(n, col, count_only=False):
+    """
+    Solves the boards whose first-row queen is in column col.
+
+    Returns:
+        int or list: The number of solutions if count_only, else the solutions.
+    """
+    full = (1 << n) - 1
+    bit = 1 << col
+    if count_only:
+        return count_from(full, bit, (bit << 1) & full, bit >> 1)
+    solutions = []
+    solve_from(full, bit, (bit << 1) & full, bit >> 1, [col], solutions)
+    return solutions
+
+def _solve_first_column(task):
+    return solve_first_column(*task)
+
+def n_queens(n, count_only=False, processes=1):
     """
     Finds all possible solutions for the N-Queens problem.
-    
+
     Args:
         n (int): The size of the board.
-    
+        count_only (bool): Only count the solutions instead of building them.
+        processes (int): Worker processes for the first-row columns (1: no pool).
+
     Returns:
-        list: A list of solutions where each solution is a board configuration.
+        int or list: The number of solutions if count_only, else a list of
+        solutions, each the column of the queen in every row.
     """
-    board = [[0] * n for _ in range(n)]
-    solutions = []
-    solve_n_queens(board, 0, n, solutions)
-    return solutions
+    half = n // 2
+    tasks = [(n, col, count_only) for col in range(half + n % 2)]
+    if processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_solve_first_column, tasks))
+    else:
+        results = [_solve_first_column(task) for task in tasks]
+
+    if count_only:
+        # Every left-half solution has its mirror image in the right half
+        return 2 * sum(results[:half]) + sum(results[half:])
+
+    # Mirroring reverses the lexicographic order, so the right half is the
+    # left half mirrored and read backwards
+    mirrored = [tuple(n - 1 - col for col in queens)
+                for solutions in reversed(results[:half]) for queens in reversed(solutions)]
+    return [queens for solutions in results for queens in solutions] + mirrored
 
 def main(n):
     """
     Main function to execute the N-Queens solver.
-    
+
     Args:
         n (int): The size of the board.
     """
-    solutions = n_queens(n)
+    workload = __default__["n-queens"]
+    if workload["count_only"]:
+        print(f"Total solutions for {n}-Queens: {n_queens(n, True, workload['processes'])}")
+        return
+    solutions = n_queens(n, False, workload["processes"])
     print(f"Total solutions for {n}-Queens: {len(solutions)}")
     for sol in solutions:
         print_solution(sol)
         
-@measure_energy_to_csv(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cpython")
-def run_energy_benchmark(n: int) -> None:
-    main(n)
-
-@measure_time_to_csv(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cpython")
-def run_time_benchmark(n: int) -> None:
+@measure(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cpython")
+def run_benchmark(n: int) -> None:
     main(n)
 
 # Example usage
 if __name__ == "__main__":
     N = __default__["n-queens"]["n"]
     
-    # Run the energy benchmark
-    run_energy_benchmark(N)
-    # Run the time benchmark
-    run_time_benchmark(N)
+    # Run the benchmark
+    run_benchmark(N)
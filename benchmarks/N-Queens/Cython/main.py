@@ -2,8 +2,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 from raw import n_queens
@@ -34,19 +33,13 @@ def main(n):
     for sol in solutions:
         print_board(sol)
         
-@measure_energy_to_csv(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cython")
-def run_energy_benchmark(n: int) -> None:
-    main(n)
-
-@measure_time_to_csv(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cython")
-def run_time_benchmark(n: int) -> None:
+@measure(n=__default__["n-queens"]["test_n"], csv_filename="n_queens_cython")
+def run_benchmark(n: int) -> None:
     main(n)
 
 if __name__ == "__main__":
     N = __default__["n-queens"]["n"]
    
-    # Run the energy benchmark
-    run_energy_benchmark(N)
-    # Run the time benchmark
-    run_time_benchmark(N)
+    # Run the benchmark
+    run_benchmark(N)
 
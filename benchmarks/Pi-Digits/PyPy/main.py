@@ -3,8 +3,8 @@ import os
 import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.warmup import WarmupDetector
 from input import __default__
 
 import math
@@ -38,22 +38,14 @@ def compute_pi_gauss_legendre(iterations: int = 10) -> float:
     # Compute final Pi approximation
     return ((a + b) ** 2) / (4 * t)
 
-@measure_energy_to_csv(n=__default__["pi_digits"]["test_n"], csv_filename="pi_digits_pypy")
-def run_energy_benchmark(iterations: int) -> None:
+@measure(n=__default__["pi_digits"]["test_n"], csv_filename="pi_digits_pypy", warmup=WarmupDetector())
+def run_benchmark(iterations: int) -> None:
     pi_approx : float = compute_pi_gauss_legendre(iterations)
     print(f"Computed Pi: {pi_approx}")
     time.sleep(0.01) # Simulate some processing time
 
-@measure_time_to_csv(n=__default__["pi_digits"]["test_n"], csv_filename="pi_digits_pypy")
-def run_time_benchmark(iterations: int) -> None:
-    pi_approx : float = compute_pi_gauss_legendre(iterations)
-    print(f"Computed Pi: {pi_approx}")
-    time.sleep(0.01) # Simulate some processing time
-
-
 if __name__ == "__main__":
     ITERATIONS = __default__["pi_digits"]["iterations"]
     
-    # Run benchmarks
-    run_energy_benchmark(ITERATIONS)
-    run_time_benchmark(ITERATIONS)
+    # Run the benchmark
+    run_benchmark(ITERATIONS)
@@ -1,11 +1,11 @@
 import ctypes
+import mmap
 import sys
 import time
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 
@@ -13,33 +13,24 @@ from input import __default__
 lib = ctypes.CDLL("./libregexredux.so")  # Or "regexredux.dll" on Windows
 
 # Define argument types for the function
-lib.regex_redux.argtypes = [ctypes.c_char_p]
+lib.regex_redux.argtypes = [ctypes.c_char_p, ctypes.c_long]
 lib.regex_redux.restype = None
 
-def run_regex_redux(file_path: str):
+def run_regex_redux(fasta: mmap.mmap):
     print("Running Regex Redux from C:")
-    lib.regex_redux(file_path.encode('utf-8'))
+    lib.regex_redux(fasta[:], len(fasta))
     
-@measure_time_to_csv(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_ctypes")
-def run_time_benchmark(file_path: str) -> None:
+@measure(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_ctypes")
+def run_benchmark(fasta: mmap.mmap) -> None:
     """
-    Measure and log the time it takes to run the Regex-Redux benchmark.
+    Measure and log the energy consumption and time of the Regex-Redux benchmark.
     """
-    run_regex_redux(file_path)
-    time.sleep(0.01)
-
-@measure_energy_to_csv(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_ctypes")
-def run_energy_benchmark(file_path: str) -> None:
-    """
-    Measure and log the energy consumption of the Regex-Redux benchmark.
-    """
-    run_regex_redux(file_path)
+    run_regex_redux(fasta)
     time.sleep(0.01)
 
 
 if __name__ == "__main__":
-    file_path = __default__["regex_redux"]["file_path"]
+    fasta = __default__.mapped("regex_redux", "file_path")
 
-    # You can change this to driver(file_path) if you want plain output
-    run_energy_benchmark(file_path)
-    run_time_benchmark(file_path)
+    # You can change this to driver(fasta) if you want plain output
+    run_benchmark(fasta)
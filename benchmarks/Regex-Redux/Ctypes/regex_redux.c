@@ -4,21 +4,9 @@
 #include <regex.h>
 #include <ctype.h>
 
-// Reads the input file and returns a dynamically allocated string (no line breaks or headers)
-char* read_fasta_file(const char* filename, int* out_length) {
-    FILE* file = fopen(filename, "r");
-    if (!file) return NULL;
-
-    fseek(file, 0, SEEK_END);
-    long size = ftell(file);
-    rewind(file);
-
-    char* buffer = malloc(size + 1);
-    fread(buffer, 1, size, file);
-    buffer[size] = '\0';
-    fclose(file);
-
-    // Strip headers (lines starting with '>') and newlines
+// Strips headers (lines starting with '>') and newlines from the input file
+// contents and returns a dynamically allocated, lower-cased string
+char* read_fasta_file(const char* buffer, long size, int* out_length) {
     char* cleaned = malloc(size + 1);
     int j = 0;
     int in_header = 0;
@@ -33,7 +21,6 @@ char* read_fasta_file(const char* filename, int* out_length) {
         }
     }
     cleaned[j] = '\0';
-    free(buffer);
 
     *out_length = j;
     return cleaned;
@@ -61,9 +48,9 @@ int count_pattern(const char* sequence, const char* pattern) {
 
 // Exported C function for Python
 __attribute__((visibility("default")))
-void regex_redux(const char* filename) {
+void regex_redux(const char* fasta, long size) {
     int original_len;
-    char* sequence = read_fasta_file(filename, &original_len);
+    char* sequence = read_fasta_file(fasta, size, &original_len);
 
     if (!sequence) {
         printf("Failed to read file.\n");
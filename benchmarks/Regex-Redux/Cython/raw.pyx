@@ -1,26 +1,20 @@
 # distutils: language = c
 
-from libc.stdio cimport fopen, fgets, fclose, FILE
 import re
 
-def read_fasta_file(str file_path) -> str:
+def read_fasta_file(fasta) -> str:
     """
-    Reads a FASTA file and returns a cleaned DNA sequence.
+    Reads a memory-mapped FASTA file and returns a cleaned DNA sequence.
     """
-    cdef FILE *file = fopen(file_path.encode('utf-8'), "r")
-    if not file:
-        raise IOError("File not found")
-
-    cdef char line[4096]
+    cdef str content = str(fasta, 'ascii')
     cdef list lines = []
     cdef str pyline
 
-    while fgets(line, sizeof(line), file):
-        pyline = line.decode('utf-8').strip()
+    for pyline in content.split('\n'):
+        pyline = pyline.strip()
         if not pyline.startswith('>'):
             lines.append(pyline.lower())  # Use Python .lower()
 
-    fclose(file)
     return "".join(lines)
 
 def count_patterns(str sequence, list patterns) -> list:
@@ -46,11 +40,11 @@ def apply_substitutions(str sequence, list substitutions) -> str:
         sequence = re.sub(pattern, repl, sequence)
     return sequence
 
-def regex_redux(str file_path):
+def regex_redux(fasta):
     """
     Main function to run the regex-redux benchmark.
     """
-    sequence = read_fasta_file(file_path)
+    sequence = read_fasta_file(fasta)
     initial_len = len(sequence)
 
     patterns = [
@@ -1,21 +1,21 @@
+import mmap
 import re
 from typing import List, Tuple
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.warmup import WarmupDetector
 from input import __default__
 
 
-def read_fasta_file(file_path: str) -> str:
+def read_fasta_file(fasta: mmap.mmap) -> str:
     """
-    Reads a FASTA file and returns the DNA sequence as a single string.
-    Removes descriptions and line breaks.
+    Reads a memory-mapped FASTA file and returns the DNA sequence as a
+    single string. Removes descriptions and line breaks.
     """
-    with open(file_path, 'r') as file:
-        content = file.read()
+    content = str(fasta, 'ascii')
 
     # Remove description lines and newlines
     return re.sub(r">.*\n|\n", "", content)
@@ -38,12 +38,12 @@ def apply_substitutions(sequence: str, substitutions: List[Tuple[str, str]]) ->
         sequence = re.sub(pattern, replacement, sequence)
     return sequence
 
-def regex_redux(file_path: str) -> None:
+def regex_redux(fasta: mmap.mmap) -> None:
     """
     Main function to execute the Regex-Redux benchmark.
     """
     # Step 1: Read and clean the input sequence
-    sequence = read_fasta_file(file_path).lower()
+    sequence = read_fasta_file(fasta).lower()
     initial_length = len(sequence)
 
     # Step 2: Count the original patterns
@@ -82,24 +82,16 @@ def regex_redux(file_path: str) -> None:
     print("Cleaned Length:", len(sequence))
     print("Substituted Length:", len(modified_sequence))
 
-@measure_time_to_csv(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_pypy")
-def run_time_benchmark(file_path: str) -> None:
+@measure(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_pypy", warmup=WarmupDetector())
+def run_benchmark(fasta: mmap.mmap) -> None:
     """
-    Measure and log the time it takes to run the Regex-Redux benchmark.
+    Measure and log the energy consumption and time of the Regex-Redux benchmark.
     """
-    regex_redux(file_path)
-
-@measure_energy_to_csv(n=__default__["regex_redux"]["test_n"], csv_filename="regex_redux_pypy")
-def run_energy_benchmark(file_path: str) -> None:
-    """
-    Measure and log the energy consumption of the Regex-Redux benchmark.
-    """
-    regex_redux(file_path)
+    regex_redux(fasta)
 
 
 if __name__ == "__main__":
-    file_path = __default__["regex_redux"]["file_path"]
+    fasta = __default__.mapped("regex_redux", "file_path")
 
-    # You can change this to driver(file_path) if you want plain output
-    run_energy_benchmark(file_path)
-    run_time_benchmark(file_path)
+    # You can change this to driver(fasta) if you want plain output
+    run_benchmark(fasta)
@@ -1,9 +1,9 @@
 import sys
 import os
+import zlib
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 
 from typing import List
@@ -37,20 +37,21 @@ def reverse_complement(dna_sequence: str) -> str:
     # Generate reverse complement using list comprehension (efficient in CPython)
     return "".join(complement_map[base] for base in reversed(dna_sequence))
 
-@measure_energy_to_csv(n=__default__["reverse_complement"]["test_n"], csv_filename="reverse_complement_pycompile")
-def run_energy_benchmark(dna_sequence: str) -> None:
-    reverse_complement(dna_sequence)
-
-@measure_time_to_csv(n=__default__["reverse_complement"]["test_n"], csv_filename="reverse_complement_pycompile")
-def run_time_benchmark(dna_sequence: str) -> None:
-    reverse_complement(dna_sequence)
+def print_summary(result: bytes) -> None:
+    """
+    Print the length and CRC-32 of the reverse complement, so the output
+    digest checks the result without printing 40 MB.
+    """
+    print(f"Reverse complement: {len(result)} bases, CRC-32 {zlib.crc32(result):08x}")
 
+@measure(n=__default__["reverse_complement"]["test_n"], csv_filename="reverse_complement_pycompile")
+def run_benchmark(dna_sequence: str) -> None:
+    print_summary(reverse_complement(dna_sequence).encode("ascii"))
 
 if __name__ == "__main__":
-    # Example DNA sequence
-    dna = __default__["reverse_complement"]["dna_sequence"]
+    # Example DNA sequence, mapped read-only from the workload cache
+    dna = str(__default__.mapped("reverse_complement", "dna_sequence"), "ascii")
     
-    # Run benchmarks
-    run_energy_benchmark(dna)
-    run_time_benchmark(dna)
+    # Run the benchmark
+    run_benchmark(dna)
 
@@ -7,10 +7,10 @@ cimport cython
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cpdef List[float] multiply_matrix_vector(List[List[object]] matrix, List[object] vector):
+cpdef list multiply_matrix_vector(List[List[object]] matrix, List[object] vector):
     cdef int rows = len(matrix)
     cdef int cols = len(vector)
-    cdef List[float] result = [0.0] * rows
+    cdef list result = [0.0] * rows
     cdef int i, j
     cdef double s
 
@@ -26,9 +26,9 @@ cpdef List[float] multiply_matrix_vector(List[List[object]] matrix, List[object]
 @cython.wraparound(False)
 cpdef double spectral_norm(List[List[object]] matrix, int iterations=10):
     cdef int n = len(matrix)
-    cdef List[float] u = [1.0] * n
-    cdef List[float] v
-    cdef List[float] temp
+    cdef list u = [1.0] * n
+    cdef list v
+    cdef list temp
     cdef List[List[object]] transposed
     cdef double norm
     cdef int i, j
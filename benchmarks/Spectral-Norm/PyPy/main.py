@@ -2,8 +2,8 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
+from energy_module.warmup import WarmupDetector
 from input import __default__
 
 import math
@@ -64,20 +64,14 @@ def spectral_norm(matrix: List[List[int]], iterations=10):
     # Step 5: Calculate the spectral norm (largest singular value)
     return math.sqrt(sum(multiply_matrix_vector(matrix, u)[i] * u[i] for i in range(n)))
 
-@measure_energy_to_csv(n=__default__["spectral-norm"]["test_n"], csv_filename="spectral_norm_pypy")
-def run_energy_benchmark(matrix: List[List[int]], iterations=10) -> None:
-    spectral_norm(matrix, iterations)
+@measure(n=__default__["spectral-norm"]["test_n"], csv_filename="spectral_norm_pypy", warmup=WarmupDetector())
+def run_benchmark(matrix: List[List[int]], iterations=10) -> None:
+    print("Spectral norm:", spectral_norm(matrix, iterations))
 
-@measure_time_to_csv(n=__default__["spectral-norm"]["test_n"], csv_filename="spectral_norm_pypy")
-def run_time_benchmark(matrix: List[List[int]], iterations=10) -> None:
-    spectral_norm(matrix, iterations)
-    
-    
 if __name__ == "__main__":
     # Example matrix
     A = __default__["spectral-norm"]["matrix"]
     itr = __default__["spectral-norm"]["iterations"]
 
-    # Run the benchmarks
-    run_energy_benchmark(A, itr)
-    run_time_benchmark(A, itr)
+    # Run the benchmark
+    run_benchmark(A, itr)
@@ -6,8 +6,7 @@ import ctypes
 import numpy as np
 from input import __default__
 import argparse
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 
 from typing import List
 
@@ -22,10 +21,10 @@ lib.strassen.argtypes = [
     ctypes.c_int
 ]
 
-def flatten(matrix: List[List[int]]) -> np.ndarray:
+def flatten(matrix: memoryview) -> np.ndarray:
     return np.array(matrix, dtype=np.int32).flatten()
 
-def strassen_ctypes(A: List[List[int]], B: List[List[int]]) -> List[List[int]]:
+def strassen_ctypes(A: memoryview, B: memoryview) -> List[List[int]]:
     n = len(A)
     flat_A = flatten(A)
     flat_B = flatten(B)
@@ -46,32 +45,21 @@ def main(A, B):
     for row in C:
         print(row)
 
-@measure_energy_to_csv(n=__default__["strassen"]["test_n"], csv_filename="strassen_ctypes")
-def run_energy_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
+@measure(n=__default__["strassen"]["test_n"], csv_filename="strassen_ctypes")
+def run_benchmark(A: memoryview, B: memoryview) -> None:
     """
-    Run the energy benchmark for Strassen's matrix multiplication.
+    Run the energy and time benchmark for Strassen's matrix multiplication.
     
     Args:
-        A (List[List[int]]): First matrix.
-        B (List[List[int]]): Second matrix.
+        A (memoryview): First matrix, memory-mapped.
+        B (memoryview): Second matrix, memory-mapped.
     """
     main(A, B)
     
-@measure_time_to_csv(n=__default__["strassen"]["test_n"], csv_filename="strassen_ctypes")
-def run_time_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
-    """
-    Run the time benchmark for Strassen's matrix multiplication.
-    
-    Args:
-        A (List[List[int]]): First matrix.
-        B (List[List[int]]): Second matrix.
-    """
-    main(A, B)
-
 if __name__ == "__main__":
-    A = __default__["strassen"]["A"]
-    B = __default__["strassen"]["B"]
+    # Read-only int64 views, converted to int32 by flatten
+    A = __default__.mapped("strassen", "A")
+    B = __default__.mapped("strassen", "B")
     
-    # Run the benchmarks
-    run_energy_benchmark(A, B)
-    run_time_benchmark(A, B)
+    # Run the benchmark
+    run_benchmark(A, B)
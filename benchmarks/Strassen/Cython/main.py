@@ -2,8 +2,7 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from raw import strassen_multiplication
 from input import __default__
 
@@ -21,10 +20,10 @@ def main(A, B) -> None:
     for row in result:
         print(row)
         
-@measure_energy_to_csv(n=__default__["strassen"]["test_n"], csv_filename="strassen_cython")
-def run_energy_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
+@measure(n=__default__["strassen"]["test_n"], csv_filename="strassen_cython")
+def run_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
     """
-    Run the energy benchmark for Strassen's matrix multiplication.
+    Run the energy and time benchmark for Strassen's matrix multiplication.
     
     Args:
         A (List[List[int]]): First matrix.
@@ -32,22 +31,9 @@ def run_energy_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
     """
     main(A, B)
     
-@measure_time_to_csv(n=__default__["strassen"]["test_n"], csv_filename="strassen_cython")
-def run_time_benchmark(A: List[List[int]], B: List[List[int]]) -> None:
-    """
-    Run the time benchmark for Strassen's matrix multiplication.
-    
-    Args:
-        A (List[List[int]]): First matrix.
-        B (List[List[int]]): Second matrix.
-    """
-    main(A, B)
-
-
 if __name__ == "__main__":
-    A = __default__["strassen"]["A"]
-    B = __default__["strassen"]["B"]
+    A = __default__.mapped("strassen", "A").tolist()
+    B = __default__.mapped("strassen", "B").tolist()
     
-    # Run the benchmarks
-    run_energy_benchmark(A, B)
-    run_time_benchmark(A, B)
+    # Run the benchmark
+    run_benchmark(A, B)
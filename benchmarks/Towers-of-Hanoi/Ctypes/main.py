@@ -6,8 +6,7 @@ import ctypes
 from ctypes import c_int, c_char_p
 from input import __default__
 import argparse
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 
 # Load the shared library
 lib = ctypes.CDLL("./libhanoi.so")
@@ -24,21 +23,13 @@ def driver(n):
 
     lib.towers_of_hanoi(n, source, auxiliary, target)
     
-@measure_energy_to_csv(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_ctypes")
-def run_energy_benchmark(n):
+@measure(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_ctypes")
+def run_benchmark(n):
     """
-    Run the energy benchmark for the Towers of Hanoi problem.
+    Run the energy and time benchmark for the Towers of Hanoi problem.
     """
     driver(n)
 
-@measure_time_to_csv(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_ctypes")
-def run_time_benchmark(n):
-    """
-    Run the time benchmark for the Towers of Hanoi problem.
-    """
-    driver(n)
-
-
 if __name__ == "__main__":
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Solve the Towers of Hanoi problem.")
@@ -51,6 +42,5 @@ if __name__ == "__main__":
     # Get the number of disks from the arguments or use the default value
     n = args.num_disks
     
-    # Run the benchmarks
-    run_energy_benchmark(n)
-    run_time_benchmark(n)
+    # Run the benchmark
+    run_benchmark(n)
@@ -17,8 +17,7 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../")))
 
-from energy_module.decorator import measure_energy_to_csv
-from time_modules.decorator import measure_time_to_csv
+from energy_module.measure import measure
 from input import __default__
 import argparse
 
@@ -60,17 +59,10 @@ def main(n):
     except ValueError as e:
         print(f"Error: {e}")
 
-@measure_energy_to_csv(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_pycompile")
-def run_energy_benchmark(n):
+@measure(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_pycompile")
+def run_benchmark(n):
     """
-    Run the energy benchmark for the Towers of Hanoi problem.
-    """
-    main(n)
-
-@measure_time_to_csv(n=__default__["hanoi"]["test_n"], csv_filename="hanoi_pycompile")
-def run_time_benchmark(n):
-    """
-    Run the time benchmark for the Towers of Hanoi problem.
+    Run the energy and time benchmark for the Towers of Hanoi problem.
     """
     main(n)
 
@@ -86,6 +78,5 @@ if __name__ == "__main__":
     # Get the number of disks from the arguments or use the default value
     n = args.num_disks
     
-    # Run the benchmarks
-    run_energy_benchmark(n)
-    run_time_benchmark(n)
+    # Run the benchmark
+    run_benchmark(n)
@@ -0,0 +1,84 @@
+import argparse
+import sys
+
+from energy_microscope.suite import RUNTIMES, discover, run
+from energy_module.output import OUTPUT_MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m energy_microscope", description="Energy Microscope Suite Runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List every benchmark variant that can be run")
+    run_parser = subparsers.add_parser("run", help="Build and run benchmark variants as subprocesses")
+
+    for sub in (list_parser, run_parser):
+        sub.add_argument("-b", "--benchmark", action="append", help="Benchmark folder name (repeatable), e.g. N-Body")
+        sub.add_argument("-r", "--runtime", action="append", choices=sorted(RUNTIMES.values()),
+                         help="Runtime to include (repeatable)")
+
+    run_parser.add_argument("-o", "--output", default="results", help="Directory collecting all results (default: results)")
+    run_parser.add_argument("--python", default=sys.executable, help="Interpreter for the CPython-based variants")
+    run_parser.add_argument("--pypy", default="pypy3", help="PyPy interpreter (default: pypy3)")
+    run_parser.add_argument("--no-build", action="store_true", help="Do not build missing Ctypes/Cython/py_compile artifacts")
+    run_parser.add_argument("--dry-run", action="store_true", help="Only print the commands that would run")
+    run_parser.add_argument("--pin", action="store_true", help="Pin each variant to the CPUs of one package (socket)")
+    run_parser.add_argument("--parallel", action="store_true",
+                            help="Run one variant per package concurrently (implies --pin)")
+    run_parser.add_argument("--max-load", type=float, default=None,
+                            help="Wait until no CPU of the package is busier than this fraction (e.g. 0.1)")
+    run_parser.add_argument("--stdout", default="hash", choices=("inherit", *OUTPUT_MODES),
+                            help="What happens to benchmark output while it is measured; "
+                                 "only 'hash' verifies results (default: hash)")
+    run_parser.add_argument("--sink", default="csv", choices=("csv", "parquet", "sqlite"),
+                            help="Write results as CSV files, into one columnar store or into one "
+                                 "SQLite database (default: csv)")
+    run_parser.add_argument("--baseline", type=float, default=None, metavar="SECONDS",
+                            help="Calibrate idle power for this many seconds and also record net energy")
+    run_parser.add_argument("--baseline-refresh", type=float, default=None, metavar="SECONDS",
+                            help="Re-calibrate the idle baseline once it is older than this (default: 300)")
+    run_parser.add_argument("--sample-interval", type=float, default=None, metavar="SECONDS",
+                            help="Poll the energy counters this often during every run and save power traces")
+    run_parser.add_argument("--resume", action="store_true",
+                            help="Continue unfinished batches of an earlier run into the same output directory")
+    run_parser.add_argument("--update-golden", action="store_true",
+                            help="Store the result digests of the CPython variants as golden values")
+
+    args = parser.parse_args()
+    variants = discover(args.benchmark, args.runtime)
+
+    if not variants:
+        print("❌ Error: no benchmark variant matches the given filters.")
+        return 1
+
+    if args.command == "list":
+        for variant in variants:
+            print(f"{variant.benchmark:<24} {variant.runtime:<10} {variant.path}")
+        return 0
+
+    records = run(
+        variants,
+        output_dir=args.output,
+        python=args.python,
+        pypy=args.pypy,
+        build_missing=not args.no_build,
+        dry_run=args.dry_run,
+        pin=args.pin or args.parallel,
+        parallel=args.parallel,
+        max_load=args.max_load,
+        stdout=args.stdout,
+        update_golden=args.update_golden,
+        sink=args.sink,
+        baseline=args.baseline,
+        baseline_refresh=args.baseline_refresh,
+        sample_interval=args.sample_interval,
+        resume=args.resume,
+    )
+    failed = [r for r in records if r["status"] != "ok"]
+    if records:
+        print(f"✅ {len(records) - len(failed)}/{len(records)} variants completed, results in '{args.output}'")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
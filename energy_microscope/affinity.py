@@ -0,0 +1,101 @@
+import glob
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+CPU_SYSFS = "/sys/devices/system/cpu"
+
+
+def parse_cpu_list(text: str) -> Set[int]:
+    """
+    Parse a kernel CPU list such as "0-3,8,10-11".
+    """
+    cpus = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def cpu_packages() -> Dict[int, List[int]]:
+    """
+    Map each physical package (socket) id to the CPUs this process may use
+    on it. Falls back to a single package holding all usable CPUs when the
+    topology is not exposed.
+    """
+    usable = os.sched_getaffinity(0)
+    packages: Dict[int, List[int]] = {}
+
+    for path in glob.glob(os.path.join(CPU_SYSFS, "cpu[0-9]*", "topology", "physical_package_id")):
+        cpu = int(os.path.basename(os.path.dirname(os.path.dirname(path)))[3:])
+        if cpu not in usable:
+            continue
+        with open(path) as package_file:
+            packages.setdefault(int(package_file.read()), []).append(cpu)
+
+    if not packages:
+        packages[0] = list(usable)
+    return {package: sorted(cpus) for package, cpus in sorted(packages.items())}
+
+
+def isolated_cpus() -> Set[int]:
+    """
+    CPUs removed from the general scheduler with the isolcpus= boot option.
+    """
+    try:
+        with open(os.path.join(CPU_SYSFS, "isolated")) as isolated_file:
+            return parse_cpu_list(isolated_file.read())
+    except OSError:
+        return set()
+
+
+def _cpu_times() -> Dict[int, List[int]]:
+    times = {}
+    with open("/proc/stat") as stat:
+        for line in stat:
+            if line.startswith("cpu") and line[3].isdigit():
+                fields = line.split()
+                times[int(fields[0][3:])] = [int(value) for value in fields[1:]]
+    return times
+
+
+def cpu_load(cpus: List[int], interval: float = 0.5) -> Optional[float]:
+    """
+    Highest busy fraction of the given CPUs over `interval` seconds, read
+    from /proc/stat. Returns None when /proc/stat is not available.
+    """
+    try:
+        before = _cpu_times()
+        time.sleep(interval)
+        after = _cpu_times()
+    except OSError:
+        return None
+
+    load = 0.0
+    for cpu in cpus:
+        if cpu not in before or cpu not in after:
+            continue
+        deltas = [a - b for a, b in zip(after[cpu], before[cpu])]
+        total = sum(deltas)
+        # idle + iowait are the 4th and 5th columns
+        idle = deltas[3] + (deltas[4] if len(deltas) > 4 else 0)
+        if total > 0:
+            load = max(load, 1 - idle / total)
+    return load
+
+
+def wait_for_idle(cpus: List[int], max_load: float, timeout: float = 60.0) -> Optional[float]:
+    """
+    Wait until no CPU of a package is busier than `max_load`, or until
+    `timeout` seconds have passed. Returns the last observed load.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        load = cpu_load(cpus)
+        if load is None or load <= max_load or time.monotonic() >= deadline:
+            return load
@@ -0,0 +1,444 @@
+import glob
+import importlib.util
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from energy_microscope.affinity import cpu_packages, isolated_cpus, wait_for_idle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(ROOT, "benchmarks")
+
+# Variant folder name -> runtime name used in data/collection_*/
+RUNTIMES = {
+    "Cpython": "cpython",
+    "PyPy": "pypy",
+    "Cython": "cython",
+    "Ctypes": "ctypes",
+    "py_compile": "pycompile",
+    "SoA": "soa",
+    "NumPy": "numpy",
+}
+
+# Runtime -> module its interpreter must provide; variants are skipped without it
+REQUIRED_MODULES = {
+    "numpy": "numpy",
+}
+
+# Reference result digests, see `verify`
+GOLDEN_PATH = os.path.join(BENCHMARKS_DIR, "golden.json")
+DEFAULT_FLOAT_DIGITS = 10
+
+CDLL_PATTERN = re.compile(r"""CDLL\((?:os\.path\.abspath\()?["']\./([\w.-]+\.so)["']""")
+
+
+class Variant(NamedTuple):
+    """
+    One runnable benchmark implementation, e.g. N-Body under PyPy.
+    """
+    benchmark: str
+    runtime: str
+    path: str
+
+
+class BuildError(RuntimeError):
+    pass
+
+
+def discover(benchmarks: Optional[List[str]] = None, runtimes: Optional[List[str]] = None) -> List[Variant]:
+    """
+    Find every `benchmarks/<Name>/<Variant>/main.py`, optionally filtered by
+    benchmark folder name and runtime name (both case-insensitive).
+    """
+    wanted_benchmarks = {b.lower() for b in benchmarks} if benchmarks else None
+    wanted_runtimes = {r.lower() for r in runtimes} if runtimes else None
+
+    variants = []
+    for main_path in sorted(glob.glob(os.path.join(BENCHMARKS_DIR, "*", "*", "main.py"))):
+        variant_dir = os.path.dirname(main_path)
+        benchmark = os.path.basename(os.path.dirname(variant_dir))
+        runtime = RUNTIMES.get(os.path.basename(variant_dir))
+        if runtime is None:
+            continue
+        if wanted_benchmarks and benchmark.lower() not in wanted_benchmarks:
+            continue
+        if wanted_runtimes and runtime not in wanted_runtimes:
+            continue
+        variants.append(Variant(benchmark, runtime, variant_dir))
+    return variants
+
+
+def _stale(target: str, sources: List[str]) -> bool:
+    if not os.path.isfile(target):
+        return True
+    built = os.path.getmtime(target)
+    return any(os.path.getmtime(source) > built for source in sources)
+
+
+def _check_call(command: List[str], cwd: str) -> None:
+    completed = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise BuildError(f"{' '.join(command)} failed in {cwd}:\n{completed.stderr.strip()}")
+
+
+def build(variant: Variant, python: str = sys.executable) -> None:
+    """
+    Build the artifacts a variant needs if they are missing or out of date:
+    the shared library for Ctypes, the extension module for Cython and the
+    optimized bytecode for py_compile.
+    """
+    if variant.runtime == "ctypes":
+        with open(os.path.join(variant.path, "main.py")) as main_file:
+            match = CDLL_PATTERN.search(main_file.read())
+        sources = glob.glob(os.path.join(variant.path, "*.c"))
+        if match is None or not sources:
+            raise BuildError(f"Can not find the shared library or C source for {variant.path}")
+        target = os.path.join(variant.path, match.group(1))
+        if _stale(target, sources):
+            compiler = os.environ.get("CC", "cc")
+            _check_call([compiler, "-O2", "-shared", "-fPIC", "-o", target, *sources, "-lm"], variant.path)
+
+    elif variant.runtime == "cython":
+        sources = glob.glob(os.path.join(variant.path, "*.pyx"))
+        modules = glob.glob(os.path.join(variant.path, "raw*.so")) + glob.glob(os.path.join(variant.path, "raw*.pyd"))
+        if not modules or any(_stale(module, sources) for module in modules):
+            _check_call([python, "setup.py", "build_ext", "--inplace"], variant.path)
+
+    elif variant.runtime == "pycompile":
+        main_path = os.path.join(variant.path, "main.py")
+        if _stale(compiled_path(variant), [main_path]):
+            _check_call([python, "-c", "import py_compile; py_compile.compile('main.py', doraise=True, optimize=2)"], variant.path)
+
+
+def compiled_path(variant: Variant) -> str:
+    """
+    Path of the optimize=2 bytecode of a py_compile variant's main.py.
+    """
+    return importlib.util.cache_from_source(os.path.join(variant.path, "main.py"), optimization=2)
+
+
+def command(variant: Variant, python: str = sys.executable, pypy: str = "pypy3") -> List[str]:
+    """
+    Command line that runs a variant from its own directory.
+    """
+    if variant.runtime == "pypy":
+        return [pypy, "main.py"]
+    if variant.runtime == "pycompile":
+        return [python, compiled_path(variant)]
+    return [python, "main.py"]
+
+
+def load_golden(path: str = GOLDEN_PATH) -> Dict[str, Dict]:
+    """
+    Golden result digests keyed by benchmark folder name:
+    `{"N-Body": {"sha256": "...", "float_digits": 10}, ...}`.
+
+    Benchmarks whose output can not be verified are listed with the reason
+    instead of a digest, `{"KNN": {"excluded": "..."}}`, and are never
+    given one by `update_golden`. A `workload` holds overrides, in the form
+    of ENERGY_MICROSCOPE_WORKLOAD, of a short run that every variant makes
+    only to be verified, e.g. when the measured workload is too chaotic for
+    the tiers to agree on its result.
+    """
+    try:
+        with open(path) as golden_file:
+            return json.load(golden_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_golden(golden: Dict[str, Dict], path: str = GOLDEN_PATH) -> None:
+    with open(path, "w") as golden_file:
+        json.dump(dict(sorted(golden.items())), golden_file, indent=4)
+        golden_file.write("\n")
+
+
+def verify(benchmark: str, digests: List[str], golden: Dict[str, Dict]) -> Dict:
+    """
+    Compare the output digests of one variant run with the golden value of
+    its benchmark.
+
+    `verified` is True when every run produced the golden digest, False when
+    any run differs, and None when the benchmark has no golden value (yet,
+    or because it is excluded) or the run produced no digest.
+    """
+    expected = golden.get(benchmark, {}).get("sha256")
+    if expected is None or not digests:
+        return {"digests": digests, "golden": expected, "verified": None}
+    return {"digests": digests, "golden": expected, "verified": digests == [expected]}
+
+
+def run(
+    variants: List[Variant],
+    output_dir: str,
+    python: str = sys.executable,
+    pypy: str = "pypy3",
+    build_missing: bool = True,
+    dry_run: bool = False,
+    pin: bool = False,
+    parallel: bool = False,
+    max_load: Optional[float] = None,
+    stdout: str = "hash",
+    update_golden: bool = False,
+    sink: str = "csv",
+    baseline: Optional[float] = None,
+    baseline_refresh: Optional[float] = None,
+    sample_interval: Optional[float] = None,
+    resume: bool = False,
+) -> List[Dict]:
+    """
+    Build and run variants as subprocesses. Missing or stale artifacts of
+    all variants are built first, one at a time, before any variant runs.
+
+    Each variant runs with its own directory as CWD and the repository root
+    on PYTHONPATH. The measurement decorators write their CSV files under
+    `<output_dir>/<runtime>/`, the benchmark's stdout/stderr go to
+    `<output_dir>/logs/`, and one JSON record per run is appended to
+    `<output_dir>/runs.jsonl`.
+
+    With `pin`, every variant is restricted to the CPUs of one package
+    (socket), and the package id is passed on so the energy of that package
+    is recorded. With `parallel`, one run queue worker per package runs
+    variants concurrently, never two on the same package. With `max_load`,
+    a run waits until no CPU of its package is busier than that fraction.
+    `stdout` is passed to the measurement decorators as the output policy
+    ("discard", "capture" or "hash"; see `energy_module.output`).
+
+    With "hash", the output digests of every run are compared with
+    `benchmarks/golden.json`, and a variant whose result differs is
+    reported as "wrong_result" instead of "ok". A benchmark whose golden
+    value has a `workload` is checked on a separate short run with that
+    workload instead, written under `<output_dir>/verification/`. With
+    `update_golden`, the digests of the CPython variants are stored as the
+    new golden values.
+
+    With `sink="parquet"`, the decorators append their rows to one columnar
+    store in `<output_dir>/store/` (see `energy_module.store`) instead of
+    CSV files; with `sink="sqlite"`, they insert them into
+    `<output_dir>/results.sqlite` (see `energy_module.database`). Either way
+    the output directory name is used as the collection.
+
+    With `baseline`, the energy decorators calibrate idle power for that
+    many seconds (again every `baseline_refresh` seconds) and also record
+    the net energy of every run (see `energy_module.baseline`). With
+    `sample_interval`, they also poll the energy counters every that many
+    seconds during each run and write power traces next to the results
+    (see `energy_module.sampler`).
+
+    With `resume`, batches left unfinished by an earlier run into the same
+    output directory continue after their last written run; their rows,
+    logs and digests are appended to the existing files.
+    """
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(os.path.join(output_dir, "logs"), exist_ok=True)
+
+    if dry_run:
+        for variant in variants:
+            print(f"[dry-run] {variant.benchmark}/{variant.runtime}: {' '.join(command(variant, python, pypy))}")
+        return []
+
+    packages = cpu_packages() if (pin or parallel) else {0: None}
+    if not parallel:
+        packages = dict([next(iter(packages.items()))])
+
+    records = []
+    lock = threading.Lock()
+    golden = load_golden()
+
+    def report(variant: Variant, record: Dict, float_digits: int = DEFAULT_FLOAT_DIGITS) -> None:
+        with lock:
+            if stdout == "hash" and record["status"] == "ok":
+                excluded = "excluded" in golden.get(variant.benchmark, {})
+                # The digests of the verification run, if the golden value asks for one
+                checked = record.get("verification", record)
+                if checked["status"] != "ok":
+                    record["status"] = "failed"
+                    record["error"] = f"verification run failed, see {checked['log']}"
+                else:
+                    if update_golden and variant.runtime == "cpython" and len(checked["digests"]) == 1 and not excluded:
+                        golden[variant.benchmark] = {**golden.get(variant.benchmark, {}),
+                                                     "sha256": checked["digests"][0], "float_digits": float_digits}
+                        save_golden(golden)
+                    record.update(verify(variant.benchmark, checked["digests"], golden))
+                    if record["verified"] is False:
+                        record["status"] = "wrong_result"
+
+            print(f"{variant.benchmark}/{variant.runtime}: {record['status']}")
+            with open(os.path.join(output_dir, "runs.jsonl"), "a") as log:
+                log.write(json.dumps(record) + "\n")
+            records.append(record)
+
+    # Build every variant serially and unpinned before anything is measured,
+    # so no compiler competes with a measured variant in parallel mode
+    pending: "queue.Queue[Variant]" = queue.Queue()
+    for variant in variants:
+        if build_missing:
+            try:
+                build(variant, python)
+            except BuildError as error:
+                report(variant, {
+                    "benchmark": variant.benchmark,
+                    "runtime": variant.runtime,
+                    "command": command(variant, python, pypy),
+                    "cwd": variant.path,
+                    "started": datetime.now().isoformat(),
+                    "status": "build_failed",
+                    "error": str(error),
+                })
+                continue
+        pending.put(variant)
+
+    def worker(package: int, cpus: Optional[List[int]]) -> None:
+        while True:
+            try:
+                variant = pending.get_nowait()
+            except queue.Empty:
+                return
+
+            entry = golden.get(variant.benchmark, {})
+            float_digits = entry.get("float_digits", DEFAULT_FLOAT_DIGITS)
+            record = _execute(variant, output_dir, python, pypy, package if cpus else None, cpus,
+                              max_load, stdout, float_digits, sink, baseline, baseline_refresh,
+                              sample_interval, resume)
+            if stdout == "hash" and record["status"] == "ok" and "workload" in entry:
+                # A short run on the golden workload checks the result; it is not part of the measurements
+                record["verification"] = _run_variant(
+                    variant, record["command"], os.path.join(output_dir, "verification"),
+                    package if cpus else None, cpus, stdout, float_digits, sink, workload=entry["workload"],
+                )
+            report(variant, record, float_digits)
+
+    threads = [threading.Thread(target=worker, args=item) for item in packages.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return records
+
+
+def _execute(
+    variant: Variant,
+    output_dir: str,
+    python: str,
+    pypy: str,
+    package: Optional[int],
+    cpus: Optional[List[int]],
+    max_load: Optional[float],
+    stdout: str = "hash",
+    float_digits: int = DEFAULT_FLOAT_DIGITS,
+    sink: str = "csv",
+    baseline: Optional[float] = None,
+    baseline_refresh: Optional[float] = None,
+    sample_interval: Optional[float] = None,
+    resume: bool = False,
+) -> Dict:
+    argv = command(variant, python, pypy)
+    record = {
+        "benchmark": variant.benchmark,
+        "runtime": variant.runtime,
+        "command": argv,
+        "cwd": variant.path,
+        "package": package,
+        "cpus": cpus,
+        "stdout": stdout,
+        "started": datetime.now().isoformat(),
+    }
+
+    if shutil.which(argv[0]) is None and not os.path.isfile(argv[0]):
+        record.update(status="skipped", error=f"{argv[0]} not found")
+        return record
+
+    module = REQUIRED_MODULES.get(variant.runtime)
+    if module and subprocess.run([argv[0], "-c", f"import {module}"], capture_output=True).returncode != 0:
+        record.update(status="skipped", error=f"{module} is not installed for {argv[0]}")
+        return record
+
+    if cpus:
+        record["isolated"] = set(cpus) <= isolated_cpus()
+        if max_load is not None:
+            load = wait_for_idle(cpus, max_load)
+            record["package_load"] = load
+            record["contended"] = load is not None and load > max_load
+
+    record.update(_run_variant(variant, argv, output_dir, package, cpus, stdout, float_digits, sink,
+                               baseline, baseline_refresh, sample_interval, resume))
+    return record
+
+
+def _run_variant(
+    variant: Variant,
+    argv: List[str],
+    output_dir: str,
+    package: Optional[int] = None,
+    cpus: Optional[List[int]] = None,
+    stdout: str = "hash",
+    float_digits: int = DEFAULT_FLOAT_DIGITS,
+    sink: str = "csv",
+    baseline: Optional[float] = None,
+    baseline_refresh: Optional[float] = None,
+    sample_interval: Optional[float] = None,
+    resume: bool = False,
+    workload: Optional[Dict[str, Dict]] = None,
+) -> Dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env["ENERGY_MICROSCOPE_RESULTS"] = os.path.join(output_dir, variant.runtime)
+    env["ENERGY_MICROSCOPE_SINK"] = sink
+    env["ENERGY_MICROSCOPE_STORE"] = os.path.join(output_dir, "store")
+    env["ENERGY_MICROSCOPE_DATABASE"] = os.path.join(output_dir, "results.sqlite")
+    env["ENERGY_MICROSCOPE_COLLECTION"] = os.path.basename(output_dir)
+    env["ENERGY_MICROSCOPE_RUNTIME"] = variant.runtime
+    if package is not None:
+        env["ENERGY_MICROSCOPE_PACKAGE"] = str(package)
+    env["ENERGY_MICROSCOPE_OUTPUT"] = stdout
+    env["ENERGY_MICROSCOPE_FLOAT_DIGITS"] = str(float_digits)
+    if baseline:
+        env["ENERGY_MICROSCOPE_BASELINE"] = str(baseline)
+        if baseline_refresh:
+            env["ENERGY_MICROSCOPE_BASELINE_REFRESH"] = str(baseline_refresh)
+    if sample_interval:
+        env["ENERGY_MICROSCOPE_SAMPLER"] = str(sample_interval)
+    if resume:
+        env["ENERGY_MICROSCOPE_RESUME"] = "1"
+    if workload:
+        # Replaces the overrides of these workloads, keeps those of the others
+        overrides = json.loads(env.get("ENERGY_MICROSCOPE_WORKLOAD") or "{}")
+        env["ENERGY_MICROSCOPE_WORKLOAD"] = json.dumps({**overrides, **workload})
+
+    digests_path = os.path.join(output_dir, "digests", f"{variant.benchmark}_{variant.runtime}.txt")
+    os.makedirs(os.path.dirname(digests_path), exist_ok=True)
+    if os.path.isfile(digests_path) and not resume:
+        os.remove(digests_path)
+    env["ENERGY_MICROSCOPE_DIGESTS"] = digests_path
+
+    log_path = os.path.join(output_dir, "logs", f"{variant.benchmark}_{variant.runtime}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    start = time.perf_counter()
+    with open(log_path, "a" if resume else "w") as log_file:
+        # Pinned in the child before exec, so the whole interpreter runs on `cpus`; its children inherit it
+        pin_cpus = (lambda: os.sched_setaffinity(0, cpus)) if cpus else None
+        process = subprocess.Popen(argv, cwd=variant.path, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+                                   preexec_fn=pin_cpus)
+        returncode = process.wait()
+
+    digests = []
+    if os.path.isfile(digests_path):
+        with open(digests_path) as digests_file:
+            digests = sorted({line.strip() for line in digests_file if line.strip()})
+
+    return {
+        "status": "ok" if returncode == 0 else "failed",
+        "returncode": returncode,
+        "seconds": round(time.perf_counter() - start, 3),
+        "log": log_path,
+        "digests": digests,
+    }
@@ -0,0 +1,196 @@
+import math
+import time
+from statistics import NormalDist
+from typing import Iterator, List, Optional, Tuple
+
+from energy_module.warmup import WarmupDetector
+
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Approximate the Student t quantile with the Cornish-Fisher expansion.
+
+    Accurate to about 1e-3 for df >= 5, which is plenty for a stopping rule
+    and avoids depending on scipy inside the measured process.
+    """
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+    )
+
+
+class RunningStats:
+    """
+    Welford's online mean and variance.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+
+class AdaptiveSampler:
+    """
+    Stopping rule that replaces a fixed repetition count.
+
+    Runs are first treated as warm-up until `warmup` reports a steady state.
+    Measured runs are then taken until the confidence interval of the mean
+    of every recorded metric is narrower than `target_ci` (relative
+    half-width), or until the `time_budget` (seconds) or `energy_budget`
+    (uJ) is used up.
+    """
+    def __init__(
+        self,
+        target_ci: float = 0.02,
+        confidence: float = 0.95,
+        min_runs: int = 10,
+        warmup: Optional[WarmupDetector] = None,
+        time_budget: Optional[float] = None,
+        energy_budget: Optional[float] = None,
+    ) -> None:
+        self.target_ci = target_ci
+        self.confidence = confidence
+        self.min_runs = max(2, min_runs)
+        self.warmup = warmup if warmup is not None else WarmupDetector()
+        self.time_budget = time_budget
+        self.energy_budget = energy_budget
+
+    def converged(self, stats: List[RunningStats]) -> bool:
+        """
+        Check whether every metric's confidence interval is narrow enough.
+        """
+        for metric in stats:
+            if metric.count < self.min_runs:
+                return False
+            t = t_quantile(1 - (1 - self.confidence) / 2, metric.count - 1)
+            half_width = t * math.sqrt(metric.variance / metric.count)
+            if half_width > self.target_ci * abs(metric.mean):
+                return False
+        return True
+
+
+class RunSchedule:
+    """
+    Iterate over the runs of one measurement batch.
+
+    Yields `(run, phase)` pairs, where `phase` is "warmup" or "steady" and
+    `run` counts all runs of the batch. Without a sampler or warm-up detector
+    this is simply runs 1..n, all steady. With a `WarmupDetector` (given
+    directly or through the sampler) warm-up runs come first, followed by
+    `n` steady runs; an `AdaptiveSampler` may stop the steady runs earlier.
+    After each run the caller reports the measured values through `record`.
+    Run numbers continue after `first_run`, for batches that are resumed.
+
+    While warm-up detection is undecided, runs are yielded as "warmup". Once
+    the detector finds the changepoint, the runs after it are steady after
+    all: they count towards `n`, and `phase(run)` returns the final phase of
+    every run, so callers keep the rows of undecided runs until it does.
+
+    The sampler's budgets are checked after every run, warm-up included, so
+    a batch never runs past them. Why an adaptive schedule stopped early is
+    kept in `stop_reason` ("converged", "time_budget" or "energy_budget");
+    `steady_runs` stays 0 when a budget was used up during warm-up.
+    """
+    def __init__(
+        self,
+        n: int,
+        sampler: Optional[AdaptiveSampler] = None,
+        warmup: Optional[WarmupDetector] = None,
+        first_run: int = 0,
+    ) -> None:
+        self.n = n
+        self.first_run = first_run
+        self.sampler = sampler
+        self.warmup = warmup or (sampler.warmup if sampler is not None else None)
+        self._warmup: List[float] = []
+        self._warmup_values: List[Tuple[float, ...]] = []
+        self._stats: List[RunningStats] = []
+        self._energy = 0.0
+        # Last warm-up run, once warm-up detection has decided
+        self.warmup_end: Optional[int] = first_run if self.warmup is None else None
+        self.steady_runs = 0
+        self.stop_reason: Optional[str] = None
+
+    @property
+    def max_runs(self) -> int:
+        """
+        Upper bound of the number of runs, warm-up included.
+        """
+        return self.n + (self.warmup.max_warmup if self.warmup is not None else 0)
+
+    def phase(self, run: int) -> Optional[str]:
+        """
+        Final phase of a yielded run, or None while warm-up is undecided.
+        """
+        if self.warmup_end is None:
+            return None
+        return "warmup" if run <= self.warmup_end else "steady"
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        sampler = self.sampler
+        start = time.perf_counter()
+        run = self.first_run
+
+        while self.steady_runs < self.n:
+            run += 1
+            if self.warmup_end is None:
+                yield run, "warmup"
+            else:
+                self.steady_runs += 1
+                yield run, "steady"
+
+            if sampler is None:
+                continue
+            if self.steady_runs and sampler.converged(self._stats):
+                self.stop_reason = "converged"
+            elif sampler.time_budget is not None and time.perf_counter() - start >= sampler.time_budget:
+                self.stop_reason = "time_budget"
+            elif sampler.energy_budget is not None and self._energy >= sampler.energy_budget:
+                self.stop_reason = "energy_budget"
+            if self.stop_reason is not None:
+                return
+
+    def record(self, *values: float, energy_uj: float = 0.0) -> None:
+        """
+        Report the metrics of the run that was just yielded.
+
+        The first value drives warm-up detection; all of them must converge
+        before an adaptive schedule stops.
+        """
+        self._energy += energy_uj
+        if self.warmup_end is not None:
+            self._add(values)
+            return
+
+        self._warmup.append(values[0])
+        self._warmup_values.append(values)
+        warmup_runs = self.warmup.warmup_length(self._warmup)
+        if warmup_runs is None:
+            return
+        self.warmup_end = self.first_run + warmup_runs
+        # The runs after the changepoint were steady already; credit at most
+        # the n steady runs the schedule asks for
+        credited = self._warmup_values[warmup_runs:][:self.n - self.steady_runs]
+        self.steady_runs += len(credited)
+        for steady in credited:
+            self._add(steady)
+
+    def _add(self, values: Tuple[float, ...]) -> None:
+        if self.sampler is None:
+            return
+        if not self._stats:
+            self._stats = [RunningStats() for _ in values]
+        for metric, value in zip(self._stats, values):
+            metric.add(value)
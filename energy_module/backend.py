@@ -0,0 +1,152 @@
+import glob
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+POWERCAP_ROOT = "/sys/class/powercap"
+
+# Cumulative energy counters in uJ, keyed by domain, e.g. "package-0",
+# "core-0", "uncore-0", "dram-1" or "psys"
+Reading = Dict[str, int]
+
+
+class EnergyBackendError(RuntimeError):
+    pass
+
+
+class EnergyBackend:
+    """
+    Source of cumulative RAPL energy counters.
+
+    `read()` returns the raw counters of every domain, and `delta()` turns
+    two readings into the energy used in between, correcting for counters
+    that wrapped around at `max_energy_range_uj` in the meantime. A counter
+    can only be corrected once per interval, so intervals must be shorter
+    than one wrap period (minutes to hours, depending on the CPU).
+    """
+    max_range: Dict[str, int]
+
+    def read(self) -> Reading:
+        raise NotImplementedError
+
+    def domains(self) -> List[str]:
+        return sorted(self.max_range)
+
+    def delta(self, before: Reading, after: Reading) -> Dict[str, float]:
+        used = {}
+        for domain, start in before.items():
+            end = after[domain]
+            if end < start:
+                end += self.max_range.get(domain, 0)
+            used[domain] = float(end - start)
+        return used
+
+
+def socket_energy(used: Dict[str, float], socket: int) -> Tuple[float, float]:
+    """
+    Package and DRAM energy of one socket from a `delta()`; DRAM is 0 on
+    machines without a DRAM domain.
+    """
+    return used[f"package-{socket}"], used.get(f"dram-{socket}", 0.0)
+
+
+class PowercapBackend(EnergyBackend):
+    """
+    Reads `/sys/class/powercap/intel-rapl*/energy_uj` directly.
+
+    Every zone (package, core, uncore, dram and psys, on every socket) is
+    discovered once and its counter file kept open, so a reading costs one
+    pread per domain.
+    """
+    def __init__(self, root: str = POWERCAP_ROOT) -> None:
+        self.files: Dict[str, int] = {}
+        self.max_range = {}
+
+        zones = glob.glob(os.path.join(root, "intel-rapl:*"))
+        for zone in sorted(zones, key=lambda path: path.count(":")):
+            domain = self._domain(zone)
+            try:
+                with open(os.path.join(zone, "max_energy_range_uj")) as range_file:
+                    self.max_range[domain] = int(range_file.read())
+                self.files[domain] = os.open(os.path.join(zone, "energy_uj"), os.O_RDONLY)
+            except PermissionError as error:
+                raise EnergyBackendError(
+                    f"Can not read {zone}/energy_uj; run as root or "
+                    f"`sudo chmod -R a+r {root}/intel-rapl:*/energy_uj`"
+                ) from error
+
+        if not self.files:
+            raise EnergyBackendError(f"No RAPL zones found under {root}")
+
+    @staticmethod
+    def _domain(zone: str) -> str:
+        with open(os.path.join(zone, "name")) as name_file:
+            name = name_file.read().strip()
+        # Sub-zones (intel-rapl:0:2 -> "dram") take the socket of their parent
+        parts = os.path.basename(zone).split(":")
+        if len(parts) > 2:
+            return f"{name}-{parts[1]}"
+        return name
+
+    def read(self) -> Reading:
+        return {domain: int(os.pread(fd, 32, 0)) for domain, fd in self.files.items()}
+
+    def close(self) -> None:
+        for fd in self.files.values():
+            os.close(fd)
+        self.files = {}
+
+
+class ReplayBackend(EnergyBackend):
+    """
+    Replays recorded readings, one per `read()`, for use without RAPL
+    hardware. The last reading is repeated once the trace is exhausted.
+    """
+    def __init__(self, readings: Iterable[Reading], max_range: Optional[Dict[str, int]] = None) -> None:
+        self.readings = list(readings)
+        if not self.readings:
+            raise EnergyBackendError("Replay trace is empty")
+        self.max_range = max_range or {domain: 0 for domain in self.readings[0]}
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayBackend":
+        """
+        Load a trace written by `record_trace`: a JSON object of max ranges
+        on the first line and one JSON reading per following line.
+        """
+        with open(path) as trace:
+            max_range = json.loads(trace.readline())
+            return cls((json.loads(line) for line in trace if line.strip()), max_range)
+
+    def read(self) -> Reading:
+        reading = self.readings[min(self.position, len(self.readings) - 1)]
+        self.position += 1
+        return reading
+
+
+def record_trace(backend: EnergyBackend, path: str, readings: Iterable[Reading]) -> None:
+    """
+    Write readings taken from `backend` as a trace for `ReplayBackend.from_file`.
+    """
+    with open(path, "w") as trace:
+        trace.write(json.dumps(backend.max_range) + "\n")
+        for reading in readings:
+            trace.write(json.dumps(reading) + "\n")
+
+
+_backend: Optional[EnergyBackend] = None
+
+
+def get_backend() -> EnergyBackend:
+    """
+    Process-wide energy backend, created on first use.
+
+    ENERGY_MICROSCOPE_ENERGY_TRACE selects a recorded trace to replay;
+    otherwise the powercap counters are read.
+    """
+    global _backend
+    if _backend is None:
+        trace = os.environ.get("ENERGY_MICROSCOPE_ENERGY_TRACE")
+        _backend = ReplayBackend.from_file(trace) if trace else PowercapBackend()
+    return _backend
@@ -0,0 +1,76 @@
+import os
+import time
+from typing import Optional, Tuple
+
+from energy_module.backend import EnergyBackend, socket_energy
+
+BASELINE_HEADER = ['package_net (uJ)', 'dram_net (uJ)', 'idle_package (uW)', 'idle_dram (uW)']
+
+class IdleBaseline:
+    """
+    Idle package and DRAM power of the machine, sampled while sleeping.
+
+    RAPL package energy includes the static and idle power of the whole
+    socket, which dominates sub-second benchmarks. The baseline is measured
+    over `duration` seconds of sleep and re-measured when it is older than
+    `refresh` seconds, so slow drifts (temperature, background daemons) are
+    followed during long collections.
+    """
+    def __init__(self, duration: float = 1.0, refresh: float = 300.0) -> None:
+        self.duration = duration
+        self.refresh = refresh
+        self.package_power = 0.0  # uW (uJ per second)
+        self.dram_power = 0.0
+        self.calibrated_at: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["IdleBaseline"]:
+        """
+        Baseline selected by ENERGY_MICROSCOPE_BASELINE (the calibration
+        duration in seconds, set by the suite runner), or None when it is
+        unset or 0. ENERGY_MICROSCOPE_BASELINE_REFRESH sets `refresh`.
+        """
+        duration = float(os.environ.get("ENERGY_MICROSCOPE_BASELINE") or 0)
+        if duration <= 0:
+            return None
+        refresh = os.environ.get("ENERGY_MICROSCOPE_BASELINE_REFRESH")
+        return cls(duration, float(refresh)) if refresh else cls(duration)
+
+    def calibrate(self, backend: EnergyBackend, socket: int = 0) -> None:
+        """
+        Measure idle power for `duration` seconds.
+        """
+        before = backend.read()
+        start = time.perf_counter()
+        time.sleep(self.duration)
+        seconds = time.perf_counter() - start
+        package, dram = socket_energy(backend.delta(before, backend.read()), socket)
+
+        self.package_power = package / seconds
+        self.dram_power = dram / seconds
+        self.calibrated_at = time.monotonic()
+
+    def ensure_fresh(self, backend: EnergyBackend, socket: int = 0) -> None:
+        """
+        Calibrate if no baseline exists yet or the current one has expired.
+        """
+        if self.calibrated_at is None or time.monotonic() - self.calibrated_at >= self.refresh:
+            self.calibrate(backend, socket)
+
+    def net(self, package_uj: float, dram_uj: float, seconds: float) -> Tuple[float, float]:
+        """
+        Dynamic energy of a run: gross energy minus baseline power * duration.
+
+        The result is not clamped at zero; small negative values are noise
+        and clamping them would bias the mean upwards.
+        """
+        return (
+            package_uj - self.package_power * seconds,
+            dram_uj - self.dram_power * seconds,
+        )
+
+    def columns(self, package_uj: float, dram_uj: float, seconds: float) -> Tuple[float, ...]:
+        """
+        Values of the BASELINE_HEADER columns for one run.
+        """
+        return self.net(package_uj, dram_uj, seconds) + (self.package_power, self.dram_power)
@@ -0,0 +1,272 @@
+import json
+import os
+import resource
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Sequence, Type
+
+from energy_module.adaptive import AdaptiveSampler, RunSchedule
+from energy_module.backend import EnergyBackend, get_backend, socket_energy
+from energy_module.baseline import BASELINE_HEADER, IdleBaseline
+from energy_module.output import OUTPUT_HEADER, OutputPolicy
+from energy_module.progress import RUN_STATUS_HEADER, BatchProgress
+from energy_module.sampler import PowerSampler
+from energy_module.sink import ResultSink, default_sink, results_folder
+from energy_module.warmup import WarmupDetector
+from time_modules.clock import calibrate_overhead, get_clock
+
+# Metric -> result file columns, in the order they appear in a row
+METRIC_COLUMNS = {
+    "time": ['execution_time (s)'],
+    "cpu": ['cpu_time (s)'],
+    "energy": ['package (uJ)', 'dram (uJ)'],
+    "rss": ['peak_rss (KB)'],
+}
+
+
+def package_index() -> int:
+    """
+    Index of the RAPL package (socket) whose energy is recorded.
+
+    The suite runner sets ENERGY_MICROSCOPE_PACKAGE when it pins a benchmark
+    to one socket; otherwise package 0 is used.
+    """
+    return int(os.environ.get("ENERGY_MICROSCOPE_PACKAGE", 0))
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the kernel's peak RSS counter (VmHWM) for this process.
+
+    Returns False when the counter can not be reset (non-Linux or kernels
+    older than 4.0), in which case the peak covers the whole process lifetime.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def read_peak_rss() -> int:
+    """
+    Read the peak resident set size of this process in KB.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def batch_header(metrics: Sequence[str], baseline: bool = False, output: bool = False) -> list:
+    """
+    Columns of the result file of a batch recording `metrics`.
+    """
+    header = ['timestamp', 'function', 'run']
+    for metric in METRIC_COLUMNS:
+        if metric in metrics:
+            header += METRIC_COLUMNS[metric]
+    header += ['phase', *RUN_STATUS_HEADER]
+    if baseline:
+        header += BASELINE_HEADER
+    if output:
+        header += OUTPUT_HEADER
+    return header
+
+
+def run_batch(
+    func: Callable,
+    args: tuple,
+    kwargs: Dict[str, Any],
+    result_file_path: str,
+    n: int,
+    metrics: Sequence[str],
+    clock: str = "perf_counter",
+    adaptive: Optional[AdaptiveSampler] = None,
+    warmup: Optional[WarmupDetector] = None,
+    batch_size: Optional[int] = None,
+    sink: Optional[Type[ResultSink]] = None,
+    baseline: Optional[IdleBaseline] = None,
+    backend: Optional[EnergyBackend] = None,
+    sampler: Optional[PowerSampler] = None,
+    resume: bool = False,
+    output: Optional[OutputPolicy] = None,
+) -> Any:
+    """
+    Run `func(*args, **kwargs)` repeatedly and record `metrics` of every run
+    ("time", "cpu", "energy", "rss"; see METRIC_COLUMNS) as one row each.
+    This is the run loop of every measurement decorator.
+
+    Rows are collected by `sink` while the runs execute and written in bulk
+    after the last run (the sink holds `n` plus the warm-up cap), or every
+    `batch_size` runs when it is given, so no file I/O happens between two
+    measurements. Without `sink`, the sink
+    named by ENERGY_MICROSCOPE_SINK is used (see `default_sink`).
+
+    Wall time is read from `clock` (see `time_modules.clock`), minus its
+    calibrated read overhead; RAPL reads bracket the clocks so their sysfs
+    reads are not timed. Energy is read from `backend`, by default the
+    process-wide backend of `energy_module.backend.get_backend()`, for the
+    package named by `package_index()`.
+
+    With `warmup`, runs are tagged "warmup" until the detector reports a
+    steady state and `n` steady runs follow; the rows of runs before that
+    decision are held back until their phase is known, so runs after the
+    changepoint are stored as steady. With `adaptive`, the number of
+    steady runs is chosen by the sampler with `n` as the upper bound; it
+    stops once every recorded metric (energy first, then time) has
+    converged. The phase of every run is stored in the `phase` column.
+
+    With `baseline` (energy only), idle power is calibrated before the
+    first run and whenever it expires, and the net (dynamic) energy of every
+    run is stored next to the gross values; by default the baseline named by
+    ENERGY_MICROSCOPE_BASELINE is used, if any. With `sampler`, the counters
+    are also polled during every run and written as a time series to
+    `traces/<csv_filename>_run_<i>` next to the result file; energy batches
+    use the sampler named by ENERGY_MICROSCOPE_SAMPLER by default, if any.
+
+    A run that raises is recorded with status "error" and the exception,
+    the rows so far are written and the exception is re-raised. Progress is
+    checkpointed in `<result file>.progress.json`; with `resume` (or
+    ENERGY_MICROSCOPE_RESUME=1), an unfinished batch continues after its
+    last written run and its rows are appended to the same result file.
+
+    `output` redirects stdout during every run (see
+    `energy_module.output.OutputPolicy`); by default the policy named by
+    ENERGY_MICROSCOPE_OUTPUT is used, if any, and the mode, size and hash
+    of the output are stored in extra columns.
+
+    Returns the result of the last run.
+    """
+    timed, cpu, rss = "time" in metrics, "cpu" in metrics, "rss" in metrics
+    energy = (backend or get_backend()) if "energy" in metrics else None
+    baseline = (baseline or IdleBaseline.from_env()) if energy else None
+    sampler = sampler or (PowerSampler.from_env(energy) if energy else None)
+    socket = package_index()
+
+    timer = get_clock(clock)
+    overhead = calibrate_overhead(clock)
+
+    stdout = output or OutputPolicy.from_env()
+    header = batch_header(metrics, baseline is not None, stdout is not None)
+    function = func.__name__
+    traces = os.path.join(os.path.dirname(result_file_path), "traces")
+    csv_filename = os.path.splitext(os.path.basename(result_file_path))[0]
+
+    progress = BatchProgress(result_file_path, function, n)
+    # The suite runner's --resume
+    resume = resume or os.environ.get("ENERGY_MICROSCOPE_RESUME", "") not in ("", "0")
+    last_run, done = progress.resume() if resume else (0, 0)
+    schedule = RunSchedule(n - done, adaptive, warmup, first_run=last_run)
+
+    result_sink = sink or default_sink()
+    result = None
+    # Runs whose phase warm-up detection has not decided yet: (run, metrics, error, extra columns)
+    pending = []
+
+    try:
+        # Buffer the rows and write them once the runs are done
+        with result_sink(result_file_path, header, batch_size or schedule.max_runs, on_flush=progress.save) as results:
+            def settle(final: bool = False) -> None:
+                while pending and (final or schedule.phase(pending[0][0]) is not None):
+                    run, measured, error, extra = pending.pop(0)
+                    phase = schedule.phase(run) or "warmup"
+                    results.append((*measured, phase, *progress.record(run, phase, error), *extra))
+
+            for i, _ in schedule:
+                if baseline:
+                    baseline.ensure_fresh(energy, socket)
+                if sampler:
+                    sampler.start(os.path.join(traces, f"{csv_filename}_run_{i}"))
+                if rss:
+                    reset_peak_rss()
+
+                error = None
+                if stdout:
+                    stdout.start()
+                before = energy.read() if energy else None
+                wall_start = timer()
+                cpu_start = time.process_time_ns()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as exception:
+                    error = exception
+                cpu_end = time.process_time_ns()
+                wall_end = timer()
+                after = energy.read() if energy else None
+                if stdout:
+                    stdout.stop()
+                if sampler:
+                    sampler.stop()
+
+                execution_time = max(wall_end - wall_start - overhead, 0) / 1e9
+                measured = (time.time(), function, i)
+                if timed:
+                    measured += (execution_time,)
+                if cpu:
+                    measured += ((cpu_end - cpu_start) / 1e9,)
+                if energy:
+                    package, dram = socket_energy(energy.delta(before, after), socket)
+                    measured += (package, dram)
+                if rss:
+                    measured += (read_peak_rss(),)
+                extra = ()
+                if baseline:
+                    extra += baseline.columns(package, dram, execution_time)
+                if stdout:
+                    extra += stdout.columns()
+                pending.append((i, measured, error, extra))
+                if error is not None:
+                    settle(final=True)
+                    raise error
+
+                values = ((package,) if energy else ()) + ((execution_time,) if timed else ())
+                schedule.record(*values, energy_uj=package if energy else 0.0)
+                settle()
+            settle(final=True)
+
+        progress.finish(schedule.stop_reason)
+    finally:
+        # Restore fd 1 and release the captured output even when a run raised
+        if stdout:
+            stdout.close()
+    return result
+
+
+def measured(
+    func: Callable,
+    csv_filename: str,
+    folder_name: str,
+    system_info_name: str,
+    system_info: Callable[[str], Dict[str, Any]],
+    **options: Any,
+) -> Callable:
+    """
+    Wrap `func` so that every call runs one batch (`run_batch(**options)`)
+    writing `<results folder>/<folder_name>/<csv_filename>.csv`.
+
+    `system_info(result_file_path)` is stored as `system_info_name` in the
+    same folder the first time a batch is run there.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Create the directory if it doesn't exist
+        output_folder = results_folder(folder_name)
+        os.makedirs(output_folder, exist_ok=True)
+
+        # Create file paths
+        result_file_path = os.path.join(output_folder, f"{csv_filename}.csv")
+        system_info_path = os.path.join(output_folder, system_info_name)
+
+        # Write system info to JSON if the file does not exist
+        if not os.path.isfile(system_info_path):
+            with open(system_info_path, "w") as json_file:
+                json.dump(system_info(result_file_path), json_file, indent=4)
+
+        return run_batch(func, args, kwargs, result_file_path, **options)
+    return wrapper
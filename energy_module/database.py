@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from energy_module.sink import ResultSink, results_folder
+from energy_module.store import COLUMNS, run_labels
+
+LABELS = ('collection', 'benchmark', 'runtime', 'host')
+
+# Columns of `runs`; every other known result column is a metric in `samples`
+RUN_COLUMNS = ('function', 'run', 'timestamp', 'phase', 'status', 'error', 'output_sha256')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts       (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS collections (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS benchmarks  (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS runtimes    (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    collection_id INTEGER NOT NULL REFERENCES collections(id),
+    benchmark_id  INTEGER NOT NULL REFERENCES benchmarks(id),
+    runtime_id    INTEGER NOT NULL REFERENCES runtimes(id),
+    host_id       INTEGER NOT NULL REFERENCES hosts(id),
+    function      TEXT,
+    run           INTEGER,
+    timestamp     TEXT,
+    phase         TEXT,
+    status        TEXT,
+    error         TEXT,
+    output_sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_benchmark_runtime_collection ON runs (benchmark_id, runtime_id, collection_id);
+CREATE INDEX IF NOT EXISTS runs_host ON runs (host_id);
+
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    metric TEXT NOT NULL,
+    value  REAL,
+    PRIMARY KEY (run_id, metric)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_metric ON samples (metric);
+"""
+
+
+def database_path() -> str:
+    """
+    ENERGY_MICROSCOPE_DATABASE, or `results.sqlite` in the results folder.
+    """
+    return os.environ.get("ENERGY_MICROSCOPE_DATABASE") or results_folder("results.sqlite")
+
+
+class ResultDatabase:
+    """
+    SQLite database of measured runs.
+
+    Labels (hosts, collections, benchmarks, runtimes) are stored once and
+    referenced by id; every run is one row of `runs`, and its measured
+    values (`package_uj`, `execution_time_s`, ... as named in
+    `energy_module.store.COLUMNS`) are rows of `samples`. The database runs
+    in WAL mode, so analysis can read while benchmarks write, and each
+    `insert` is a single transaction.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or database_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        self._ids: Dict[Tuple[str, str], int] = {}
+
+    def _label_id(self, table: str, name: str) -> int:
+        key = (table, name)
+        if key not in self._ids:
+            self.connection.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            (self._ids[key],) = self.connection.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+        return self._ids[key]
+
+    def insert(self, labels: Dict[str, str], columns: Dict[str, Sequence]) -> None:
+        """
+        Insert runs given as store column name -> values, as for
+        `ResultStore.append`, in one transaction. `labels` names their
+        collection, benchmark, runtime and host; null values are skipped.
+        """
+        run_fields = [name for name in RUN_COLUMNS if name in columns]
+        metrics = [name for name in columns if name not in RUN_COLUMNS and name not in LABELS]
+        insert_run = (
+            f"INSERT INTO runs (collection_id, benchmark_id, runtime_id, host_id, {', '.join(run_fields)}) "
+            f"VALUES ({', '.join('?' * (len(LABELS) + len(run_fields)))})"
+        )
+
+        with self.connection:
+            label_ids = [self._label_id(f"{name}s", labels[name]) for name in LABELS]
+            samples = []
+            for row in zip(*(columns[name] for name in run_fields + metrics)):
+                cursor = self.connection.execute(insert_run, label_ids + list(row[:len(run_fields)]))
+                samples.extend(
+                    (cursor.lastrowid, metric, value)
+                    for metric, value in zip(metrics, row[len(run_fields):])
+                    if value is not None
+                )
+            self.connection.executemany("INSERT INTO samples (run_id, metric, value) VALUES (?, ?, ?)", samples)
+
+    def values(
+        self,
+        metric: str,
+        group_by: Sequence[str] = ('benchmark', 'runtime'),
+        status: Optional[str] = 'ok',
+        phase: Optional[str] = None,
+        **labels: str,
+    ) -> Dict[Tuple, List[float]]:
+        """
+        Values of one metric grouped by labels, e.g.
+        `db.values("package_uj", group_by=("runtime",), benchmark="nbody", host="lab-1")`.
+
+        Keyword arguments filter on collection, benchmark, runtime or host.
+        Only runs with `status` (default "ok") and, if given, `phase` count.
+        """
+        for name in (*group_by, *labels):
+            if name not in LABELS:
+                raise ValueError(f"Unknown label '{name}'. Available: {', '.join(LABELS)}")
+
+        conditions = ["samples.metric = ?"]
+        parameters: List = [metric]
+        for name, value in labels.items():
+            conditions.append(f"{name}s.name = ?")
+            parameters.append(value)
+        if status is not None:
+            # Collections recorded before runs had a status only hold successful runs
+            conditions.append("COALESCE(runs.status, 'ok') = ?")
+            parameters.append(status)
+        if phase is not None:
+            conditions.append("runs.phase = ?")
+            parameters.append(phase)
+
+        select = ", ".join(f"{name}s.name" for name in group_by)
+        query = f"""
+            SELECT {select + ', ' if select else ''}samples.value
+            FROM runs
+            JOIN samples ON samples.run_id = runs.id
+            JOIN collections ON collections.id = runs.collection_id
+            JOIN benchmarks ON benchmarks.id = runs.benchmark_id
+            JOIN runtimes ON runtimes.id = runs.runtime_id
+            JOIN hosts ON hosts.id = runs.host_id
+            WHERE {' AND '.join(conditions)}
+        """
+
+        groups: Dict[Tuple, List[float]] = defaultdict(list)
+        for *key, value in self.connection.execute(query, parameters):
+            groups[tuple(key)].append(value)
+        return dict(groups)
+
+    def summary(self, metric: str, group_by: Sequence[str] = ('benchmark', 'runtime'), **filters) -> Dict[Tuple, Dict[str, float]]:
+        """
+        Count, mean, median, standard deviation, min and max of a metric per
+        group; takes the same arguments as `values`.
+        """
+        return {
+            key: {
+                'count': len(values),
+                'mean': statistics.fmean(values),
+                'median': statistics.median(values),
+                'std': statistics.stdev(values) if len(values) > 1 else 0.0,
+                'min': min(values),
+                'max': max(values),
+            }
+            for key, values in self.values(metric, group_by, **filters).items()
+        }
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class SqliteResultSink(ResultSink):
+    """
+    Buffer measurement rows and insert them into the `ResultDatabase` in
+    one transaction per flush, mapping the header as `ParquetResultSink`
+    does. Labels come from `run_labels`.
+    """
+    def __init__(
+        self,
+        file_path: str,
+        header: List[str],
+        capacity: int,
+        on_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(file_path, header, max(1, capacity), on_flush)
+        self.labels = run_labels(os.path.splitext(os.path.basename(file_path))[0])
+        self._rows: List[Sequence] = []
+
+    def append(self, row: Sequence) -> None:
+        self._rows.append(row)
+        if len(self._rows) == self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+
+        columns: Dict[str, List] = {}
+        for index, name in enumerate(self.header):
+            if name in COLUMNS:
+                columns[COLUMNS[name]] = [None if row[index] == '' else row[index] for row in self._rows]
+        columns['timestamp'] = [datetime.fromtimestamp(value).isoformat() for value in columns['timestamp']]
+
+        database = ResultDatabase()
+        try:
+            database.insert(self.labels, columns)
+        finally:
+            database.close()
+        self._rows = []
+
+        if self.on_flush is not None:
+            self.on_flush()
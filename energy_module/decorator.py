@@ -1,15 +1,15 @@
-import pyRAPL
-import csv
-import os
 import platform
 import psutil
-import json
-from functools import wraps
-from typing import Callable
-from datetime import datetime
+from typing import Callable, Optional, Type
 
-# Set up pyRAPL
-pyRAPL.setup()
+from energy_module.adaptive import AdaptiveSampler
+from energy_module.backend import EnergyBackend
+from energy_module.baseline import IdleBaseline
+from energy_module.batch import measured
+from energy_module.output import OutputPolicy
+from energy_module.sampler import PowerSampler
+from energy_module.sink import ResultSink
+from energy_module.warmup import WarmupDetector
 
 def get_system_info(result_file_path: str):
     """
@@ -31,49 +31,32 @@ def get_system_info(result_file_path: str):
         "camera": "disabled",
     }
 
-def measure_energy_to_csv(n: int, csv_filename: str, folder_name: str = "energy_benchmark"):
+def measure_energy_to_csv(
+    n: int,
+    csv_filename: str,
+    folder_name: str = "energy_benchmark",
+    adaptive: Optional[AdaptiveSampler] = None,
+    warmup: Optional[WarmupDetector] = None,
+    batch_size: Optional[int] = None,
+    sink: Optional[Type[ResultSink]] = None,
+    baseline: Optional[IdleBaseline] = None,
+    backend: Optional[EnergyBackend] = None,
+    sampler: Optional[PowerSampler] = None,
+    resume: bool = False,
+    output: Optional[OutputPolicy] = None,
+):
     """
     Decorator to measure energy usage, store system info in a JSON file, 
     and store energy results in a CSV file.
+
+    Every run records `package (uJ)` and `dram (uJ)`. The arguments are
+    those of `energy_module.batch.run_batch`, which runs the batch.
     """
     def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Create the directory if it doesn't exist
-            os.makedirs(folder_name, exist_ok=True)
-
-            # Create file paths
-            result_file_path = os.path.join(folder_name, f"{csv_filename}.csv")
-            system_info_path = os.path.join(folder_name, "system_info_pyrapl.json")
-
-            # Write system info to JSON if the file does not exist
-            if not os.path.isfile(system_info_path):
-                system_info = get_system_info(result_file_path)
-                with open(system_info_path, "w") as json_file:
-                    json.dump(system_info, json_file, indent=4)
-
-            # Open the result CSV file and write the data
-            with open(result_file_path, mode='a', newline='') as result_file:
-                writer = csv.writer(result_file)
-
-                # If file doesn't exist, write the header
-                if result_file.tell() == 0:
-                    writer.writerow(['timestamp', 'function', 'run', 'package (uJ)', 'dram (uJ)'])
-
-                # Run the function n times and log energy usage
-                for i in range(1, n + 1):
-                    measurement = pyRAPL.Measurement(label=f"{func.__name__}_run_{i}")
-                    measurement.begin()
-                    result = func(*args, **kwargs)
-                    measurement.end()
-
-                    writer.writerow([
-                        datetime.now().isoformat(),
-                        func.__name__,
-                        i,
-                        measurement.result.pkg[0],
-                        measurement.result.dram[0] if measurement.result.dram else 0
-                    ])
-            return result
-        return wrapper
+        return measured(
+            func, csv_filename, folder_name, "system_info_pyrapl.json", get_system_info,
+            n=n, metrics=("energy",), adaptive=adaptive, warmup=warmup,
+            batch_size=batch_size, sink=sink, baseline=baseline, backend=backend,
+            sampler=sampler, resume=resume, output=output,
+        )
     return decorator
@@ -0,0 +1,51 @@
+from typing import Callable, Optional, Type
+
+from energy_module.adaptive import AdaptiveSampler
+from energy_module.backend import EnergyBackend
+from energy_module.baseline import IdleBaseline
+from energy_module.batch import batch_header, measured
+from energy_module.decorator import get_system_info
+from energy_module.output import OutputPolicy
+from energy_module.sampler import PowerSampler
+from energy_module.sink import ResultSink
+from energy_module.warmup import WarmupDetector
+
+METRICS = ("time", "cpu", "energy", "rss")
+
+HEADER = batch_header(METRICS)
+
+
+def measure(
+    n: int,
+    csv_filename: str,
+    folder_name: str = "benchmark",
+    clock: str = "perf_counter",
+    adaptive: Optional[AdaptiveSampler] = None,
+    warmup: Optional[WarmupDetector] = None,
+    batch_size: Optional[int] = None,
+    sink: Optional[Type[ResultSink]] = None,
+    baseline: Optional[IdleBaseline] = None,
+    backend: Optional[EnergyBackend] = None,
+    sampler: Optional[PowerSampler] = None,
+    resume: bool = False,
+    output: Optional[OutputPolicy] = None,
+):
+    """
+    Decorator to measure wall time, CPU time, energy and peak memory of the
+    same run, and store one combined row per run in a CSV file.
+
+    This replaces stacking `measure_energy_to_csv` and `measure_time_to_csv`,
+    which executes the workload 2 * n times. The `package (uJ)` and
+    `execution_time (s)` columns keep their names, so `scripts/energy_avg.py`
+    and `scripts/time_avg.py` can both read the combined file; an adaptive
+    run stops once both package energy and wall time have converged. The
+    arguments are those of `energy_module.batch.run_batch`.
+    """
+    def decorator(func: Callable):
+        return measured(
+            func, csv_filename, folder_name, "system_info.json", get_system_info,
+            n=n, metrics=METRICS, clock=clock, adaptive=adaptive, warmup=warmup,
+            batch_size=batch_size, sink=sink, baseline=baseline, backend=backend,
+            sampler=sampler, resume=resume, output=output,
+        )
+    return decorator
@@ -0,0 +1,151 @@
+import ctypes
+import hashlib
+import os
+import re
+import sys
+import tempfile
+from typing import Optional, Set, Tuple
+
+OUTPUT_MODES = ("discard", "capture", "hash")
+OUTPUT_HEADER = ['output', 'output_bytes', 'output_sha256']
+
+FLOAT_PATTERN = re.compile(rb"[-+]?(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|[-+]?\d+[eE][-+]?\d+")
+
+_libc = ctypes.CDLL(None)
+
+
+def canonical_digest(data: bytes, float_digits: Optional[int] = None) -> str:
+    """
+    SHA-256 of a benchmark's output.
+
+    With `float_digits`, every decimal number in the text is first rounded
+    to that many significant digits, so variants whose floating-point
+    results differ only in the last bits (C vs Python, FMA, summation
+    order) produce the same digest.
+    """
+    if float_digits:
+        data = FLOAT_PATTERN.sub(lambda match: format(float(match.group()), f".{float_digits}g").encode(), data)
+    return hashlib.sha256(data).hexdigest()
+
+
+class OutputPolicy:
+    """
+    Keep a benchmark's stdout away from the terminal while it is measured.
+
+    The redirection happens on file descriptor 1, so output written by C
+    code (Ctypes, Cython) is covered as well as `print`:
+
+    * "discard": stdout goes to /dev/null.
+    * "capture": stdout goes into an in-memory file of `capacity` bytes,
+      allocated once and rewound for every run; `captured()` returns it.
+    * "hash": as "capture", and the `canonical_digest` of the output is
+      computed after the run, outside the measured window, so results can
+      still be verified without being printed. The distinct digests of a
+      batch are appended to `digests_path` on `close()`, if given.
+    """
+    def __init__(
+        self,
+        mode: str = "discard",
+        capacity: int = 1 << 24,
+        float_digits: Optional[int] = None,
+        digests_path: Optional[str] = None,
+    ) -> None:
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{mode}'. Available: {', '.join(OUTPUT_MODES)}")
+        self.mode = mode
+        self.capacity = capacity
+        self.float_digits = float_digits
+        self.digests_path = digests_path
+        self.digests: Set[str] = set()
+        self.length = 0
+        self._target: Optional[int] = None
+        self._saved_fd: Optional[int] = None
+        self._saved_stdout = None
+
+    @classmethod
+    def from_env(cls) -> Optional["OutputPolicy"]:
+        """
+        Policy selected by ENERGY_MICROSCOPE_OUTPUT (set by the suite
+        runner), or None to leave stdout alone. ENERGY_MICROSCOPE_FLOAT_DIGITS
+        and ENERGY_MICROSCOPE_DIGESTS set `float_digits` and `digests_path`.
+        """
+        mode = os.environ.get("ENERGY_MICROSCOPE_OUTPUT")
+        if not mode or mode == "inherit":
+            return None
+        float_digits = os.environ.get("ENERGY_MICROSCOPE_FLOAT_DIGITS")
+        return cls(
+            mode,
+            float_digits=int(float_digits) if float_digits else None,
+            digests_path=os.environ.get("ENERGY_MICROSCOPE_DIGESTS"),
+        )
+
+    def _open_target(self) -> int:
+        if self.mode == "discard":
+            return os.open(os.devnull, os.O_WRONLY)
+        if hasattr(os, "memfd_create"):
+            fd = os.memfd_create("energy_microscope_stdout")
+        else:
+            fd = os.dup(tempfile.TemporaryFile().fileno())
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, self.capacity)
+        return fd
+
+    def start(self) -> None:
+        """
+        Redirect stdout for one run.
+        """
+        if self._target is None:
+            self._target = self._open_target()
+        os.lseek(self._target, 0, os.SEEK_SET)
+
+        sys.stdout.flush()
+        _libc.fflush(None)
+        self._saved_fd = os.dup(1)
+        os.dup2(self._target, 1)
+        # Block-buffered even when the real stdout is a terminal
+        self._saved_stdout = sys.stdout
+        sys.stdout = open(1, "w", buffering=1 << 16, closefd=False)
+
+    def stop(self) -> None:
+        """
+        Flush what the run wrote and restore stdout.
+        """
+        sys.stdout.flush()
+        _libc.fflush(None)
+        sys.stdout = self._saved_stdout
+        self.length = os.lseek(self._target, 0, os.SEEK_CUR)
+        os.dup2(self._saved_fd, 1)
+        os.close(self._saved_fd)
+        self._saved_fd = None
+
+    def captured(self) -> bytes:
+        """
+        Output of the last run ("capture" and "hash" modes).
+        """
+        if self.mode == "discard":
+            return b""
+        return os.pread(self._target, self.length, 0)
+
+    def columns(self) -> Tuple:
+        """
+        Values of the OUTPUT_HEADER columns for the last run.
+        """
+        if self.mode == "discard":
+            return self.mode, "", ""
+        if self.mode == "capture":
+            return self.mode, self.length, ""
+        digest = canonical_digest(self.captured(), self.float_digits)
+        self.digests.add(digest)
+        return self.mode, self.length, digest
+
+    def close(self) -> None:
+        if self._saved_fd is not None:
+            # The batch raised while stdout was redirected
+            self.stop()
+        if self.digests_path and self.digests:
+            with open(self.digests_path, "a") as digests_file:
+                digests_file.writelines(f"{digest}\n" for digest in sorted(self.digests))
+        self.digests = set()
+        if self._target is not None:
+            os.close(self._target)
+            self._target = None
@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+RUN_STATUS_HEADER = ['status', 'error']
+
+
+class BatchProgress:
+    """
+    Checkpoint of one measurement batch, kept next to the result file as
+    `<result file>.progress.json`.
+
+    The decorators report every run through `record` and the sink calls
+    `save` after each flush, so the checkpoint never counts a run whose row
+    is not in the result file yet. A checkpoint left with status "running",
+    "failed" or "interrupted" marks the rows of that batch as partial; with
+    `resume`, the next batch of the same function and `n` continues after
+    the last saved run instead of starting from run 1.
+    """
+    def __init__(self, result_file_path: str, function: str, n: int) -> None:
+        self.path = f"{result_file_path}.progress.json"
+        self.state = {
+            "function": function,
+            "n": n,
+            "status": "running",
+            "last_run": 0,
+            "steady_runs": 0,
+            "failed_runs": 0,
+            "error": None,
+            "stop_reason": None,
+        }
+
+    def resume(self) -> Tuple[int, int]:
+        """
+        Continue an unfinished batch of the same function and `n`.
+
+        Returns the last saved run number and the number of steady runs it
+        already holds, or (0, 0) when there is nothing to resume.
+        """
+        try:
+            with open(self.path) as progress_file:
+                previous = json.load(progress_file)
+        except (OSError, ValueError):
+            return 0, 0
+
+        if previous.get("status") == "complete":
+            return 0, 0
+        if (previous.get("function"), previous.get("n")) != (self.state["function"], self.state["n"]):
+            return 0, 0
+
+        self.state.update(previous, status="running", error=None, stop_reason=None)
+        return self.state["last_run"], self.state["steady_runs"]
+
+    def record(self, run: int, phase: str, error: Optional[BaseException] = None) -> Tuple[str, str]:
+        """
+        Account for a finished run and return its (status, error) columns.
+        """
+        self.state["last_run"] = run
+        if error is None:
+            if phase == "steady":
+                self.state["steady_runs"] += 1
+            return "ok", ""
+
+        message = f"{type(error).__name__}: {error}"
+        self.state["failed_runs"] += 1
+        self.state["error"] = message
+        self.state["status"] = "failed" if isinstance(error, Exception) else "interrupted"
+        self.state["stop_reason"] = "error"
+        return "error", message
+
+    def save(self) -> None:
+        self.state["updated"] = datetime.now().isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as progress_file:
+            json.dump(self.state, progress_file, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def finish(self, stop_reason: Optional[str] = None) -> None:
+        """
+        Mark the batch complete. `stop_reason` records why an adaptive
+        schedule stopped early (see `RunSchedule.stop_reason`); with
+        "time_budget" or "energy_budget" and `steady_runs` 0, the budget was
+        used up during warm-up and no steady run was measured.
+        """
+        self.state["status"] = "complete"
+        self.state["stop_reason"] = stop_reason
+        self.save()
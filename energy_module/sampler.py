@@ -0,0 +1,153 @@
+import array
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from energy_module.backend import EnergyBackend, get_backend
+
+_active: Optional["PowerSampler"] = None
+
+
+def mark(label: str) -> None:
+    """
+    Record a phase marker in the running sampler, e.g. mark("allocate").
+
+    Benchmarks can call this unconditionally: it does nothing when no
+    sampler is running.
+    """
+    if _active is not None:
+        _active.mark(label)
+
+
+class PowerSampler:
+    """
+    Polls the RAPL counters from a background thread during a run.
+
+    Every `interval` seconds (1-10 ms is sensible) a sample of
+    `perf_counter_ns` and all raw domain counters is appended to an
+    in-memory array. `stop()` writes the samples to `<path>.bin` as native
+    int64 values, one row of `1 + len(domains)` values per sample, and the
+    domains, counter ranges and phase markers to `<path>.json`.
+
+    The thread shares the GIL with the benchmark, so a shorter interval
+    resolves finer phases but perturbs the run more.
+    """
+    def __init__(self, interval: float = 0.005, backend: Optional[EnergyBackend] = None) -> None:
+        self.interval = interval
+        self.backend = backend
+        self.path: Optional[str] = None
+        self.samples = array.array("q")
+        self.markers: List[Tuple[int, str]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, backend: Optional[EnergyBackend] = None) -> Optional["PowerSampler"]:
+        """
+        Sampler selected by ENERGY_MICROSCOPE_SAMPLER (the polling interval
+        in seconds, set by the suite runner), or None when it is unset or 0.
+        """
+        interval = float(os.environ.get("ENERGY_MICROSCOPE_SAMPLER") or 0)
+        return cls(interval, backend) if interval > 0 else None
+
+    def start(self, path: str) -> None:
+        global _active
+        self.backend = self.backend or get_backend()
+        self.domains = self.backend.domains()
+        self.path = path
+        self.samples = array.array("q")
+        self.markers = []
+        self._stop.clear()
+        self._sample()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        _active = self
+
+    def mark(self, label: str) -> None:
+        self.markers.append((time.perf_counter_ns(), label))
+
+    def stop(self) -> None:
+        global _active
+        _active = None
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.bin", "wb") as series:
+            self.samples.tofile(series)
+        with open(f"{self.path}.json", "w") as meta:
+            json.dump({
+                "interval": self.interval,
+                "domains": self.domains,
+                "max_range": [self.backend.max_range.get(domain, 0) for domain in self.domains],
+                "markers": self.markers,
+            }, meta)
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        reading = self.backend.read()
+        self.samples.append(time.perf_counter_ns())
+        self.samples.extend(reading[domain] for domain in self.domains)
+
+
+def load_trace(path: str) -> Dict:
+    """
+    Read a trace written by `PowerSampler.stop()`.
+
+    Returns the sample times (`time_ns`), the cumulative energy of every
+    domain since the first sample in uJ with counter wraparounds removed
+    (`energy`), and the phase `markers`.
+    """
+    with open(f"{path}.json") as meta_file:
+        meta = json.load(meta_file)
+    samples = array.array("q")
+    with open(f"{path}.bin", "rb") as series:
+        samples.frombytes(series.read())
+
+    width = len(meta["domains"]) + 1
+    time_ns = list(samples[0::width])
+    energy = {}
+    for column, (domain, max_range) in enumerate(zip(meta["domains"], meta["max_range"]), start=1):
+        counters = samples[column::width]
+        total, cumulative = 0, [0]
+        for before, after in zip(counters, counters[1:]):
+            total += after - before if after >= before else after + max_range - before
+            cumulative.append(total)
+        energy[domain] = cumulative
+
+    return {"time_ns": time_ns, "energy": energy, "markers": [tuple(marker) for marker in meta["markers"]]}
+
+
+def _energy_at(time_ns: List[int], cumulative: List[int], t: int) -> float:
+    """
+    Cumulative energy at time `t`, linearly interpolated between samples.
+    """
+    i = bisect.bisect_right(time_ns, t)
+    if i == 0:
+        return cumulative[0]
+    if i == len(time_ns):
+        return cumulative[-1]
+    t0, t1 = time_ns[i - 1], time_ns[i]
+    return cumulative[i - 1] + (cumulative[i] - cumulative[i - 1]) * (t - t0) / (t1 - t0)
+
+
+def phase_energy(trace: Dict, domain: str = "package-0") -> List[Tuple[str, float, float]]:
+    """
+    Split a trace at its markers: each phase runs from its marker to the
+    next one (or the last sample). Returns (label, seconds, energy in uJ)
+    per phase, in order.
+    """
+    time_ns, cumulative = trace["time_ns"], trace["energy"][domain]
+    markers = trace["markers"]
+    bounds = [t for t, _ in markers] + [time_ns[-1]]
+    return [
+        (label, (end - start) / 1e9, _energy_at(time_ns, cumulative, end) - _energy_at(time_ns, cumulative, start))
+        for (start, label), end in zip(markers, bounds[1:])
+    ]
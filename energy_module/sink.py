@@ -0,0 +1,137 @@
+import csv
+import os
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Type
+
+
+def results_folder(folder_name: str) -> str:
+    """
+    Resolve a decorator's output folder.
+
+    The suite runner sets ENERGY_MICROSCOPE_RESULTS so that every benchmark
+    writes under one results directory regardless of its working directory.
+    """
+    return os.path.join(os.environ.get("ENERGY_MICROSCOPE_RESULTS", ""), folder_name)
+
+
+class ResultSink:
+    """
+    Base class for the destinations measurement rows are written to.
+
+    A sink receives one row per measured run through `append` and is free to
+    hold the rows in memory until `flush` (or `close`) is called. Keeping the
+    actual write out of `append` is what keeps file I/O out of the measured
+    window. `on_flush`, if given, is called after every write.
+    """
+    def __init__(
+        self,
+        file_path: str,
+        header: List[str],
+        capacity: int,
+        on_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.file_path = file_path
+        self.header = header
+        self.capacity = capacity
+        self.on_flush = on_flush
+
+    def append(self, row: Sequence) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class CsvResultSink(ResultSink):
+    """
+    Buffer measurement rows in a preallocated list and append them to a CSV
+    file in a single bulk write.
+
+    The buffer holds `capacity` rows; when it is full it is flushed
+    automatically, so `capacity` doubles as the batch size. The first column
+    of every row is expected to be a POSIX timestamp (`time.time()`) and is
+    rendered as ISO 8601 only when the rows are written.
+
+    Rows are only appended to a file whose header matches `header`; an
+    existing file with other columns (e.g. written before the baseline or
+    output columns were enabled) raises ValueError before any run.
+    """
+    def __init__(
+        self,
+        file_path: str,
+        header: List[str],
+        capacity: int,
+        on_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(file_path, header, max(1, capacity), on_flush)
+        self._check_header()
+        self._rows: List[Optional[Sequence]] = [None] * self.capacity
+        self._count = 0
+
+    def _check_header(self) -> None:
+        try:
+            with open(self.file_path, newline='') as result_file:
+                existing = next(csv.reader(result_file), None)
+        except FileNotFoundError:
+            return
+        if existing is not None and existing != list(self.header):
+            raise ValueError(
+                f"{self.file_path} has the columns {existing}, not {list(self.header)}; "
+                f"move it away or write to another csv_filename"
+            )
+
+    def append(self, row: Sequence) -> None:
+        self._rows[self._count] = row
+        self._count += 1
+        if self._count == self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._count == 0:
+            return
+
+        with open(self.file_path, mode='a', newline='') as result_file:
+            writer = csv.writer(result_file)
+
+            # If the file is new or empty, write the header (an existing one was checked in __init__)
+            if result_file.tell() == 0:
+                writer.writerow(self.header)
+
+            writer.writerows(
+                [datetime.fromtimestamp(row[0]).isoformat(), *row[1:]]
+                for row in self._rows[:self._count]
+            )
+
+        for i in range(self._count):
+            self._rows[i] = None
+        self._count = 0
+
+        if self.on_flush is not None:
+            self.on_flush()
+
+
+def default_sink() -> Type[ResultSink]:
+    """
+    Sink used when a decorator is not given one: ENERGY_MICROSCOPE_SINK
+    selects "csv" (the default), "parquet" (`energy_module.store`) or
+    "sqlite" (`energy_module.database`).
+    """
+    name = os.environ.get("ENERGY_MICROSCOPE_SINK", "csv")
+    if name == "parquet":
+        from energy_module.store import ParquetResultSink
+        return ParquetResultSink
+    if name == "sqlite":
+        from energy_module.database import SqliteResultSink
+        return SqliteResultSink
+    if name != "csv":
+        raise ValueError(f"Unknown result sink '{name}'. Available: csv, parquet, sqlite")
+    return CsvResultSink
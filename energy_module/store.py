@@ -0,0 +1,216 @@
+import os
+import socket
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow is optional, only the columnar store needs it
+    pa = ds = None
+
+from energy_module.sink import ResultSink, results_folder
+
+# Result file column -> store column
+COLUMNS = {
+    'timestamp': 'timestamp',
+    'function': 'function',
+    'run': 'run',
+    'phase': 'phase',
+    'status': 'status',
+    'error': 'error',
+    'package (uJ)': 'package_uj',
+    'dram (uJ)': 'dram_uj',
+    'package_net (uJ)': 'package_net_uj',
+    'dram_net (uJ)': 'dram_net_uj',
+    'execution_time (s)': 'execution_time_s',
+    'cpu_time (s)': 'cpu_time_s',
+    'peak_rss (KB)': 'peak_rss_kb',
+    'output_sha256': 'output_sha256',
+}
+
+# Stored as hive partitions (collection=.../runtime=.../) rather than in the files
+PARTITIONS = ['collection', 'runtime']
+
+# Result file name suffix -> runtime; the py_compile variants name their files `<benchmark>_py_compile`
+RUNTIME_SUFFIXES = {
+    'cpython': 'cpython',
+    'pypy': 'pypy',
+    'cython': 'cython',
+    'ctypes': 'ctypes',
+    'pycompile': 'pycompile',
+    'py_compile': 'pycompile',
+    'soa': 'soa',
+    'numpy': 'numpy',
+}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("The columnar result store needs pyarrow: pip install pyarrow")
+
+
+def schema() -> "pa.Schema":
+    """
+    Typed columns of the store; every row is one measured run.
+    """
+    _require_pyarrow()
+    return pa.schema([
+        ('collection', pa.string()),
+        ('runtime', pa.string()),
+        ('benchmark', pa.string()),
+        ('host', pa.string()),
+        ('function', pa.string()),
+        ('run', pa.int32()),
+        ('timestamp', pa.timestamp('us')),
+        ('phase', pa.string()),
+        ('status', pa.string()),
+        ('error', pa.string()),
+        ('package_uj', pa.float64()),
+        ('dram_uj', pa.float64()),
+        ('package_net_uj', pa.float64()),
+        ('dram_net_uj', pa.float64()),
+        ('execution_time_s', pa.float64()),
+        ('cpu_time_s', pa.float64()),
+        ('peak_rss_kb', pa.int64()),
+        ('output_sha256', pa.string()),
+    ])
+
+
+def store_folder() -> str:
+    """
+    Root of the store: ENERGY_MICROSCOPE_STORE, or `store/` in the results folder.
+    """
+    return os.environ.get("ENERGY_MICROSCOPE_STORE") or results_folder("store")
+
+
+class ResultStore:
+    """
+    Append-only Parquet dataset of measured runs.
+
+    Every `append` writes a new part file under
+    `<root>/collection=<c>/runtime=<r>/`, so concurrent writers never touch
+    the same file and existing data is never rewritten. `read` scans the
+    dataset with predicate pushdown: partition filters skip whole
+    directories and column filters skip row groups by their statistics.
+    """
+    def __init__(self, root: Optional[str] = None) -> None:
+        _require_pyarrow()
+        self.root = root or store_folder()
+        self.schema = schema()
+
+    def append(self, rows: Dict[str, Sequence]) -> None:
+        """
+        Append runs given as column name -> values; missing columns are null.
+        """
+        length = len(next(iter(rows.values())))
+        table = pa.table({
+            field.name: pa.array(rows.get(field.name, [None] * length), field.type)
+            for field in self.schema
+        })
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONS,
+            partitioning_flavor="hive",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def dataset(self) -> "ds.Dataset":
+        return ds.dataset(self.root, schema=self.schema, format="parquet", partitioning="hive")
+
+    def read(self, columns: Optional[List[str]] = None, filter: Optional["ds.Expression"] = None, **equals: Any) -> "pa.Table":
+        """
+        Read matching runs, e.g.
+        `store.read(["runtime", "package_uj"], benchmark="nbody", status="ok")`.
+
+        Keyword arguments are equality predicates and are combined with
+        `filter`, a `pyarrow.dataset` expression such as
+        `ds.field("package_uj") > 1e6`.
+        """
+        for name, value in equals.items():
+            predicate = ds.field(name) == value
+            filter = predicate if filter is None else filter & predicate
+        return self.dataset().to_table(columns=columns, filter=filter)
+
+
+def split_result_name(csv_filename: str) -> Tuple[str, str]:
+    """
+    Benchmark and runtime of a `<benchmark>_<runtime>` result file name,
+    e.g. `nbody_py_compile` -> ("nbody", "pycompile").
+
+    The known runtime suffixes are matched longest first, so runtimes with
+    an underscore are not split; other names are split at the last
+    underscore.
+    """
+    for suffix in sorted(RUNTIME_SUFFIXES, key=len, reverse=True):
+        if csv_filename.endswith(f"_{suffix}"):
+            return csv_filename[:-len(suffix) - 1], RUNTIME_SUFFIXES[suffix]
+    benchmark, _, runtime = csv_filename.rpartition("_")
+    return benchmark, runtime
+
+
+def run_labels(csv_filename: str) -> Dict[str, str]:
+    """
+    Collection, benchmark, runtime and host of the rows of one result file.
+
+    The benchmark and runtime are taken from the `<benchmark>_<runtime>`
+    result file name (see `split_result_name`), as in the existing
+    collections. The suite runner exports the
+    collection and runtime as ENERGY_MICROSCOPE_COLLECTION and
+    ENERGY_MICROSCOPE_RUNTIME; ENERGY_MICROSCOPE_BENCHMARK and
+    ENERGY_MICROSCOPE_HOST override the remaining labels.
+    """
+    benchmark, runtime = split_result_name(csv_filename)
+    return {
+        'collection': os.environ.get("ENERGY_MICROSCOPE_COLLECTION", "default"),
+        'benchmark': os.environ.get("ENERGY_MICROSCOPE_BENCHMARK") or benchmark or csv_filename,
+        'runtime': os.environ.get("ENERGY_MICROSCOPE_RUNTIME") or runtime or "unknown",
+        'host': os.environ.get("ENERGY_MICROSCOPE_HOST") or socket.gethostname(),
+    }
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Buffer measurement rows and append them to the columnar `ResultStore`
+    instead of a CSV file.
+
+    Rows are converted to typed columns on flush using the decorator's
+    header; columns the store does not know (e.g. idle power) are dropped.
+    Collection, benchmark, runtime and host come from `run_labels`.
+    """
+    def __init__(
+        self,
+        file_path: str,
+        header: List[str],
+        capacity: int,
+        on_flush: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(file_path, header, max(1, capacity), on_flush)
+        self.store = ResultStore()
+        self.labels = run_labels(os.path.splitext(os.path.basename(file_path))[0])
+        self._rows: List[Sequence] = []
+
+    def append(self, row: Sequence) -> None:
+        self._rows.append(row)
+        if len(self._rows) == self.capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+
+        columns: Dict[str, List] = {name: [label] * len(self._rows) for name, label in self.labels.items()}
+        for index, name in enumerate(self.header):
+            if name in COLUMNS:
+                columns[COLUMNS[name]] = [None if row[index] == '' else row[index] for row in self._rows]
+        # POSIX seconds -> microseconds
+        columns['timestamp'] = [int(value * 1e6) for value in columns['timestamp']]
+
+        self.store.append(columns)
+        self._rows = []
+
+        if self.on_flush is not None:
+            self.on_flush()
@@ -0,0 +1,94 @@
+import math
+from typing import List, Optional
+
+
+def find_changepoint(values: List[float], min_size: int = 2, penalty: Optional[float] = None) -> Optional[int]:
+    """
+    Find the single most likely shift in the mean of a series.
+
+    Every split point leaving at least `min_size` values on each side is
+    scored by the drop in sum of squared errors of a two-mean model compared
+    to a one-mean model. The best split is accepted when the Gaussian
+    log-likelihood gain exceeds `penalty` (default 3 * ln(n), a conservative
+    BIC-style threshold).
+
+    Returns:
+        int: Index of the first value after the shift, or None.
+    """
+    n = len(values)
+    if n < 2 * min_size:
+        return None
+    if penalty is None:
+        penalty = 3 * math.log(n)
+
+    prefix = [0.0]
+    prefix_sq = [0.0]
+    for value in values:
+        prefix.append(prefix[-1] + value)
+        prefix_sq.append(prefix_sq[-1] + value * value)
+
+    def sse(start: int, end: int) -> float:
+        total = prefix[end] - prefix[start]
+        return max(prefix_sq[end] - prefix_sq[start] - total * total / (end - start), 0.0)
+
+    full = sse(0, n)
+    if full == 0.0:
+        return None
+
+    best_index, best_cost = None, full
+    for k in range(min_size, n - min_size + 1):
+        cost = sse(0, k) + sse(k, n)
+        if cost < best_cost:
+            best_index, best_cost = k, cost
+
+    if best_index is None:
+        return None
+    if best_cost == 0.0:
+        return best_index
+
+    gain = n * math.log(full / best_cost)
+    return best_index if gain > penalty else None
+
+
+def steady_start(values: List[float], min_size: int = 2, penalty: Optional[float] = None) -> int:
+    """
+    Return the index where the last changepoint-free segment of a series
+    starts, i.e. the number of warm-up values.
+    """
+    start = 0
+    while True:
+        k = find_changepoint(values[start:], min_size, penalty)
+        if k is None:
+            return start
+        start += k
+
+
+class WarmupDetector:
+    """
+    Online warm-up detection for a per-run series (e.g. PyPy JIT warm-up).
+
+    The series is considered steady once its last changepoint-free segment
+    holds at least `2 * window` runs, so that segment has itself been tested
+    for a shift; the runs of that segment are steady, not only the ones
+    after it. `max_warmup` caps the number of warm-up runs.
+    """
+    def __init__(self, window: int = 5, max_warmup: int = 50, penalty: Optional[float] = None) -> None:
+        self.window = window
+        self.max_warmup = max_warmup
+        self.penalty = penalty
+
+    def warmup_length(self, history: List[float]) -> Optional[int]:
+        """
+        Number of warm-up runs at the start of `history`, or None while the
+        series is not steady yet. Once `max_warmup` runs are reached, all of
+        them are warm-up.
+        """
+        if len(history) >= self.max_warmup:
+            return len(history)
+        if len(history) < 2 * self.window:
+            return None
+        start = steady_start(history, self.window, self.penalty)
+        return start if len(history) - start >= 2 * self.window else None
+
+    def is_steady(self, history: List[float]) -> bool:
+        return self.warmup_length(history) is not None
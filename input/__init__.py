@@ -1,75 +1,217 @@
+import hashlib
+import inspect
+import json
+import mmap
+import os
 import random
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
 
-__default__ = {
-    'hanoi': {
+from input.cache import cache_path, map_file, map_value
+
+SEED = 2025
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Generated:
+    """
+    A workload value that is only built when it is first read.
+
+    `build` receives a `random.Random` seeded from the registry seed, the
+    workload name and the key, so the value does not depend on which other
+    values were read before it.
+    """
+    def __init__(self, build: Callable[[random.Random], Any]) -> None:
+        self.build = build
+
+
+class Workload(dict):
+    """
+    Workload parameters that build their `Generated` values on first access.
+    """
+    def __init__(self, values: Dict[str, Any], seed: str) -> None:
+        super().__init__(values)
+        self._seed = seed
+
+    def __getitem__(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        if isinstance(value, Generated):
+            value = value.build(random.Random(f"{self._seed}:{key}"))
+            self[key] = value
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+
+class WorkloadRegistry(Mapping):
+    """
+    Read-only mapping of benchmark name to its workload parameters.
+
+    Each workload is built by its factory on first access and cached, so
+    importing this module is cheap and a benchmark only pays for its own
+    input. Factories receive a `random.Random` seeded from `seed` and the
+    workload name, which makes the random inputs identical across the
+    runtime variants of a benchmark. Values wrapped in `Generated` are only
+    built when they are read.
+
+    Large values can also be read through `mapped()`, which stores them
+    once on disk and returns a read-only memory map that every process (and
+    runtime) shares.
+
+    `overrides` replaces workload parameters, e.g.
+    `{"nbody": {"num_bodies": 10000}}`. Parameters the factory accepts as
+    keyword arguments shape the generated input; all of them replace the
+    values of the returned workload.
+    """
+    def __init__(
+        self,
+        factories: Dict[str, Callable[..., Dict[str, Any]]],
+        seed: int = SEED,
+        overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        self._factories = factories
+        self._overrides = overrides or {}
+        self._cache: Dict[str, Workload] = {}
+        self._maps: Dict[Tuple[str, str], Union[mmap.mmap, memoryview]] = {}
+        self.seed = seed
+
+    def __getitem__(self, name: str) -> Workload:
+        if name not in self._cache:
+            factory = self._factories[name]
+            overrides = self._overrides.get(name, {})
+            accepted = inspect.signature(factory).parameters
+            workload = Workload(
+                factory(
+                    random.Random(f"{self.seed}:{name}"),
+                    **{key: value for key, value in overrides.items() if key in accepted},
+                ),
+                f"{self.seed}:{name}",
+            )
+            workload.update(overrides)
+            self._cache[name] = workload
+        return self._cache[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def mapped(self, name: str, key: str) -> Union[mmap.mmap, memoryview]:
+        """
+        Return a workload value as a read-only memory map instead of a
+        per-process copy.
+
+        A string naming an existing file (an input file of the benchmark) is
+        mapped in place. Other strings are stored in the on-disk cache as raw
+        ASCII bytes and returned as an `mmap`; numeric (nested) lists are
+        stored flat and returned as a memoryview of 64-bit integers ('q') or
+        doubles ('d') with the shape of the nesting. The cache key is the
+        workload name, the key, the seed, the overrides and the factory source,
+        so the cache is checked before the factory runs and a changed factory
+        or override never serves stale data.
+        """
+        if (name, key) not in self._maps:
+            path = cache_path(f"{name}.{key}", self._cache_params(name), self.seed)
+            value = None if os.path.isfile(f"{path}.json") else self[name][key]
+            if isinstance(value, str) and os.path.isfile(value):
+                self._maps[name, key] = map_file(value)
+            else:
+                self._maps[name, key] = map_value(path, lambda: value)
+        return self._maps[name, key]
+
+    def _cache_params(self, name: str) -> Dict[str, Any]:
+        """
+        Everything a workload depends on besides its name and the seed.
+        """
+        source = inspect.getsource(self._factories[name])
+        return {
+            "overrides": self._overrides.get(name, {}),
+            "factory": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+        }
+
+
+__factories__ = {
+    'hanoi': lambda rng: {
         'test_n': 50,
         'n': 18,
     },
 
-    'strassen': {
+    'strassen': lambda rng: {
         'test_n': 50,
-        'A': [[random.randint(0, 10) for _ in range(128)] for _ in range(128)],
-        'B': [[random.randint(0, 10) for _ in range(128)] for _ in range(128)],
+        'A': [[rng.randint(0, 10) for _ in range(128)] for _ in range(128)],
+        'B': [[rng.randint(0, 10) for _ in range(128)] for _ in range(128)],
     },
 
-    'spectral-norm': {
+    'spectral-norm': lambda rng: {
         'test_n': 50,
         'iterations': 1000,
-        'matrix': [[random.randint(0, 10) for _ in range(128)] for _ in range(128)],
+        'matrix': [[rng.randint(0, 10) for _ in range(128)] for _ in range(128)],
     },
 
-    'sieve': {
+    'sieve': lambda rng: {
         'test_n': 50,
         'n': 10_000_000,
     },
 
-    'n-queens': {
+    'n-queens': lambda rng: {
         'test_n': 50,
         'n': 12,
+        # Only count the solutions instead of building and printing them
+        'count_only': False,
+        # Worker processes sharing the first-row placements (1: no pool)
+        'processes': 1,
     },
 
-    'reverse_complement': {
+    'reverse_complement': lambda rng: {
         'test_n': 50,
-        'dna_sequence': "ATGC" * 10_000_000,
+        'dna_sequence': Generated(lambda rng: "ATGC" * 10_000_000),
     },
 
-    'binary-trees': {
+    'binary-trees': lambda rng: {
         'test_n': 50,
         'depth': 18,
     },
 
-    'knn': {
+    'knn': lambda rng, num_samples=10_000, num_features=100: {
         'test_n': 50,
-        'num_samples': 10_000,
-        'num_features': 100,
+        'num_samples': num_samples,
+        'num_features': num_features,
         'k': 5,
+        'X_train': Generated(lambda rng: [[rng.uniform(0, 100) for _ in range(num_features)] for _ in range(num_samples)]),
+        'y_classification': Generated(lambda rng: [rng.randint(0, 1) for _ in range(num_samples)]),
+        'y_regression': Generated(lambda rng: [rng.uniform(0, 100) for _ in range(num_samples)]),
+        # One query point each, shaped (1, num_features) for predict()
+        'query_classification': Generated(lambda rng: [[rng.uniform(0, 100) for _ in range(num_features)]]),
+        'query_regression': Generated(lambda rng: [[rng.uniform(0, 100) for _ in range(num_features)]]),
     },
 
-    'pi_digits': {
+    'pi_digits': lambda rng: {
         'test_n': 50,
         'iterations': 1000,
     },
 
-    'K_Nucleotide': {
+    'K_Nucleotide': lambda rng: {
         'test_n': 50,
         'k': 6,
-        'nucleotide_sequence_file': '/home/eaegon/Documents/GITHUB/python-energy-microscope/benchmarks/K-Nucleotide/dna.txt',
+        'nucleotide_sequence_file': os.path.join(ROOT, 'benchmarks', 'K-Nucleotide', 'dna.txt'),
     },
 
-    "fannkuch_redux": {
+    "fannkuch_redux": lambda rng: {
         "test_n": 50,
         "n": 10,
         "perm": list(range(1, 11)),
     },
 
-    "fasta": {
+    "fasta": lambda rng: {
         "test_n": 50,
         "k": 8,
         "query_sequence": "ACGTAGCTAGCTAGTACGATCGATCGTACGATCGATCGTAGCTAGCTGACGATCGATCGTACGATCGTAGCTAGCATCG",
         "target_sequence": "GATCGATCGTAGCTAGCATCGATCGTACGATCGATCGTAGCTAGCTGACGATCGATCGTACGATCGTAGCTAGCATCG"
     },
 
-    "mandelbrot": {
+    "mandelbrot": lambda rng: {
         "test_n": 50,
         "width": 100,
         "height": 100,
@@ -80,23 +222,44 @@ __default__ = {
         "y_max": 1.5
     },
 
-    "nbody": {
+    "nbody": lambda rng, num_bodies=100: {
         "test_n": 50,
-        "num_bodies": 100,
+        "num_bodies": num_bodies,
         "time_steps": 1000,
         "G": 6.67430e-11,
         "dt": 1000,
+        # "direct" (every pair) or "barnes-hut" (octree, opening angle theta)
+        "method": "direct",
+        "theta": 0.5,
+        # Snapshot the positions every sample_every steps; print only the last
+        # trajectory_window snapshots (None: all), or stream them to the .npy
+        # trajectory_file instead of printing (None: print)
+        "sample_every": 1,
+        "trajectory_window": None,
+        "trajectory_file": None,
         "bodies": [
             {
-                "mass": random.uniform(1e24, 1e30),
-                "position": [random.uniform(-1e11, 1e11) for _ in range(3)],
-                "velocity": [random.uniform(-1e4, 1e4) for _ in range(3)]
-            } for _ in range(100)
+                "mass": rng.uniform(1e24, 1e30),
+                "position": [rng.uniform(-1e11, 1e11) for _ in range(3)],
+                "velocity": [rng.uniform(-1e4, 1e4) for _ in range(3)]
+            } for _ in range(num_bodies)
         ]
     },
 
-    "regex_redux": {
+    "regex_redux": lambda rng: {
         "file_path": "input_fasta.txt",
         "test_n": 50
     }
 }
+
+
+def workload_overrides() -> Dict[str, Dict[str, Any]]:
+    """
+    Parameter overrides from ENERGY_MICROSCOPE_WORKLOAD, a JSON object such
+    as `{"nbody": {"num_bodies": 100000, "method": "barnes-hut"}}`.
+    """
+    value = os.environ.get("ENERGY_MICROSCOPE_WORKLOAD")
+    return json.loads(value) if value else {}
+
+
+__default__ = WorkloadRegistry(__factories__, overrides=workload_overrides())
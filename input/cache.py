@@ -0,0 +1,95 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, List, Sequence, Union
+
+CACHE_DIR = os.environ.get(
+    "ENERGY_MICROSCOPE_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".workload_cache"),
+)
+
+
+def cache_path(name: str, params: Dict[str, Any], seed: int, suffix: str = ".bin") -> str:
+    """
+    Build the cache file path for a workload from its name, parameters and seed.
+    """
+    key = json.dumps({"name": name, "params": params, "seed": seed}, sort_keys=True)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{name}-{digest}{suffix}")
+
+
+def _write_once(path: str, factory: Callable[[], bytes]) -> None:
+    """
+    Create a cache file if it is missing.
+
+    The data is written to a temporary file and renamed into place, so
+    processes racing on the same entry never map a half-written file.
+    """
+    if os.path.isfile(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as tmp_file:
+        tmp_file.write(factory())
+    os.replace(tmp_path, path)
+
+
+def map_file(path: str) -> mmap.mmap:
+    """
+    Return a read-only memory map of an existing, non-empty file.
+    """
+    with open(path, "rb") as cache_file:
+        return mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def map_value(path: str, factory: Callable[[], Any]) -> Union[mmap.mmap, memoryview]:
+    """
+    Return a read-only memory map of a cached workload value, calling
+    `factory` only if the entry is missing.
+
+    Strings are stored as raw ASCII bytes and returned as an `mmap`; numeric
+    (nested) lists are stored flat and returned as a memoryview of 64-bit
+    integers ('q') or doubles ('d') with the shape of the nesting. The
+    typecode and shape go to a `.json` file next to the data, written after
+    it, so a complete entry is mapped without building the value.
+    """
+    meta_path = f"{path}.json"
+    if not os.path.isfile(meta_path):
+        value = factory()
+        if isinstance(value, str):
+            meta = {"typecode": None, "shape": []}
+            _write_once(path, lambda: value.encode("ascii"))
+        else:
+            flat = flatten(value)
+            typecode = "d" if any(isinstance(item, float) for item in flat) else "q"
+            meta = {"typecode": typecode, "shape": shape_of(value)}
+            _write_once(path, lambda: array.array(typecode, flat).tobytes())
+        _write_once(meta_path, lambda: json.dumps(meta).encode("utf-8"))
+    with open(meta_path, "r", encoding="utf-8") as meta_file:
+        meta = json.load(meta_file)
+    if meta["typecode"] is None:
+        return map_file(path)
+    view = memoryview(map_file(path))
+    return view.cast(meta["typecode"], meta["shape"]) if meta["shape"] else view.cast(meta["typecode"])
+
+
+def shape_of(value: Sequence) -> List[int]:
+    """
+    Dimensions of a (nested) list, e.g. [128, 128] for a 128x128 matrix.
+    """
+    shape = []
+    while isinstance(value, list):
+        shape.append(len(value))
+        value = value[0] if value else None
+    return shape
+
+
+def flatten(value: Sequence) -> List:
+    """
+    Flatten a nested list (e.g. a matrix) in row-major order.
+    """
+    while value and isinstance(value[0], list):
+        value = [item for row in value for item in row]
+    return list(value)
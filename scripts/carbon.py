@@ -1,6 +1,5 @@
 import csv
 
-INPUT_CSV = input("enter the target file path: ")  # Replace with your file name
 OUTPUT_CSV = "carbon_footprint.csv"
 CARBON_INTENSITY = 0.000475  # gCO₂e per J (global average)
 
@@ -8,7 +7,8 @@ def calculate_carbon(energy_uj):
     return energy_uj * 1e-6 * CARBON_INTENSITY  # Convert μJ to J, then multiply
 
 def main():
-    with open(INPUT_CSV, 'r') as infile, open(OUTPUT_CSV, 'w', newline='') as outfile:
+    input_csv = input("enter the target file path: ")  # Replace with your file name
+    with open(input_csv, 'r') as infile, open(OUTPUT_CSV, 'w', newline='') as outfile:
         reader = csv.DictReader(infile)
         fieldnames = ['algorithm'] + [f"{method}_CO2e_g" for method in reader.fieldnames[1:]]
         writer = csv.DictWriter(outfile, fieldnames=fieldnames)
@@ -7,6 +7,37 @@ def extract_algorithm_name(full_name):
     # Extracts everything before the last underscore
     return '_'.join(full_name.split('_')[:-1])
 
+def write_comparison(energy_data, output_file):
+    all_methods = sorted({method for algo_data in energy_data.values() for method in algo_data})
+
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['algorithm'] + all_methods)
+
+        for algorithm in sorted(energy_data):
+            row = [algorithm] + [energy_data[algorithm].get(method, '') for method in all_methods]
+            writer.writerow(row)
+
+    print(f"Combined comparison saved to '{output_file}'.")
+
+def main_database(database_path, output_file, collection=None):
+    """
+    Same comparison, read from a results database (energy_module.database)
+    instead of the per-runtime energy_avg.csv files.
+    """
+    from energy_module.database import ResultDatabase
+
+    database = ResultDatabase(database_path)
+    filters = {'collection': collection} if collection else {}
+    summary = database.summary('package_uj', group_by=('benchmark', 'runtime'), **filters)
+    database.close()
+
+    energy_data = defaultdict(dict)  # {algorithm: {method: value}}
+    for (algorithm, method_name), stats in summary.items():
+        energy_data[algorithm][method_name] = stats['mean']
+
+    write_comparison(energy_data, output_file)
+
 def main(file_paths, output_file):
     energy_data = defaultdict(dict)  # {algorithm: {method: value}}
 
@@ -25,21 +56,14 @@ def main(file_paths, output_file):
                 except ValueError:
                     continue
 
-    all_methods = sorted({method for algo_data in energy_data.values() for method in algo_data})
-
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['algorithm'] + all_methods)
-
-        for algorithm in sorted(energy_data):
-            row = [algorithm] + [energy_data[algorithm].get(method, '') for method in all_methods]
-            writer.writerow(row)
-
-    print(f"Combined comparison saved to '{output_file}'.")
+    write_comparison(energy_data, output_file)
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python combine_energy_csvs.py <output_csv>")
+    if len(sys.argv) in (3, 4):
+        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        main_database(sys.argv[2], sys.argv[1], sys.argv[3] if len(sys.argv) == 4 else None)
+    elif len(sys.argv) != 2:
+        print("Usage: python combine_energy_csvs.py <output_csv> [<results.sqlite> [collection]]")
     else:
         output_file = sys.argv[1]
         
@@ -0,0 +1,97 @@
+import csv
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from energy_module.store import COLUMNS, split_result_name
+
+def read_result_file(file_path):
+    """
+    Read one per-run CSV file into string columns named as in the store.
+    Columns the store does not know are skipped.
+    """
+    with open(file_path, 'r') as f:
+        reader = csv.DictReader(f)
+        names = [name for name in reader.fieldnames if name in COLUMNS]
+        values = {COLUMNS[name]: [] for name in names}
+
+        for row in reader:
+            for name in names:
+                values[COLUMNS[name]].append(row[name] or None)
+
+    return values
+
+class ParquetTarget:
+    def __init__(self, store_path):
+        import pyarrow as pa
+        from energy_module.store import ResultStore
+
+        self.pa = pa
+        self.store = ResultStore(store_path)
+
+    def append(self, labels, columns):
+        rows = len(next(iter(columns.values())))
+        typed = {
+            name: self.pa.array(column, self.pa.string()).cast(self.store.schema.field(name).type)
+            for name, column in columns.items()
+        }
+        typed.update({name: [value] * rows for name, value in labels.items()})
+        self.store.append(typed)
+
+    def close(self):
+        pass
+
+class SqliteTarget:
+    def __init__(self, database_path):
+        from energy_module.database import ResultDatabase
+
+        self.database = ResultDatabase(database_path)
+
+    def append(self, labels, columns):
+        self.database.insert(labels, columns)
+
+    def close(self):
+        self.database.close()
+
+def main(collection_path, store_path, host):
+    """
+    Import `<collection>/<runtime>/{energy,time,benchmark}/<benchmark>_<runtime>.csv`
+    into the columnar store (one part file per CSV file) or, if `store_path`
+    ends in .sqlite or .db, into a results database (one transaction per
+    CSV file).
+    """
+    if store_path.endswith(('.sqlite', '.db')):
+        target = SqliteTarget(store_path)
+    else:
+        target = ParquetTarget(store_path)
+    collection = os.path.basename(os.path.normpath(collection_path))
+    imported = 0
+
+    for runtime in sorted(os.listdir(collection_path)):
+        for kind in ('energy', 'time', 'benchmark'):
+            folder = os.path.join(collection_path, runtime, kind)
+            if not os.path.isdir(folder):
+                continue
+
+            for file_name in sorted(f for f in os.listdir(folder) if f.endswith('.csv')):
+                columns = read_result_file(os.path.join(folder, file_name))
+                if not columns or len(next(iter(columns.values()))) == 0:
+                    print(f"Skipped {file_name} — no known columns or rows.")
+                    continue
+
+                rows = len(next(iter(columns.values())))
+                benchmark = split_result_name(file_name[:-len('.csv')])[0]
+                labels = {'collection': collection, 'runtime': runtime, 'benchmark': benchmark, 'host': host}
+                target.append(labels, columns)
+                imported += rows
+
+    target.close()
+
+    print(f"Imported {imported} runs from '{collection_path}' into '{store_path}'.")
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python csv_to_store.py <collection_folder> <store_folder | results.sqlite> [host]")
+    else:
+        main(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else 'unknown')
@@ -3,23 +3,31 @@ import os
 import sys
 
 def compute_package_avg(file_path):
+    """
+    Average 'package (uJ)' per run phase.
+
+    Rows without a 'phase' column (older collections) count as steady runs;
+    runs recorded with a status other than 'ok' are skipped.
+    Returns a dict mapping phase to (run count, average).
+    """
     with open(file_path, 'r') as f:
         reader = csv.DictReader(f)
-        package_values = []
+        phase_values = {}
 
         for row in reader:
+            if (row.get('status') or 'ok') != 'ok':
+                continue  # Skip runs that raised
             try:
                 val = float(row['package (uJ)'])
-                package_values.append(val)
-            except (ValueError, KeyError):
+            except (ValueError, KeyError, TypeError):
                 continue  # Skip invalid or missing values
+            phase = row.get('phase') or 'steady'
+            phase_values.setdefault(phase, []).append(val)
 
-        if not package_values:
-            return None
-        
-        #print(f"{file_path} - {len(package_values)}")
-
-        return sum(package_values) / len(package_values)
+        return {
+            phase: (len(values), sum(values) / len(values))
+            for phase, values in phase_values.items()
+        }
 
 def main(folder_path, output_file):
     csv_files = [f for f in os.listdir(folder_path) if f.endswith('.csv')]
@@ -29,14 +37,16 @@ def main(folder_path, output_file):
 
     with open(output_file, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['filename', 'average_package (uJ)'])
+        writer.writerow(['filename', 'average_package (uJ)', 'steady_runs', 'warmup_runs', 'average_warmup_package (uJ)'])
 
         for file_name in csv_files:
             full_path = os.path.join(folder_path, file_name)
-            avg = compute_package_avg(full_path)
+            phases = compute_package_avg(full_path)
 
-            if avg is not None:
-                writer.writerow([file_name.split('.')[0], avg])
+            if 'steady' in phases:
+                steady_runs, avg = phases['steady']
+                warmup_runs, warmup_avg = phases.get('warmup', (0, ''))
+                writer.writerow([file_name.split('.')[0], avg, steady_runs, warmup_runs, warmup_avg])
             else:
                 print(f"Skipped {file_name} — no valid 'package (uJ)' data.")
 
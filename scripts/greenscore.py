@@ -1,3 +1,6 @@
+import sys
+
+import numpy as np
 import pandas as pd
 
 __WEIGHTS__ = [
@@ -39,6 +42,16 @@ def read_csv_files():
 
     return dataframes
 
+def normalize_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Min-max normalize every row (algorithm) of an algorithms x methods
+    matrix at once. Constant rows become 0 and missing values stay NaN.
+    """
+    low = np.nanmin(values, axis=1, keepdims=True)
+    spread = np.nanmax(values, axis=1, keepdims=True) - low
+    constant = spread == 0
+    return np.where(constant, values * 0, (values - low) / np.where(constant, 1, spread))
+
 def create_nom_score_df(df: pd.DataFrame, output_path: str = None) -> pd.DataFrame:
     """
     Normalize energy usage across methods (row-wise) per algorithm.
@@ -61,10 +74,10 @@ def create_nom_score_df(df: pd.DataFrame, output_path: str = None) -> pd.DataFra
     numeric_df = df[method_cols]
 
     # Apply row-wise normalization (min-max per algorithm)
-    normalized_df = numeric_df.apply(
-        lambda row: (row - row.min()) / (row.max() - row.min())
-        if row.max() != row.min() else row * 0,  # handle constant rows
-        axis=1
+    normalized_df = pd.DataFrame(
+        normalize_rows(numeric_df.to_numpy(dtype=float)),
+        columns=method_cols,
+        index=df.index
     )
 
     # Add back the algorithm column
@@ -122,6 +135,63 @@ def create_mean_score_df(
 
     return mean_score_df
 
+def component_matrix(df_energy, df_time, df_carbon):
+    """
+    Normalize the three raw DataFrames once and average per method.
+
+    Returns the method names and a methods x 3 matrix whose columns are the
+    mean normalized energy, carbon and time, in the order of the weights
+    (α, β, γ). Methods are matched by column position, as in
+    `create_mean_score_df`.
+    """
+    methods = df_energy.columns.drop('algorithm').str.replace(r'_.*$', '', regex=True)
+    components = np.column_stack([
+        np.nanmean(normalize_rows(df.drop(columns=['algorithm']).to_numpy(dtype=float)), axis=0)
+        for df in (df_energy, df_carbon, df_time)
+    ])
+    return np.asarray(methods), components
+
+def simplex_grid(step: float) -> np.ndarray:
+    """
+    Every (α, β, γ) with α + β + γ = 1 on a grid of `step`
+    (0.01 gives 5151 combinations).
+    """
+    n = round(1 / step)
+    i, j = np.triu_indices(n + 1)
+    return np.column_stack([i, j - i, n - j]) / n
+
+def sweep_greenscore(df_energy, df_time, df_carbon, weights, output_path: str = "green_score_sweep.csv") -> pd.DataFrame:
+    """
+    GreenScore of every method for every weight combination.
+
+    The DataFrames are normalized once (`component_matrix`) and all
+    combinations are scored in one matrix product, weights x components.
+    Returns, and saves if `output_path` is given, one tidy DataFrame with a
+    row per (alpha, beta, gamma, method): its `green_score` and its `rank`
+    among the methods for those weights (1 = lowest score, best).
+    """
+    weights = np.asarray(weights, dtype=float)
+    methods, components = component_matrix(df_energy, df_time, df_carbon)
+
+    scores = weights @ components.T  # weights x methods
+    ranks = scores.argsort(axis=1, kind='stable').argsort(axis=1, kind='stable') + 1
+
+    n_methods = len(methods)
+    sweep_df = pd.DataFrame({
+        'alpha': np.repeat(weights[:, 0], n_methods),
+        'beta': np.repeat(weights[:, 1], n_methods),
+        'gamma': np.repeat(weights[:, 2], n_methods),
+        'method': np.tile(methods, len(weights)),
+        'green_score': scores.ravel(),
+        'rank': ranks.ravel(),
+    })
+
+    if output_path:
+        sweep_df.to_csv(output_path, index=False)
+        print(f"✅ GreenScore sweep over {len(weights)} weight combinations saved to: {output_path}")
+
+    return sweep_df
+
 def calculate_greenscore(df_energy, df_time, df_carbon, alpha=0.4, beta=0.4, gamma=0.2):
     """
     Compute the Green Score for each method by combining normalized
@@ -174,6 +244,7 @@ if __name__ == "__main__":
         print(f"\nPreview of DataFrame {i}:")
         print(df.head())
     
-    for weights in __WEIGHTS__:
-        print(f"\nCalculating GreenScore with weights: α={weights[0]}, β={weights[1]}, γ={weights[2]}")
-        calculate_greenscore(dfs[0], dfs[1], dfs[2], alpha=weights[0], beta=weights[1], gamma=weights[2])
\ No newline at end of file
+    # Optional argument: grid step for a sweep over the whole weight simplex
+    weights = simplex_grid(float(sys.argv[1])) if len(sys.argv) == 2 else __WEIGHTS__
+    print(f"\nCalculating GreenScore for {len(weights)} weight combinations")
+    sweep_greenscore(dfs[0], dfs[1], dfs[2], weights)
\ No newline at end of file
@@ -0,0 +1,276 @@
+import csv
+import io
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from carbon import calculate_carbon
+from energy_module.store import split_result_name
+
+# (kind, value column, <runtime>/<kind>_avg.csv steady and warm-up columns, combined table)
+METRICS = [
+    ('energy', 'package (uJ)', 'average_package (uJ)', 'average_warmup_package (uJ)', 'energy_com.csv'),
+    ('time', 'execution_time (s)', 'execution_time (s)', 'warmup_execution_time (s)', 'time_com.csv'),
+]
+# Folder of the combined result files of energy_module.measure, read for every kind
+COMBINED_FOLDER = 'benchmark'
+STATE_FILE = 'pipeline_state.json'
+SUMMARY_QUANTILES = (0.05, 0.5, 0.95)
+
+def extract_algorithm_name(full_name):
+    # Extracts everything before the runtime suffix (`nbody_py_compile` -> `nbody`)
+    return split_result_name(full_name)[0]
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy `accuracy`.
+
+    Values are counted in logarithmic buckets, bucket i covering
+    (gamma^(i-1), gamma^i] with gamma = (1 + accuracy) / (1 - accuracy), so
+    any quantile is known to within `accuracy` of its value and the size
+    grows with the range of the values, not their number. Meant for the
+    non-negative measurements of a result file; zero and negative values
+    are counted together as zero.
+    """
+    def __init__(self, accuracy=0.01, bins=None, zeros=0):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.bins = bins if bins is not None else {}
+        self.zeros = zeros
+
+    def add(self, value):
+        if value <= 0:
+            self.zeros += 1
+        else:
+            index = math.ceil(math.log(value, self.gamma))
+            self.bins[index] = self.bins.get(index, 0) + 1
+
+    def quantile(self, q):
+        count = self.zeros + sum(self.bins.values())
+        if count == 0:
+            return None
+        rank = q * (count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {'accuracy': self.accuracy, 'bins': {str(i): n for i, n in self.bins.items()}, 'zeros': self.zeros}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['accuracy'], {int(i): n for i, n in data['bins'].items()}, data['zeros'])
+
+class RunningStats:
+    """
+    Count, sum, variance (Welford's M2), min, max and a quantile sketch of
+    a stream of values, updated one value at a time. The mean is the sum
+    over the count, so it matches a full recompute.
+    """
+    def __init__(self, count=0, total=0.0, m2=0.0, minimum=math.inf, maximum=-math.inf, sketch=None):
+        self.count = count
+        self.total = total
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.sketch = sketch or QuantileSketch()
+
+    def add(self, value):
+        delta = value - self.mean
+        self.count += 1
+        self.total += value
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            'count': self.count, 'total': self.total, 'm2': self.m2,
+            'min': self.min, 'max': self.max, 'sketch': self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['total'], data['m2'], data['min'], data['max'],
+                   QuantileSketch.from_dict(data['sketch']))
+
+def load_state(state_path):
+    if os.path.isfile(state_path):
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    return {'files': {}}
+
+def save_state(state, state_path):
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+def update_file(entry, file_path, value_column):
+    """
+    Fold the rows appended to `file_path` since `entry['offset']` into the
+    per-phase statistics of `entry`. A file that got shorter was rewritten
+    and is read again from the start; an incomplete last line is left for
+    the next update. Returns the number of rows read.
+    """
+    size = os.path.getsize(file_path)
+    if size < entry['offset']:
+        entry.update(offset=0, header=None, phases={})
+    if size == entry['offset']:
+        return 0
+
+    with open(file_path, 'rb') as f:
+        f.seek(entry['offset'])
+        data = f.read(size - entry['offset'])
+    data = data[:data.rfind(b'\n') + 1]
+    if not data:
+        return 0
+    entry['offset'] += len(data)
+
+    reader = csv.reader(io.StringIO(data.decode()))
+    if entry['header'] is None:
+        entry['header'] = next(reader)
+    header = entry['header']
+    if value_column not in header:
+        return 0
+    value_index = header.index(value_column)
+    phase_index = header.index('phase') if 'phase' in header else None
+    status_index = header.index('status') if 'status' in header else None
+
+    phases = {phase: RunningStats.from_dict(stats) for phase, stats in entry['phases'].items()}
+    rows = 0
+    for row in reader:
+        rows += 1
+        if status_index is not None and (row[status_index] or 'ok') != 'ok':
+            continue  # Skip runs that raised
+        try:
+            value = float(row[value_index])
+        except (ValueError, IndexError):
+            continue  # Skip invalid or missing values
+        phase = (row[phase_index] if phase_index is not None else '') or 'steady'
+        phases.setdefault(phase, RunningStats()).add(value)
+
+    entry['phases'] = {phase: stats.to_dict() for phase, stats in phases.items()}
+    return rows
+
+def write_avg_file(output_file, average_column, warmup_column, files):
+    """
+    `<runtime>/<kind>_avg.csv` in the layout of energy_avg.py / time_avg.py.
+    """
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['filename', average_column, 'steady_runs', 'warmup_runs', warmup_column])
+        for file_name, phases in sorted(files.items()):
+            if 'steady' not in phases:
+                continue
+            steady, warmup = phases['steady'], phases.get('warmup')
+            writer.writerow([file_name, steady.mean, steady.count,
+                             warmup.count if warmup else 0, warmup.mean if warmup else ''])
+
+def write_table(output_file, table, methods, fieldnames=None, convert=None):
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['algorithm'] + (fieldnames or methods))
+        for algorithm in sorted(table):
+            values = [table[algorithm].get(method, '') for method in methods]
+            if convert:
+                values = [convert(value) if value != '' else '' for value in values]
+            writer.writerow([algorithm] + values)
+
+def main(collection_path):
+    """
+    Bring the averages and combined tables of a collection up to date.
+
+    Reads `<collection>/<runtime>/{energy,time}/*.csv` and the combined
+    `<runtime>/benchmark/*.csv` files incrementally: the running statistics
+    of every file and phase, and the byte offset up to which the file has
+    been read, are kept in `<collection>/combine/pipeline_state.json`, so
+    only rows appended since the last call are parsed. Then rewrites, from
+    the statistics alone,
+    `<runtime>/energy_avg.csv`, `<runtime>/time_avg.csv`,
+    `combine/energy_com.csv`, `combine/time_com.csv`,
+    `combine/carbon_footprint.csv` and `combine/summary.csv` (count, mean,
+    standard deviation, min, max and quantiles of the steady runs).
+    """
+    combine_path = os.path.join(collection_path, 'combine')
+    os.makedirs(combine_path, exist_ok=True)
+    state_path = os.path.join(combine_path, STATE_FILE)
+    state = load_state(state_path)
+
+    read = 0
+    for runtime in sorted(os.listdir(collection_path)):
+        for kind, value_column, *_ in METRICS:
+            for folder_name in (kind, COMBINED_FOLDER):
+                folder = os.path.join(collection_path, runtime, folder_name)
+                if not os.path.isdir(folder):
+                    continue
+                for file_name in sorted(f for f in os.listdir(folder) if f.endswith('.csv')):
+                    key = f"{runtime}/{kind}/{file_name}"
+                    if folder_name != kind:
+                        key = f"{runtime}/{kind}/{folder_name}/{file_name}"
+                    entry = state['files'].setdefault(key, {'offset': 0, 'header': None, 'phases': {}})
+                    read += update_file(entry, os.path.join(folder, file_name), value_column)
+
+    if read:
+        save_state(state, state_path)
+
+    # {kind: {runtime: {file name: {phase: RunningStats}}}}
+    stats = defaultdict(lambda: defaultdict(dict))
+    for key, entry in state['files'].items():
+        runtime, kind, *_, file_name = key.split('/')
+        stats[kind][runtime][file_name.split('.')[0]] = {
+            phase: RunningStats.from_dict(data) for phase, data in entry['phases'].items()
+        }
+
+    with open(os.path.join(combine_path, 'summary.csv'), 'w', newline='') as summary_file:
+        summary = csv.writer(summary_file)
+        summary.writerow(['metric', 'algorithm', 'method', 'count', 'mean', 'std', 'min', 'max']
+                         + [f"q{int(q * 100):02d}" for q in SUMMARY_QUANTILES])
+
+        for kind, value_column, average_column, warmup_column, combined_name in METRICS:
+            table = defaultdict(dict)  # {algorithm: {method: mean}}
+            for runtime, files in stats[kind].items():
+                write_avg_file(os.path.join(collection_path, runtime, f"{kind}_avg.csv"),
+                               average_column, warmup_column, files)
+                for file_name, phases in sorted(files.items()):
+                    steady = phases.get('steady')
+                    if steady is None:
+                        continue
+                    algorithm = extract_algorithm_name(file_name)
+                    table[algorithm][runtime] = steady.mean
+                    summary.writerow([value_column, algorithm, runtime, steady.count, steady.mean, steady.std,
+                                      steady.min, steady.max]
+                                     + [steady.sketch.quantile(q) for q in SUMMARY_QUANTILES])
+
+            methods = sorted({method for algo_data in table.values() for method in algo_data})
+            write_table(os.path.join(combine_path, combined_name), table, methods)
+            if kind == 'energy':
+                write_table(os.path.join(combine_path, 'carbon_footprint.csv'), table, methods,
+                            [f"{method}_CO2e_g" for method in methods],
+                            lambda energy_uj: round(calculate_carbon(energy_uj), 6))
+
+    print(f"Read {read} new rows; tables in '{combine_path}' are up to date.")
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python pipeline.py <collection_folder>")
+    else:
+        main(sys.argv[1])
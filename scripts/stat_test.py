@@ -1,6 +1,11 @@
 """
 Statistical comparison of Python execution methods across benchmarks.
 
+Pairwise tests per metric: paired t-test, Wilcoxon, sign-flip permutation
+test, paired Cohen's d and bootstrap intervals (percentile and BCa) for the
+mean difference. Resamples are drawn as index matrices in chunks of at most
+MAX_ELEMENTS entries, and the method pairs run in a process pool.
+
 Requirements:
     pip install pandas scipy statsmodels numpy
 """
@@ -10,6 +15,7 @@ import numpy as np
 from scipy import stats
 from statsmodels.stats.anova import AnovaRM
 from statsmodels.stats.multitest import multipletests
+from concurrent.futures import ProcessPoolExecutor
 import itertools
 import warnings
 
@@ -22,6 +28,9 @@ BENCH_COL = "benchmark"
 METRICS = ["energy_j", "time_s", "carbon_g"]   # adjust if needed
 ALPHA = 0.05
 N_BOOT = 5000
+N_PERM = 100000        # sign flips per permutation test; exact when 2**n_subjects is not larger
+MAX_ELEMENTS = 1 << 22  # resample matrix entries held in memory at once
+N_JOBS = None           # worker processes for the pairwise tests (None = all CPUs)
 
 # ---------------- Helpers ----------------
 def paired_cohens_d(x, y):
@@ -29,119 +38,205 @@ def paired_cohens_d(x, y):
     diff = np.array(x) - np.array(y)
     return diff.mean() / diff.std(ddof=1)
 
-def bootstrap_mean_diff_ci(x, y, n_boot=5000, alpha=0.05, seed=0):
-    """Bootstrap CI for mean difference (x - y)"""
+def _chunks(total, n):
+    """Row counts of the chunks a total x n matrix is drawn in"""
+    rows = max(1, MAX_ELEMENTS // max(n, 1))
+    for start in range(0, total, rows):
+        yield min(rows, total - start)
+
+def bootstrap_means(diffs, n_boot=5000, seed=0):
+    """Means of n_boot resamples of diffs, drawn as index matrices chunk by chunk"""
     rng = np.random.default_rng(seed)
-    diffs = np.array(x) - np.array(y)
+    diffs = np.asarray(diffs, dtype=float)
     n = len(diffs)
-    boot_means = []
-    for _ in range(n_boot):
-        sample = rng.choice(diffs, size=n, replace=True)
-        boot_means.append(sample.mean())
+    means = np.empty(n_boot)
+    done = 0
+    for rows in _chunks(n_boot, n):
+        means[done:done + rows] = diffs[rng.integers(0, n, size=(rows, n))].mean(axis=1)
+        done += rows
+    return means
+
+def bca_interval(diffs, boot_means, alpha=0.05):
+    """Bias-corrected and accelerated interval for the mean from its bootstrap distribution"""
+    diffs = np.asarray(diffs, dtype=float)
+    n = len(diffs)
+    theta = diffs.mean()
+    # Bias correction: how far the bootstrap median is from the estimate
+    z0 = stats.norm.ppf((np.sum(boot_means < theta) + 0.5 * np.sum(boot_means == theta)) / len(boot_means))
+    # Acceleration from the jackknife (leave-one-out) means
+    jack = (diffs.sum() - diffs) / (n - 1)
+    spread = jack.mean() - jack
+    denominator = 6 * np.sum(spread ** 2) ** 1.5
+    if denominator == 0 or not np.isfinite(z0):
+        return theta, theta
+    a = np.sum(spread ** 3) / denominator
+    z = stats.norm.ppf([alpha / 2, 1 - alpha / 2])
+    levels = stats.norm.cdf(z0 + (z0 + z) / (1 - a * (z0 + z)))
+    lower, upper = np.percentile(boot_means, 100 * levels)
+    return lower, upper
+
+def bootstrap_mean_diff_ci(x, y, n_boot=5000, alpha=0.05, seed=0, method="percentile"):
+    """Bootstrap CI for mean difference (x - y); method is 'percentile' or 'bca'"""
+    diffs = np.array(x) - np.array(y)
+    boot_means = bootstrap_means(diffs, n_boot, seed)
+    if method == "bca":
+        return bca_interval(diffs, boot_means, alpha)
     lower = np.percentile(boot_means, 100 * (alpha/2))
     upper = np.percentile(boot_means, 100 * (1 - alpha/2))
     return lower, upper
 
-# ---------------- Load Data ----------------
-df = pd.read_csv(INPUT_CSV)
-
-methods = df[METHOD_COL].unique()
-benchmarks = df[BENCH_COL].unique()
-print(f"Found {len(methods)} methods: {methods}")
-print(f"Found {len(benchmarks)} benchmarks")
-
-anova_summary_rows = []
-posthoc_rows = []
-
-# ---------------- Run tests ----------------
-for metric in METRICS:
-    print(f"\n=== Metric: {metric} ===")
-    pivot = df.pivot_table(index=BENCH_COL, columns=METHOD_COL, values=metric)
-    pivot = pivot.dropna(axis=0)  # drop incomplete rows
-    n_subjects = len(pivot)
-    print(f"Using {n_subjects} benchmarks")
-
-    # ----- Repeated measures ANOVA -----
-    long = pivot.reset_index().melt(id_vars=BENCH_COL, value_name=metric, var_name=METHOD_COL)
-    try:
-        aov = AnovaRM(long, depvar=metric, subject=BENCH_COL, within=[METHOD_COL]).fit()
-        F_val = float(aov.anova_table.loc[METHOD_COL, 'F Value'])
-        p_val = float(aov.anova_table.loc[METHOD_COL, 'Pr > F'])
-    except Exception as e:
-        print("ANOVA failed:", e)
-        F_val, p_val = np.nan, np.nan
-
-    # ----- Friedman Test -----
+def paired_permutation_test(x, y, n_perm=100000, seed=0):
+    """
+    Two-sided sign-flip permutation test for a zero mean difference (x - y).
+    Enumerates all 2**n sign assignments when that is at most n_perm,
+    otherwise draws n_perm of them at random.
+    """
+    diffs = np.array(x, dtype=float) - np.array(y, dtype=float)
+    n = len(diffs)
+    observed = abs(diffs.mean())
+    # Tolerance so that permutations equal to the observed value count as extreme
+    threshold = observed - 1e-12 * max(observed, 1.0)
+    exact = 2 ** n <= n_perm
+    total = 2 ** n if exact else n_perm
+    rng = np.random.default_rng(seed)
+    extreme = 0
+    done = 0
+    for rows in _chunks(total, n):
+        if exact:
+            codes = np.arange(done, done + rows)[:, None]
+            signs = ((codes >> np.arange(n)) & 1) * 2 - 1
+        else:
+            signs = rng.integers(0, 2, size=(rows, n)) * 2 - 1
+        extreme += np.count_nonzero(np.abs(signs @ diffs) / n >= threshold)
+        done += rows
+    if exact:
+        return extreme / total
+    return (extreme + 1) / (total + 1)
+
+def compare_pair(job):
+    """All pairwise tests of one (metric, method_1, method_2) job"""
+    metric, m1, m2, x, y = job
+    t_stat, t_p = stats.ttest_rel(x, y, nan_policy='raise')
     try:
-        method_order = list(pivot.columns)
-        args = [pivot[m].values for m in method_order]
-        fried_stat, fried_p = stats.friedmanchisquare(*args)
-    except Exception as e:
-        fried_stat, fried_p = np.nan, np.nan
-
-    print(f"ANOVA: F = {F_val:.5f}, p = {p_val:.5f}")
-    print(f"Friedman: chi2 = {fried_stat:.5f}, p = {fried_p:.5f}")
-
-    anova_summary_rows.append({
+        w_stat, w_p = stats.wilcoxon(x, y)
+    except ValueError:
+        w_stat, w_p = np.nan, np.nan
+    d = paired_cohens_d(x, y)
+    diffs = x - y
+    boot_means = bootstrap_means(diffs, N_BOOT)
+    ci_lower = np.percentile(boot_means, 100 * (ALPHA/2))
+    ci_upper = np.percentile(boot_means, 100 * (1 - ALPHA/2))
+    bca_lower, bca_upper = bca_interval(diffs, boot_means, ALPHA)
+
+    return {
         "metric": metric,
-        "n_subjects": n_subjects,
-        "methods": ",".join(method_order),
-        "anova_F": F_val,
-        "anova_p": p_val,
-        "friedman_chi2": fried_stat,
-        "friedman_p": fried_p
-    })
-
-    # ----- Pairwise comparisons -----
-    pairs = list(itertools.combinations(method_order, 2))
-    results = []
-    for (m1, m2) in pairs:
-        x, y = pivot[m1].values, pivot[m2].values
-        t_stat, t_p = stats.ttest_rel(x, y, nan_policy='raise')
+        "method_1": m1,
+        "method_2": m2,
+        "t_stat": t_stat,
+        "t_p": t_p,
+        "w_stat": w_stat,
+        "w_p": w_p,
+        "perm_p": paired_permutation_test(x, y, N_PERM),
+        "cohen_d_paired": d,
+        "mean_diff": diffs.mean(),
+        "ci_lower": ci_lower,
+        "ci_upper": ci_upper,
+        "bca_lower": bca_lower,
+        "bca_upper": bca_upper
+    }
+
+def main():
+    # ---------------- Load Data ----------------
+    df = pd.read_csv(INPUT_CSV)
+
+    methods = df[METHOD_COL].unique()
+    benchmarks = df[BENCH_COL].unique()
+    print(f"Found {len(methods)} methods: {methods}")
+    print(f"Found {len(benchmarks)} benchmarks")
+
+    anova_summary_rows = []
+    posthoc_rows = []
+    jobs = []
+
+    # ---------------- Run tests ----------------
+    for metric in METRICS:
+        print(f"\n=== Metric: {metric} ===")
+        pivot = df.pivot_table(index=BENCH_COL, columns=METHOD_COL, values=metric)
+        pivot = pivot.dropna(axis=0)  # drop incomplete rows
+        n_subjects = len(pivot)
+        print(f"Using {n_subjects} benchmarks")
+
+        # ----- Repeated measures ANOVA -----
+        long = pivot.reset_index().melt(id_vars=BENCH_COL, value_name=metric, var_name=METHOD_COL)
         try:
-            w_stat, w_p = stats.wilcoxon(x, y)
-        except ValueError:
-            w_stat, w_p = np.nan, np.nan
-        d = paired_cohens_d(x, y)
-        ci_lower, ci_upper = bootstrap_mean_diff_ci(x, y, n_boot=N_BOOT, alpha=ALPHA)
+            aov = AnovaRM(long, depvar=metric, subject=BENCH_COL, within=[METHOD_COL]).fit()
+            F_val = float(aov.anova_table.loc[METHOD_COL, 'F Value'])
+            p_val = float(aov.anova_table.loc[METHOD_COL, 'Pr > F'])
+        except Exception as e:
+            print("ANOVA failed:", e)
+            F_val, p_val = np.nan, np.nan
+
+        # ----- Friedman Test -----
+        try:
+            method_order = list(pivot.columns)
+            args = [pivot[m].values for m in method_order]
+            fried_stat, fried_p = stats.friedmanchisquare(*args)
+        except Exception as e:
+            fried_stat, fried_p = np.nan, np.nan
+
+        print(f"ANOVA: F = {F_val:.5f}, p = {p_val:.5f}")
+        print(f"Friedman: chi2 = {fried_stat:.5f}, p = {fried_p:.5f}")
 
-        results.append({
+        anova_summary_rows.append({
             "metric": metric,
-            "method_1": m1,
-            "method_2": m2,
-            "t_stat": t_stat,
-            "t_p": t_p,
-            "w_stat": w_stat,
-            "w_p": w_p,
-            "cohen_d_paired": d,
-            "mean_diff": (x - y).mean(),
-            "ci_lower": ci_lower,
-            "ci_upper": ci_upper
+            "n_subjects": n_subjects,
+            "methods": ",".join(method_order),
+            "anova_F": F_val,
+            "anova_p": p_val,
+            "friedman_chi2": fried_stat,
+            "friedman_p": fried_p
         })
 
-    # Holm correction
-    if results:
-        t_ps = [r["t_p"] for r in results]
-        w_ps = [r["w_p"] if not np.isnan(r["w_p"]) else 1.0 for r in results]
-        reject_t, t_corr, _, _ = multipletests(t_ps, alpha=ALPHA, method='holm')
-        reject_w, w_corr, _, _ = multipletests(w_ps, alpha=ALPHA, method='holm')
-        for i, r in enumerate(results):
-            r["t_p_corrected_holm"] = t_corr[i]
-            r["t_reject_holm"] = bool(reject_t[i])
-            r["w_p_corrected_holm"] = w_corr[i]
-            r["w_reject_holm"] = bool(reject_w[i])
-
-    posthoc_rows.extend(results)
-
-# ---------------- Save results ----------------
-df_anova = pd.DataFrame(anova_summary_rows)
-df_posthoc = pd.DataFrame(posthoc_rows)
-
-df_anova.to_csv("stat_tests_summary.csv", index=False)
-df_posthoc.to_csv("posthoc_results.csv", index=False)
-
-print("\nSaved:")
-print("  - stat_tests_summary.csv")
-print("  - posthoc_results.csv")
-print("\nPreview of posthoc results:")
-print(df_posthoc.head(10).to_string(index=False))
+        # ----- Pairwise comparison jobs -----
+        for (m1, m2) in itertools.combinations(method_order, 2):
+            jobs.append((metric, m1, m2, pivot[m1].values, pivot[m2].values))
+
+    # ----- Pairwise comparisons, one process per job -----
+    with ProcessPoolExecutor(max_workers=N_JOBS) as pool:
+        pair_results = list(pool.map(compare_pair, jobs))
+
+    # Holm correction within each metric
+    for metric in METRICS:
+        results = [r for r in pair_results if r["metric"] == metric]
+        if results:
+            t_ps = [r["t_p"] for r in results]
+            w_ps = [r["w_p"] if not np.isnan(r["w_p"]) else 1.0 for r in results]
+            perm_ps = [r["perm_p"] for r in results]
+            reject_t, t_corr, _, _ = multipletests(t_ps, alpha=ALPHA, method='holm')
+            reject_w, w_corr, _, _ = multipletests(w_ps, alpha=ALPHA, method='holm')
+            reject_perm, perm_corr, _, _ = multipletests(perm_ps, alpha=ALPHA, method='holm')
+            for i, r in enumerate(results):
+                r["t_p_corrected_holm"] = t_corr[i]
+                r["t_reject_holm"] = bool(reject_t[i])
+                r["w_p_corrected_holm"] = w_corr[i]
+                r["w_reject_holm"] = bool(reject_w[i])
+                r["perm_p_corrected_holm"] = perm_corr[i]
+                r["perm_reject_holm"] = bool(reject_perm[i])
+
+        posthoc_rows.extend(results)
+
+    # ---------------- Save results ----------------
+    df_anova = pd.DataFrame(anova_summary_rows)
+    df_posthoc = pd.DataFrame(posthoc_rows)
+
+    df_anova.to_csv("stat_tests_summary.csv", index=False)
+    df_posthoc.to_csv("posthoc_results.csv", index=False)
+
+    print("\nSaved:")
+    print("  - stat_tests_summary.csv")
+    print("  - posthoc_results.csv")
+    print("\nPreview of posthoc results:")
+    print(df_posthoc.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import time
+from typing import Callable, Dict
+
+CLOCKS: Dict[str, Callable[[], int]] = {
+    "perf_counter": time.perf_counter_ns,
+    "process_time": time.process_time_ns,
+    "thread_time": time.thread_time_ns,
+}
+
+# CLOCK_MONOTONIC_RAW is not slewed by NTP, but only exists on Linux
+if hasattr(time, "CLOCK_MONOTONIC_RAW"):
+    CLOCKS["monotonic_raw"] = lambda: time.clock_gettime_ns(time.CLOCK_MONOTONIC_RAW)
+
+_overheads: Dict[str, int] = {}
+
+
+def get_clock(name: str) -> Callable[[], int]:
+    """
+    Return the nanosecond clock function registered under `name`.
+    """
+    try:
+        return CLOCKS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown clock '{name}', expected one of: {', '.join(sorted(CLOCKS))}"
+        ) from None
+
+
+def calibrate_overhead(name: str, samples: int = 10_000) -> int:
+    """
+    Estimate the cost of one start/stop pair of reads of a clock in ns.
+
+    The median of `samples` back-to-back reads is used so that a preemption
+    during calibration does not inflate the estimate. The result is cached
+    per clock for the lifetime of the process.
+    """
+    if name not in _overheads:
+        clock = get_clock(name)
+        deltas = []
+        for _ in range(samples):
+            start = clock()
+            end = clock()
+            deltas.append(end - start)
+        deltas.sort()
+        _overheads[name] = deltas[len(deltas) // 2]
+    return _overheads[name]
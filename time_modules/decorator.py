@@ -1,12 +1,13 @@
-import os
 import platform
 import psutil
-import json
-import csv
-from functools import wraps
-from typing import Callable
-from datetime import datetime
-import time
+from typing import Callable, Optional, Type
+
+from energy_module.adaptive import AdaptiveSampler
+from energy_module.batch import measured
+from energy_module.output import OutputPolicy
+from energy_module.sink import ResultSink
+from energy_module.warmup import WarmupDetector
+from time_modules.clock import calibrate_overhead
 
 def get_system_info(result_file_path: str):
     """
@@ -20,49 +21,37 @@ def get_system_info(result_file_path: str):
         "Test_Result_File": result_file_path
     }
 
-def measure_time_to_csv(n: int, csv_filename: str, folder_name: str = "time_benchmark"):
+def measure_time_to_csv(
+    n: int,
+    csv_filename: str,
+    folder_name: str = "time_benchmark",
+    clock: str = "perf_counter",
+    adaptive: Optional[AdaptiveSampler] = None,
+    warmup: Optional[WarmupDetector] = None,
+    batch_size: Optional[int] = None,
+    sink: Optional[Type[ResultSink]] = None,
+    resume: bool = False,
+    output: Optional[OutputPolicy] = None,
+):
     """
     Decorator to measure execution time, store system info in a JSON file,
     and store execution time results in a CSV file.
-    """
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Create the directory if it doesn't exist
-            os.makedirs(folder_name, exist_ok=True)
-
-            # Create file paths
-            result_file_path = os.path.join(folder_name, f"{csv_filename}.csv")
-            system_info_path = os.path.join(folder_name, "system_info.json")
-
-            # Write system info to JSON if the file does not exist
-            if not os.path.isfile(system_info_path):
-                system_info = get_system_info(result_file_path)
-                with open(system_info_path, "w") as json_file:
-                    json.dump(system_info, json_file, indent=4)
 
-            # Open the result CSV file and write the data
-            with open(result_file_path, mode='a', newline='') as result_file:
-                writer = csv.writer(result_file)
-
-                # If file doesn't exist, write the header
-                if result_file.tell() == 0:
-                    writer.writerow(['timestamp', 'function', 'run', 'execution_time (s)'])
-
-                # Run the function n times and log execution time
-                for i in range(1, n + 1):
-                    start_time = time.time()
-                    result = func(*args, **kwargs)
-                    end_time = time.time()
-
-                    execution_time = end_time - start_time
+    `clock` selects the timer backend from `time_modules.clock.CLOCKS`. Its
+    read overhead is calibrated once per process, subtracted from every run
+    and stored with the system info. The other arguments are those of
+    `energy_module.batch.run_batch`, which runs the batch.
+    """
+    def clock_info(result_file_path: str):
+        system_info = get_system_info(result_file_path)
+        system_info["Clock"] = clock
+        system_info["Clock_Overhead_ns"] = calibrate_overhead(clock)
+        return system_info
 
-                    writer.writerow([
-                        datetime.now().isoformat(),
-                        func.__name__,
-                        i,
-                        execution_time
-                    ])
-            return result
-        return wrapper
+    def decorator(func: Callable):
+        return measured(
+            func, csv_filename, folder_name, "system_info.json", clock_info,
+            n=n, metrics=("time",), clock=clock, adaptive=adaptive, warmup=warmup,
+            batch_size=batch_size, sink=sink, resume=resume, output=output,
+        )
     return decorator